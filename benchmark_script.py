@@ -1,16 +1,43 @@
-import subprocess
+import math
 import time
 import json
 import matplotlib.pyplot as plt
 import numpy as np
 import os
+import sys
+import random
 import statistics
 import csv
 from datetime import datetime
-import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import threading
+from cpu_scheduler import CoreScheduler
+from jvm_server import DungeonHunterServerClient
+from host_monitor import InterferencePolicy, RunMonitor, summarise_host_states
+from measurement import MeasurementPolicy, measure, summarise
+from result_cache import ResultCache
+from mana_reference import DungeonManaReference
+import result_record
+from process_accounting import cpu_utilisation, run_with_rusage, summarise_rusage
+from crossover_search import (COARSE_GRIDS, FILL_FACTORS, FILL_TUNING_FILE, crossover_estimates, expected_coverage,
+                              fill_flags, load_fill_tuning, midpoint, next_interval, point_speedup, write_fill_tuning)
+from cutoff_tuning import (DEFAULT_CUTOFF, TUNING_FILE, coarse_cutoffs, num_searches, refine_cutoffs, table_hash,
+                           write_tuning_table)
+from jvm_tuning import (BASELINE, GRID_BANDS, JVM_TUNING_FILE, cpu_time, default_option_sets, flags_for_grid,
+                        load_jvm_tuning, rank_option_sets, supported_option_sets, write_jvm_tuning)
+from regression_gate import compare_point, load_baseline
+from results_store import RESULTS_DB, ResultsStore
+from result_table import ResultTable, group_percentiles, speedup_columns, split_groups
+from scaling_analysis import (amdahl_speedup, default_thread_counts, fit_strong_scaling,
+                              strong_scaling_points, weak_scaling_config, weak_scaling_points)
 
 class MinimalDungeonHunterProfiler:
-    def __init__(self, classpath="bin", src_path="src", java_path=None, verbose=True):
+    def __init__(self, classpath="bin", src_path="src", java_path=None, verbose=True,
+                 max_workers=1, serial_cpus=1, parallel_cpus=None, use_server=False, measurement=None,
+                 cache_path="benchmark_cache.jsonl", verify_reference=True, tuning_path=TUNING_FILE,
+                 jvm_tuning_path=None, parallel_mode=None, visualise=False, store_path=RESULTS_DB,
+                 interleave=False, interference=None, fill_tuning_path=FILL_TUNING_FILE):
         self.classpath = classpath
         self.src_path = src_path
         self.java_path = java_path or "java"
@@ -24,111 +51,414 @@ class MinimalDungeonHunterProfiler:
         self.parallel_results = []
         self.test_images = []
         self.verbose = verbose
+        # Concurrent sweeps: each run is pinned to its own disjoint CPU set
+        self.scheduler = CoreScheduler()
+        self.max_workers = max_workers
+        if max_workers > 1 and not self.scheduler.pinning_supported:
+            print(f"Warning: {max_workers} concurrent workers without CPU pinning (taskset not found); "
+                  "runs will compete for cores and timings will interfere")
+        self.serial_cpus = serial_cpus
+        self.parallel_cpus = parallel_cpus or len(self.scheduler.cpus)
+        # Client mode: reuse long-lived DungeonHunterServer JVMs, one per pinned CPU set while it is reserved
+        self.use_server = use_server
+        self.server_class = "DungeonHunterServer"
+        self._servers = {}
+        self._servers_lock = threading.Lock()
+        # Repetition policy (warmup, adaptive CI-driven runs); None keeps a fixed number of runs
+        self.measurement = measurement
+        # Resumable on-disk cache of every finished run (None disables it)
+        self.cache = ResultCache(cache_path, self.classpath, self.java_path,
+                                 payload_fields=("stdout", "returncode")) if cache_path else None
+        # Check reported mana/x/y against the NumPy reference map (no JVM needed)
+        self.verify_reference = verify_reference
+        # DungeonSearch cutoff table, passed to DungeonHunterParallel when it exists
+        self.tuning_path = os.path.abspath(tuning_path)
+        # Winning JVM option set per grid band from run_jvm_matrix (e.g. jvm_tuning.json); None uses JVM defaults
+        self.jvm_tuning = load_jvm_tuning(jvm_tuning_path)
+        # Eager-fill threshold from run_fill_crossover; until it exists DungeonHunterParallel fills lazily
+        self.fill_tuning_path = fill_tuning_path
+        self.fill_tuning = load_fill_tuning(fill_tuning_path)
+        # "deterministic" runs DungeonHunterParallel in its serial-exact CAS mode; None keeps the racy default
+        self.parallel_mode = parallel_mode
+        # Write visualiseSearch*.png on every run; off by default so timings and rusage cover the hunt only
+        self.visualise = visualise
+        # Every record also goes to the shared SQLite store (None disables it)
+        self.store = ResultsStore(store_path, self.classpath, self.java_path, "benchmark_script",
+                                  self.results_dir) if store_path else None
+        # Run serial and parallel samples of a configuration alternately, in random order per round
+        self.interleave = interleave
+        # Watch load and CPU frequency during every run and repeat disturbed ones (InterferencePolicy; None disables)
+        self.interference = interference
+        self._foreign_load_warned = False
 
     # ---------------- Run Java Programs ----------------
-    def run_program(self, class_name, grid_size, num_searches_factor, random_seed, runs=3):
-        times = []
-        outputs = []
+    def cpus_for(self, class_name):
+        return self.parallel_cpus if class_name == self.parallel_class else self.serial_cpus
+
+    def tuned_jvm_flags(self, grid_size):
+        return flags_for_grid(self.jvm_tuning, grid_size)
+
+    def jvm_options(self, cpus=None, extra_flags=()):
+        """JVM flags for a run; `extra_flags` (system properties, GC/heap/JIT options) go last and win"""
+        # Ask for the JSON result record; older builds ignore the property and are parsed as text
+        options = [result_record.RECORD_FLAG]
+        if not self.visualise:
+            options.append(result_record.NO_VISUALISE_FLAG)
+        if cpus:
+            # Size the default ForkJoinPool (and GC/JIT threads) to the pinned cores
+            options.append(f"-XX:ActiveProcessorCount={len(cpus)}")
+        if os.path.exists(self.tuning_path):
+            options.append(f"-Ddungeon.tuning={self.tuning_path}")
+        # Before extra_flags, so an explicit -Ddungeon.fill still wins
+        options.extend(fill_flags(self.fill_tuning))
+        return options + list(extra_flags)
+
+    def java_command(self, class_name, args, cpus=None, extra_flags=()):
+        return [self.java_path] + self.jvm_options(cpus, extra_flags) + ["-cp", self.classpath, class_name] + args
+
+    def cache_options(self, cpus=None, extra_flags=()):
+        options = self.jvm_options(cpus, extra_flags) + (["server"] if self.use_server else [])
+        tuning = table_hash(self.tuning_path)
+        return options + [f"tuning:{tuning}"] if tuning else options
+
+    def server_for(self, cpus=None, extra_flags=()):
+        key = (cpus, tuple(extra_flags))
+        with self._servers_lock:
+            server = self._servers.get(key)
+            if server is None:
+                server = DungeonHunterServerClient(
+                    self.scheduler.pin_command(cpus, self.java_command(self.server_class, [], cpus, extra_flags)))
+                self._servers[key] = server
+            return server
+
+    def close_servers(self, cpus=None):
+        """Shut down every server JVM, or only those pinned within `cpus`"""
+        with self._servers_lock:
+            keys = [key for key in self._servers
+                    if cpus is None or (key[0] is not None and set(key[0]) <= set(cpus))]
+            servers = [self._servers.pop(key) for key in keys]
+        for server in servers:
+            server.close()
+
+    @contextmanager
+    def reserved_cpus(self, count):
+        """Reserve `count` cores for one configuration; server JVMs started on them are
+        shut down before the cores go back, so idle servers never pile up per CPU set"""
+        with self.scheduler.reserved(count) as cpus:
+            try:
+                yield cpus
+            finally:
+                self.close_servers(cpus)
+
+    def execute(self, class_name, args, cpus=None, extra_flags=()):
+        if self.use_server:
+            return self.server_for(cpus, extra_flags).run(class_name, args)
+        # Fresh JVMs are reaped with wait4, so each result carries the process's rusage
+        return run_with_rusage(self.scheduler.pin_command(cpus, self.java_command(class_name, args, cpus, extra_flags)))
+
+    def run_program(self, class_name, grid_size, num_searches_factor, random_seed, runs=3, cpus=None,
+                    extra_flags=()):
         args = [str(grid_size), str(num_searches_factor), str(random_seed)]
-        for _ in range(runs):
+        policy = self.measurement or MeasurementPolicy(runs=runs)
+        key = self.cache.key(class_name, args, self.cache_options(cpus, extra_flags)) if self.cache else None
+        cached = self.cache.samples(key)[:policy.max_runs] if self.cache else []
+
+        def keep(program_time, output):
+            # Only kept samples are cached: warmup runs would be reloaded as real samples next session,
+            # and runs still disturbed after every re-run are not worth reusing
+            if output['returncode'] == 0 and not output.get('interference'):
+                self.cache.append(key, class_name, args, program_time, output)
+
+        result = measure(lambda: self.run_sample(class_name, args, cpus, extra_flags), policy, samples=cached,
+                         on_sample=keep if self.cache else None)
+        result['cached_runs'] = len(cached)
+        return result
+
+    def run_sample(self, class_name, args, cpus=None, extra_flags=()):
+        """Run the program once -> (time_ms, output); with an interference policy the host is
+        watched during the run and disturbed runs are repeated"""
+        attempts = 0
+        while True:
+            monitor = None
+            if self.interference:
+                # Server runs have no rusage of their own; the monitor reads the server JVM's CPU time instead
+                pid = None
+                if self.use_server:
+                    server = self.server_for(cpus, extra_flags)
+                    if not server.is_running():
+                        server.start()
+                    pid = server.process.pid
+                monitor = RunMonitor(cpus, self.interference.interval, pid).start()
             start_time = time.time()
-            result = subprocess.run(
-                [self.java_path, "-cp", self.classpath, class_name] + args,
-                capture_output=True,
-                text=True
-            )
+            result = self.execute(class_name, args, cpus, extra_flags)
             end_time = time.time()
             program_time = self.extract_execution_time(result.stdout) or ((end_time - start_time) * 1000)
-            times.append(program_time)
-            outputs.append({'stdout': result.stdout, 'program_time': program_time})
-        avg_time = statistics.mean(times)
-        std_time = statistics.stdev(times) if len(times) > 1 else 0
-        return {'avg_time': avg_time, 'std_time': std_time, 'times': times, 'outputs': outputs}
+            # Server runs share one JVM, so there is no per-run rusage for them
+            output = {'stdout': result.stdout, 'program_time': program_time,
+                      'wall_time': (end_time - start_time) * 1000,
+                      'rusage': getattr(result, 'rusage', None), 'returncode': result.returncode}
+            if monitor:
+                output['host_state'] = monitor.stop(output['rusage'])
+                if output['host_state']['foreign_cores'] is None and not self._foreign_load_warned:
+                    self._foreign_load_warned = True
+                    print("Warning: cannot measure foreign CPU load on this host (no /proc/stat or run CPU time); "
+                          "only CPU frequency is checked for interference")
+                output['interference'] = self.interference.check(output['host_state'])
+                if output['interference'] and attempts < self.interference.max_reruns:
+                    attempts += 1
+                    print(f"  re-running {class_name} {' '.join(args)}: {'; '.join(output['interference'])}")
+                    continue
+                output['reruns'] = attempts
+            return program_time, output
 
     def extract_execution_time(self, output):
-        for line in output.split('\n'):
-            if 'time:' in line and 'ms' in line:
-                try:
-                    return float(line.split('time:')[1].split('ms')[0].strip())
-                except:
-                    continue
-        return None
+        return result_record.execution_time(output)
 
     def extract_solution_info(self, output):
-        info = {}
-        for line in output.split('\n'):
-            if 'mana' in line:
-                try:
-                    info['mana'] = int(line.split('mana ')[1].split(')')[0])
-                except:
-                    pass
-            if 'x=' in line and 'y=' in line:
-                x_match = re.search(r'x=([+-]?\d*\.?\d+)', line)
-                y_match = re.search(r'y=([+-]?\d*\.?\d+)', line)
-                if x_match and y_match:
-                    info['x'] = float(x_match.group(1))
-                    info['y'] = float(y_match.group(1))
-            if 'number dungeon grid points evaluated:' in line:
-                match = re.search(r'number dungeon grid points evaluated:\s*(\d+)', line)
-                if match:
-                    info['grid_points_evaluated'] = int(match.group(1))
-        return info
+        return result_record.solution_info(output)
 
     # ---------------- Profile Serial or Parallel Version ----------------
+    def config_flags(self, class_name, grid, threads=None, cutoff=None, jvm_flags=None):
+        # Explicit option set, else the recorded winner for this grid band (if any)
+        extra_flags = list(jvm_flags if jvm_flags is not None else self.tuned_jvm_flags(grid))
+        if threads:
+            extra_flags.append(f"-Ddungeon.threads={threads}")
+        if cutoff:
+            extra_flags.append(f"-Ddungeon.cutoff={cutoff}")
+        if class_name == self.parallel_class and self.parallel_mode:
+            extra_flags.append(f"-Ddungeon.mode={self.parallel_mode}")
+        return extra_flags
+
+    def profile_config(self, class_name, grid, factor, seed, label, threads=None, cutoff=None, jvm_flags=None):
+        print(label)
+        extra_flags = self.config_flags(class_name, grid, threads, cutoff, jvm_flags)
+        if self.max_workers > 1 or threads:
+            # A fixed pool size is measured on exactly that many pinned cores
+            with self.reserved_cpus(threads or self.cpus_for(class_name)) as cpus:
+                result = self.run_program(class_name, grid, factor, seed, cpus=cpus, extra_flags=extra_flags)
+        else:
+            result = self.run_program(class_name, grid, factor, seed, extra_flags=extra_flags)
+        if result['cached_runs']:
+            print(f"  reused {result['cached_runs']} cached run(s), {result['runs'] - result['cached_runs']} new")
+        return self.make_record(class_name, grid, factor, seed, threads, cutoff, result, extra_flags)
+
+    def profile_interleaved(self, grid, factor, seed, label, threads=None, cutoff=None, jvm_flags=None):
+        """Measure serial and parallel together: every round runs one sample of each, in random order.
+
+        Warmup rounds are discarded; the policy's `runs` rounds are kept
+        (adaptive sampling and the result cache do not apply here, since
+        cached samples were not taken alongside the other program's).
+        """
+        print(label)
+        policy = self.measurement or MeasurementPolicy()
+        classes = [self.serial_class, self.parallel_class]
+        flags = {self.serial_class: self.config_flags(self.serial_class, grid, None, None, jvm_flags),
+                 self.parallel_class: self.config_flags(self.parallel_class, grid, threads, cutoff, jvm_flags)}
+        args = [str(grid), str(factor), str(seed)]
+        samples = {class_name: [] for class_name in classes}
+
+        def rounds(cpus):
+            widths = {self.serial_class: self.serial_cpus, self.parallel_class: threads or self.parallel_cpus}
+            for round_number in range(policy.warmup + policy.runs):
+                order = random.sample(classes, len(classes))
+                for class_name in order:
+                    class_cpus = cpus[:widths[class_name]] if cpus else None
+                    sample = self.run_sample(class_name, args, class_cpus, flags[class_name])
+                    if round_number >= policy.warmup:
+                        samples[class_name].append(sample)
+
+        if self.max_workers > 1 or threads:
+            # Both programs share one reservation wide enough for the parallel run
+            with self.reserved_cpus(max(self.serial_cpus, threads or self.parallel_cpus)) as cpus:
+                rounds(list(cpus))
+        else:
+            rounds(None)
+
+        records = {}
+        for class_name in classes:
+            result = summarise([t for t, _ in samples[class_name]], [o for _, o in samples[class_name]], policy)
+            result['cached_runs'] = 0
+            records[class_name] = self.make_record(class_name, grid, factor, seed,
+                                                   threads if class_name == self.parallel_class else None,
+                                                   cutoff if class_name == self.parallel_class else None,
+                                                   result, flags[class_name])
+        return records
+
+    def make_record(self, class_name, grid, factor, seed, threads, cutoff, result, extra_flags):
+        solution = self.extract_solution_info(result['outputs'][0]['stdout'])
+        usage = summarise_rusage([output.get('rusage') for output in result['outputs']])
+        pool_size = solution.get('threads', threads)
+        # End-to-end JVM time; cached runs from before it was recorded have none
+        wall_times = [output['wall_time'] for output in result['outputs'] if output.get('wall_time') is not None]
+        record = {
+            'grid_size': grid,
+            'num_searches_factor': factor,
+            'random_seed': seed,
+            'avg_time': result['avg_time'],
+            'std_time': result['std_time'],
+            'median_time': result['median_time'],
+            'ci_low': result['ci_low'],
+            'ci_high': result['ci_high'],
+            'runs': result['runs'],
+            'times': result['times'],
+            'wall_time': statistics.median(wall_times) if wall_times else None,
+            'threads': pool_size,
+            'cutoff': solution.get('cutoff', cutoff),
+            'rusage': usage,
+            'cpu_utilisation': cpu_utilisation(usage, pool_size or os.cpu_count()),
+            'phases': result_record.median_phases(output['stdout'] for output in result['outputs']),
+            'solution_info': solution
+        }
+        if self.interference:
+            record['host_state'] = summarise_host_states([output.get('host_state') for output in result['outputs']])
+            record['interfered_runs'] = sum(1 for output in result['outputs'] if output.get('interference'))
+            record['reruns'] = sum(output.get('reruns', 0) for output in result['outputs'])
+        if self.store:
+            # Runs that also rendered the PNGs are kept apart from the plain timings
+            self.store.add_result(class_name, record, list(extra_flags) + (["visualise"] if self.visualise else []))
+        return record
+
     def profile_version(self, class_name, grid_sizes, factors, seeds):
-        results = []
-        total_tests = len(grid_sizes) * len(factors) * len(seeds)
-        test_count = 0
-        for grid in grid_sizes:
-            for factor in factors:
-                for seed in seeds:
-                    test_count += 1
-                    print(f"Running {class_name} test {test_count}/{total_tests} — Grid: {grid}, Factor: {factor}, Seed: {seed}")
-                    result = self.run_program(class_name, grid, factor, seed)
-                    solution = self.extract_solution_info(result['outputs'][0]['stdout'])
-                    results.append({
-                        'grid_size': grid,
-                        'num_searches_factor': factor,
-                        'random_seed': seed,
-                        'avg_time': result['avg_time'],
-                        'std_time': result['std_time'],
-                        'solution_info': solution
-                    })
+        return self.profile_versions([class_name], grid_sizes, factors, seeds)[class_name]
+
+    def profile_versions(self, class_names, grid_sizes, factors, seeds, threads=None, cutoff=None,
+                         jvm_flags=None):
+        """Profile every configuration; `threads` fixes the parallel pool size (and its pinned cores),
+        `cutoff` the DungeonSearch sequential cutoff and `jvm_flags` the JVM option set"""
+        configs = [(grid, factor, seed) for grid in grid_sizes for factor in factors for seed in seeds]
+        if self.interleave and set(class_names) == {self.serial_class, self.parallel_class}:
+            pairs = []
+            for test_count, (grid, factor, seed) in enumerate(configs, 1):
+                label = f"Running interleaved test {test_count}/{len(configs)} — Grid: {grid}, Factor: {factor}, Seed: {seed}"
+                if threads:
+                    label += f", Threads: {threads}"
+                pairs.append((grid, factor, seed, label, threads, cutoff, jvm_flags))
+            if self.max_workers > 1:
+                with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                    paired = list(pool.map(lambda job: self.profile_interleaved(*job), pairs))
+            else:
+                paired = [self.profile_interleaved(*job) for job in pairs]
+            return {class_name: [records[class_name] for records in paired] for class_name in class_names}
+
+        jobs = []
+        for class_name in class_names:
+            pool_size = threads if class_name == self.parallel_class else None
+            search_cutoff = cutoff if class_name == self.parallel_class else None
+            for test_count, (grid, factor, seed) in enumerate(configs, 1):
+                label = f"Running {class_name} test {test_count}/{len(configs)} — Grid: {grid}, Factor: {factor}, Seed: {seed}"
+                if pool_size:
+                    label += f", Threads: {pool_size}"
+                if search_cutoff:
+                    label += f", Cutoff: {search_cutoff}"
+                jobs.append((class_name, grid, factor, seed, label, pool_size, search_cutoff, jvm_flags))
+
+        if self.max_workers > 1:
+            # Widest runs first: they take their cores exclusively, narrow serial runs then fill every core
+            order = sorted(range(len(jobs)), key=lambda i: -(jobs[i][5] or self.cpus_for(jobs[i][0])))
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {i: pool.submit(self.profile_config, *jobs[i]) for i in order}
+                records = [futures[i].result() for i in range(len(jobs))]
+        else:
+            records = [self.profile_config(*job) for job in jobs]
+
+        results = {class_name: [] for class_name in class_names}
+        for job, record in zip(jobs, records):
+            results[job[0]].append(record)
         return results
 
+    # ---------------- Reference Check ----------------
+    def check_reference(self, results):
+        peaks = {}
+        for record in results:
+            grid, seed = record['grid_size'], record['random_seed']
+            if seed <= 0:
+                continue  # unseeded boss placement cannot be reproduced
+            if (grid, seed) not in peaks:
+                reference = DungeonManaReference(grid, seed)
+                peaks[(grid, seed)] = (reference, reference.global_max())
+            reference, peak = peaks[(grid, seed)]
+            record['reference_check'] = reference.verify(record['solution_info'], peak)
+
+    @staticmethod
+    def reference_summary(results):
+        checks = [r['reference_check'] for r in results if 'reference_check' in r]
+        found = sum(1 for c in checks if c['found_global_max'])
+        inconsistent = sum(1 for c in checks if c['consistent'] is False)
+        return len(checks), found, inconsistent
+
     # ---------------- Speedup Calculation ----------------
+    def result_table(self):
+        return ResultTable.from_records({self.serial_class: self.serial_results,
+                                         self.parallel_class: self.parallel_results})
+
+    def speedup_percentiles(self, percentiles=(10, 50, 90)):
+        """Speedup percentiles per grid size over every factor and seed, computed on the columns"""
+        table = self.result_table()
+        serial_rows, _, speedups, _ = speedup_columns(table, self.serial_class, self.parallel_class,
+                                                      os.cpu_count() or 4)
+        if len(serial_rows) == 0:
+            return []
+        grid_ids, grids = table.key_ids(('grid_size',), serial_rows)
+        columns = [group_percentiles(speedups, grid_ids, q) for q in percentiles]
+        counts = np.bincount(grid_ids)
+        return [{'grid_size': int(grid[0]), 'points': int(count),
+                 **{f'p{q}': float(column[i]) for q, column in zip(percentiles, columns)}}
+                for i, (grid, count) in enumerate(zip(grids, counts))]
+
     def calculate_speedup(self):
+        table = self.result_table()
+        serial_rows, parallel_rows, speedups, efficiencies = speedup_columns(
+            table, self.serial_class, self.parallel_class, os.cpu_count() or 4)
         speedup_data = []
-        for s in self.serial_results:
-            p = next((p for p in self.parallel_results if
-                      p['grid_size']==s['grid_size'] and
-                      p['num_searches_factor']==s['num_searches_factor'] and
-                      p['random_seed']==s['random_seed']), None)
-            if p:
-                speedup = s['avg_time']/p['avg_time']
-                speedup_data.append({
-                    'grid_size': s['grid_size'],
-                    'num_searches_factor': s['num_searches_factor'],
-                    'random_seed': s['random_seed'],
-                    'serial_time': s['avg_time'],
-                    'parallel_time': p['avg_time'],
-                    'speedup': speedup,
-                    'efficiency': speedup / (os.cpu_count() or 4),
-                    'mana': s['solution_info'].get('mana','N/A'),
-                    'x_location': s['solution_info'].get('x','N/A'),
-                    'y_location': s['solution_info'].get('y','N/A'),
-                    'serial_grid_points': s['solution_info'].get('grid_points_evaluated','N/A'),
-                    'parallel_grid_points': p['solution_info'].get('grid_points_evaluated','N/A')
-                })
+        for i, j, speedup, efficiency in zip(serial_rows, parallel_rows, speedups.tolist(), efficiencies.tolist()):
+            s, p = table.records[i], table.records[j]
+            speedup_data.append({
+                'grid_size': s['grid_size'],
+                'num_searches_factor': s['num_searches_factor'],
+                'random_seed': s['random_seed'],
+                'serial_time': s['avg_time'],
+                'parallel_time': p['avg_time'],
+                'serial_median': s.get('median_time'),
+                'serial_ci_low': s.get('ci_low'),
+                'serial_ci_high': s.get('ci_high'),
+                'serial_runs': s.get('runs'),
+                'parallel_median': p.get('median_time'),
+                'parallel_ci_low': p.get('ci_low'),
+                'parallel_ci_high': p.get('ci_high'),
+                'parallel_runs': p.get('runs'),
+                'speedup': speedup,
+                'efficiency': efficiency,
+                'mana': s['solution_info'].get('mana','N/A'),
+                'x_location': s['solution_info'].get('x','N/A'),
+                'y_location': s['solution_info'].get('y','N/A'),
+                'serial_grid_points': s['solution_info'].get('grid_points_evaluated','N/A'),
+                'parallel_grid_points': p['solution_info'].get('grid_points_evaluated','N/A'),
+                'serial_cpu_utilisation': s.get('cpu_utilisation'),
+                'parallel_cpu_utilisation': p.get('cpu_utilisation'),
+                'serial_cpu_time': (s.get('rusage') or {}).get('cpu_time_ms'),
+                'parallel_cpu_time': (p.get('rusage') or {}).get('cpu_time_ms'),
+                'serial_max_rss_kb': (s.get('rusage') or {}).get('max_rss_kb'),
+                'parallel_max_rss_kb': (p.get('rusage') or {}).get('max_rss_kb'),
+                'parallel_voluntary_switches': (p.get('rusage') or {}).get('voluntary_switches'),
+                'parallel_involuntary_switches': (p.get('rusage') or {}).get('involuntary_switches'),
+                'parallel_major_faults': (p.get('rusage') or {}).get('major_faults')
+            })
         return speedup_data
 
     # ---------------- Generate Graphs ----------------
     def generate_speedup_graphs(self, speedup_data):
         for data in speedup_data:
             data['grid_area'] = data['grid_size']**2
+        area = np.array([d['grid_area'] for d in speedup_data])
+        speedup = np.array([d['speedup'] for d in speedup_data])
+        seed_column = np.array([d['random_seed'] for d in speedup_data])
+        factor_column = np.array([d['num_searches_factor'] for d in speedup_data])
+        # One sort gives every (seed, factor) curve, points ordered by grid area
+        curves = split_groups([seed_column, factor_column], order_by=area)
 
-        seeds = sorted(set(d['random_seed'] for d in speedup_data))
-        factors = sorted(set(d['num_searches_factor'] for d in speedup_data))
+        seeds = sorted(set(seed_column.tolist()))
+        factors = sorted(set(factor_column.tolist()))
+        empty = np.empty(0, dtype=np.int64)
 
         # By seed
         fig, axes = plt.subplots(1, len(seeds), figsize=(6*len(seeds),6))
@@ -137,8 +467,8 @@ class MinimalDungeonHunterProfiler:
         for i, seed in enumerate(seeds):
             ax = axes[i]
             for j, factor in enumerate(factors):
-                data = sorted([d for d in speedup_data if d['random_seed']==seed and d['num_searches_factor']==factor], key=lambda x: x['grid_area'])
-                ax.plot([d['grid_area'] for d in data],[d['speedup'] for d in data],'o-',color=colors[j],label=f'Factor {factor}')
+                rows = curves.get((seed, factor), empty)
+                ax.plot(area[rows],speedup[rows],'o-',color=colors[j],label=f'Factor {factor}')
             ax.axhline(1,color='black',linestyle='--',alpha=0.5)
             ax.set_xlabel('Grid Area')
             ax.set_ylabel('Speedup')
@@ -156,8 +486,8 @@ class MinimalDungeonHunterProfiler:
         for i, factor in enumerate(factors):
             ax = axes[i]
             for j, seed in enumerate(seeds):
-                data = sorted([d for d in speedup_data if d['random_seed']==seed and d['num_searches_factor']==factor], key=lambda x: x['grid_area'])
-                ax.plot([d['grid_area'] for d in data],[d['speedup'] for d in data],'o-',color=seed_colors[j],label=f'Seed {seed}')
+                rows = curves.get((seed, factor), empty)
+                ax.plot(area[rows],speedup[rows],'o-',color=seed_colors[j],label=f'Seed {seed}')
             ax.axhline(1,color='black',linestyle='--',alpha=0.5)
             ax.set_xlabel('Grid Area')
             ax.set_ylabel('Speedup')
@@ -168,6 +498,42 @@ class MinimalDungeonHunterProfiler:
         self.test_images.append(fig)
         plt.show()
 
+    def generate_phase_graph(self):
+        """Stacked per-phase bars per grid size (mean of the per-configuration medians)"""
+        versions = [(label, results) for label, results in (("Serial", self.serial_results),
+                                                            ("Parallel", self.parallel_results))
+                    if any(r.get('phases') for r in results)]
+        if not versions:
+            return
+        phase_names = list(result_record.PHASES.values())
+        colors = plt.cm.tab10(np.linspace(0, 1, len(phase_names)))
+        fig, axes = plt.subplots(1, len(versions), figsize=(8*len(versions), 6), sharey=True)
+        if len(versions) == 1: axes = [axes]
+        rows = []
+        for ax, (label, results) in zip(axes, versions):
+            timed = [r for r in results if r.get('phases')]
+            by_grid = split_groups([np.array([r['grid_size'] for r in timed])])
+            grids = [key[0] for key in by_grid]
+            bottom = np.zeros(len(grids))
+            for color, phase in zip(colors, phase_names):
+                phase_times = np.array([r['phases'].get(phase, 0.0) for r in timed])
+                values = np.array([phase_times[rows].mean() for rows in by_grid.values()])
+                ax.bar([str(g) for g in grids], values, bottom=bottom, color=color, label=phase.replace('_', ' '))
+                bottom += values
+                rows += [[label, grid, phase, value] for grid, value in zip(grids, values)]
+            ax.set_xlabel('Grid Size')
+            ax.set_ylabel('Time (ms)')
+            ax.set_title(f'{label} Phase Breakdown')
+            ax.legend(); ax.grid(True, axis='y', alpha=0.3)
+        plt.tight_layout()
+        plt.savefig(os.path.join(self.images_dir, "phase_breakdown.png"))
+        self.test_images.append(fig)
+        plt.show()
+        with open(f'{self.results_dir}/phase_breakdown.csv', 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["version", "grid_size", "phase", "mean_median_ms"])
+            writer.writerows(rows)
+
     # ---------------- Save Results ----------------
     def save_results(self):
         if self.verbose:
@@ -186,7 +552,12 @@ class MinimalDungeonHunterProfiler:
             "grid_size", "num_searches_factor", "random_seed",
             "mana", "x_location", "y_location",
             "serial_grid_points", "parallel_grid_points",
-            "serial_time", "parallel_time", "speedup", "efficiency"
+            "serial_time", "parallel_time", "speedup", "efficiency",
+            "serial_median", "serial_ci_low", "serial_ci_high", "serial_runs",
+            "parallel_median", "parallel_ci_low", "parallel_ci_high", "parallel_runs",
+            "serial_cpu_utilisation", "parallel_cpu_utilisation", "serial_cpu_time", "parallel_cpu_time",
+            "serial_max_rss_kb", "parallel_max_rss_kb",
+            "parallel_voluntary_switches", "parallel_involuntary_switches", "parallel_major_faults"
         ]
         with open(f'{self.results_dir}/speedup_analysis.csv', 'w', newline='') as f:
             if speedup_data:
@@ -200,6 +571,14 @@ class MinimalDungeonHunterProfiler:
             f.write("=" * 50 + "\n\n")
             f.write(f"Test Configuration:\n")
             f.write(f"- CPU cores available: {os.cpu_count()}\n")
+            if self.max_workers > 1:
+                f.write(f"- Concurrent workers: {self.max_workers} (serial runs pinned to {self.serial_cpus} core(s), "
+                        f"parallel runs to {self.parallel_cpus})\n")
+            f.write(f"- JVM per run: {'reused DungeonHunterServer' if self.use_server else 'fresh java process'}\n")
+            f.write(f"- Measurement: {(self.measurement or MeasurementPolicy()).describe()}\n")
+            f.write(f"- Run order: {'serial and parallel interleaved, random order per round' if self.interleave else 'all serial runs, then all parallel runs'}\n")
+            if self.interference:
+                f.write(f"- Interference control: {self.interference.describe()}\n")
             f.write(f"- Java classpath: {self.classpath}\n")
             f.write(f"- Java source path: {self.src_path}\n")
             f.write(f"- Serial class: {self.serial_class}\n")
@@ -213,6 +592,42 @@ class MinimalDungeonHunterProfiler:
                 f.write(f"- Average speedup: {statistics.mean([d['speedup'] for d in speedup_data]):.2f}x\n")
                 f.write(f"- Best efficiency: {max(speedup_data, key=lambda x: x['efficiency'])['efficiency']*100:.1f}%\n")
                 f.write(f"- Average efficiency: {statistics.mean([d['efficiency'] for d in speedup_data])*100:.1f}%\n\n")
+                f.write("Speedup by Grid Size (percentiles over factors and seeds):\n")
+                f.write("Grid_Size | P10    | Median | P90    | Points\n")
+                f.write("-" * 50 + "\n")
+                for row in self.speedup_percentiles():
+                    f.write(f"{row['grid_size']:9d} | {row['p10']:5.2f}x | {row['p50']:5.2f}x | "
+                            f"{row['p90']:5.2f}x | {row['points']}\n")
+                f.write("\n")
+            monitored = [r for r in self.serial_results + self.parallel_results if r.get('host_state')]
+            if monitored:
+                states = [r['host_state'] for r in monitored]
+                loads = [st['load_1m_before'] for st in states if st['load_1m_before'] is not None]
+                foreign = [st['foreign_cores_max'] for st in states if st['foreign_cores_max'] is not None]
+                ratios = [st['frequency_ratio_min'] for st in states if st['frequency_ratio_min'] is not None]
+                f.write("Host State (sampled before and during every run):\n")
+                f.write(f"- CPU governors: {', '.join(sorted({g for st in states for g in st['governors']})) or 'not exposed'}\n")
+                if loads:
+                    f.write(f"- 1-minute load before runs: median {statistics.median(loads):.2f}, max {max(loads):.2f}\n")
+                if foreign:
+                    f.write(f"- Foreign busy cores during a run: max {max(foreign):.2f}\n")
+                if ratios:
+                    f.write(f"- Lowest CPU frequency ratio: {min(ratios):.0%} of maximum\n")
+                f.write(f"- Runs re-run for interference: {sum(r['reruns'] for r in monitored)}\n")
+                flagged = [r for r in monitored if r['interfered_runs']]
+                f.write(f"- Configurations with runs still flagged: {len(flagged)}\n")
+                for r in flagged:
+                    f.write(f"    grid {r['grid_size']}, factor {r['num_searches_factor']}, seed {r['random_seed']}, "
+                            f"threads {r['threads']}: {r['interfered_runs']}/{r['runs']} run(s)\n")
+                f.write("\n")
+            if self.verify_reference:
+                f.write("Reference Check (NumPy mana map):\n")
+                for label, results in (("Serial", self.serial_results), ("Parallel", self.parallel_results)):
+                    checked, found, inconsistent = self.reference_summary(results)
+                    f.write(f"- {label}: {found}/{checked} runs found the global maximum, "
+                            f"{inconsistent} reported a mana value that does not match its location\n")
+                f.write("\n")
+            if speedup_data:
                 f.write("Solution Analysis:\n")
                 f.write("Grid_Size | Factor | Seed | Mana | Location | Serial_GridPts | Parallel_GridPts | Speedup\n")
                 f.write("-" * 90 + "\n")
@@ -226,6 +641,32 @@ class MinimalDungeonHunterProfiler:
                             f"{str(data['serial_grid_points']):13s} | {str(data['parallel_grid_points']):15s} | "
                             f"{data['speedup']:6.2f}x\n")
 
+                f.write("\nTiming Analysis (median [95% CI] ms, runs):\n")
+                f.write("Grid_Size | Factor | Seed | Serial                      | Parallel\n")
+                f.write("-" * 90 + "\n")
+                for data in speedup_data:
+                    f.write(f"{data['grid_size']:8d} | {data['num_searches_factor']:6.1f} | {data['random_seed']:4d} | "
+                            f"{self.format_interval(data, 'serial'):27s} | {self.format_interval(data, 'parallel')}\n")
+
+                measured = [d for d in speedup_data if d['parallel_cpu_utilisation'] is not None]
+                if measured:
+                    f.write("\nResource Usage (median per run; utilisation = cpu_time / (wall x threads)):\n")
+                    f.write(f"- Average serial CPU utilisation: "
+                            f"{statistics.mean(d['serial_cpu_utilisation'] or 0 for d in measured)*100:.1f}%\n")
+                    f.write(f"- Average parallel CPU utilisation: "
+                            f"{statistics.mean(d['parallel_cpu_utilisation'] for d in measured)*100:.1f}%\n")
+                    f.write("Grid_Size | Factor | Seed | Serial_Util | Parallel_Util | Parallel_CPU_ms | "
+                            "Parallel_MaxRSS_MB | Vol/Invol_Switches | Major_Faults\n")
+                    f.write("-" * 90 + "\n")
+                    for data in measured:
+                        serial_util = data['serial_cpu_utilisation']
+                        f.write(f"{data['grid_size']:8d} | {data['num_searches_factor']:6.1f} | {data['random_seed']:4d} | "
+                                f"{f'{serial_util*100:.1f}%' if serial_util is not None else 'N/A':>11s} | "
+                                f"{data['parallel_cpu_utilisation']*100:12.1f}% | {data['parallel_cpu_time']:15.0f} | "
+                                f"{data['parallel_max_rss_kb']/1024:18.1f} | "
+                                f"{data['parallel_voluntary_switches']:.0f}/{data['parallel_involuntary_switches']:.0f} | "
+                                f"{data['parallel_major_faults']:.0f}\n")
+
         # Save images
         for i, img in enumerate(self.test_images):
             img_path = os.path.join(self.images_dir, f'test_image_{i+1}.png')
@@ -235,21 +676,675 @@ class MinimalDungeonHunterProfiler:
 
         return speedup_data
 
+    @staticmethod
+    def format_interval(data, prefix):
+        median = data.get(f'{prefix}_median')
+        if median is None:
+            return "N/A"
+        return (f"{median:.1f} [{data[f'{prefix}_ci_low']:.1f}, {data[f'{prefix}_ci_high']:.1f}] "
+                f"(n={data[f'{prefix}_runs']})")
+
+    # ---------------- Strong Scaling ----------------
+    def run_scaling_analysis(self, grid_sizes=None, factors=None, seeds=None, thread_counts=None):
+        """Sweep the parallel pool size 1..N per configuration and fit Amdahl/Karp–Flatt per grid size"""
+        grid_sizes = grid_sizes or [50, 100, 150, 200, 315]
+        factors = factors or [1]
+        seeds = seeds or [3, 60, 90]
+        thread_counts = thread_counts or default_thread_counts(len(self.scheduler.cpus))
+
+        parallel_results = []
+        try:
+            self.serial_results = self.profile_version(self.serial_class, grid_sizes, factors, seeds)
+            for threads in thread_counts:
+                parallel_results += self.profile_versions([self.parallel_class], grid_sizes, factors, seeds,
+                                                          threads=threads)[self.parallel_class]
+        finally:
+            self.close_servers()
+
+        points = strong_scaling_points(self.serial_results, parallel_results)
+        fits = fit_strong_scaling(points)
+        self.save_scaling_results(parallel_results, points, fits)
+        self.generate_scaling_graph(fits)
+        for fit in fits:
+            print(self.format_scaling_fit(fit))
+        print("\nScaling analysis complete!")
+        return fits
+
+    @staticmethod
+    def format_scaling_fit(fit):
+        f = fit['serial_fraction']
+        limit = f"{fit['max_speedup']:.1f}x" if fit['max_speedup'] else "unbounded"
+        karp_flatt = ", ".join(f"{t}:{e:.3f}" for t, e in zip(fit['threads'], fit['karp_flatt']) if e is not None)
+        return (f"Grid {fit['grid_size']:4d}: serial fraction {f:.3f} (speedup limit {limit}), "
+                f"best {max(fit['speedups']):.2f}x, knee at {fit['knee']} threads, Karp–Flatt [{karp_flatt}]")
+
+    def save_scaling_results(self, parallel_results, points, fits):
+        with open(f'{self.results_dir}/scaling_parallel_results.json', 'w') as f:
+            json.dump(parallel_results, f, indent=2)
+        with open(f'{self.results_dir}/strong_scaling.csv', 'w', newline='') as f:
+            if points:
+                writer = csv.DictWriter(f, fieldnames=list(points[0].keys()))
+                writer.writeheader()
+                writer.writerows(points)
+        with open(f'{self.results_dir}/strong_scaling_summary.txt', 'w') as f:
+            f.write("DUNGEON HUNTER STRONG SCALING\n")
+            f.write("=" * 50 + "\n\n")
+            f.write(f"- CPU cores available: {len(self.scheduler.cpus)}\n")
+            f.write(f"- Pool sizes: {', '.join(str(t) for t in sorted({p['threads'] for p in points}))}\n")
+            f.write(f"- Measurement: {(self.measurement or MeasurementPolicy()).describe()}\n")
+            f.write("- Speedup is serial median / parallel median, median over factors and seeds per grid size\n\n")
+            for fit in fits:
+                f.write(self.format_scaling_fit(fit) + "\n")
+
+    def generate_scaling_graph(self, fits):
+        if not fits:
+            return
+        fig, axes = plt.subplots(1, 2, figsize=(12, 6))
+        colors = plt.cm.tab10(np.linspace(0, 1, len(fits)))
+        max_threads = max(max(fit['threads']) for fit in fits)
+        ideal = np.arange(1, max_threads + 1)
+        axes[0].plot(ideal, ideal, 'k--', alpha=0.5, label='Ideal')
+        for color, fit in zip(colors, fits):
+            axes[0].plot(fit['threads'], fit['speedups'], 'o', color=color, label=f"Grid {fit['grid_size']}")
+            if fit['serial_fraction'] is not None:
+                axes[0].plot(ideal, [amdahl_speedup(fit['serial_fraction'], t) for t in ideal], '-', color=color,
+                             alpha=0.6)
+            kf = [(t, e) for t, e in zip(fit['threads'], fit['karp_flatt']) if e is not None]
+            axes[1].plot([t for t, _ in kf], [e for _, e in kf], 'o-', color=color, label=f"Grid {fit['grid_size']}")
+        axes[0].set_xlabel('Threads'); axes[0].set_ylabel('Speedup')
+        axes[0].set_title('Strong Scaling (lines: Amdahl fit)')
+        axes[1].set_xlabel('Threads'); axes[1].set_ylabel('Karp–Flatt serial fraction')
+        axes[1].set_title('Karp–Flatt Metric')
+        for ax in axes:
+            ax.legend(); ax.grid(True, alpha=0.3)
+        plt.tight_layout()
+        plt.savefig(os.path.join(self.images_dir, "strong_scaling.png"))
+        self.test_images.append(fig)
+        plt.show()
+
+    # ---------------- Weak Scaling ----------------
+    def run_weak_scaling_analysis(self, base_grids=None, base_factor=1, seeds=None, thread_counts=None,
+                                  scale="grid"):
+        """Grow the problem with the pool size (constant work per thread) and report scaled efficiency"""
+        base_grids = base_grids or [50, 100]
+        seeds = seeds or [3, 60, 90]
+        thread_counts = thread_counts or default_thread_counts(len(self.scheduler.cpus))
+
+        runs = []
+        try:
+            for base in base_grids:
+                for threads in thread_counts:
+                    grid, factor = weak_scaling_config(base, base_factor, threads, scale)
+                    records = self.profile_versions([self.parallel_class], [grid], [factor], seeds,
+                                                    threads=threads)[self.parallel_class]
+                    runs += [(base, threads, record) for record in records]
+        finally:
+            self.close_servers()
+
+        points = weak_scaling_points(runs)
+        with open(f'{self.results_dir}/weak_scaling_results.json', 'w') as f:
+            json.dump([dict(record, base_grid=base) for base, _, record in runs], f, indent=2)
+        with open(f'{self.results_dir}/weak_scaling.csv', 'w', newline='') as f:
+            if points:
+                writer = csv.DictWriter(f, fieldnames=list(points[0].keys()))
+                writer.writeheader()
+                writer.writerows(points)
+        self.generate_weak_scaling_graph(points, scale)
+        for point in points:
+            efficiency = point['scaled_efficiency']
+            rate = point['points_per_second_per_core']
+            print(f"Base {point['base_grid']:4d} -> grid {point['grid_size']:4d}, factor {point['num_searches_factor']}, "
+                  f"seed {point['random_seed']}, {point['threads']:3d} threads: "
+                  f"scaled efficiency {f'{efficiency * 100:.1f}%' if efficiency else 'N/A'}, "
+                  f"{f'{rate:,.0f}' if rate else 'N/A'} points/s/core")
+        print("\nWeak scaling analysis complete!")
+        return points
+
+    def generate_weak_scaling_graph(self, points, scale="grid"):
+        if not points:
+            return
+        bases = sorted(set(p['base_grid'] for p in points))
+        colors = plt.cm.tab10(np.linspace(0, 1, len(bases)))
+        fig, axes = plt.subplots(1, 2, figsize=(12, 6))
+        for color, base in zip(colors, bases):
+            by_threads = {}
+            for p in points:
+                if p['base_grid'] == base:
+                    by_threads.setdefault(p['threads'], []).append(p)
+            threads = sorted(by_threads)
+            efficiency = [statistics.median([p['scaled_efficiency'] or 0 for p in by_threads[t]]) for t in threads]
+            rate = [statistics.median([p['points_per_second_per_core'] or 0 for p in by_threads[t]]) for t in threads]
+            axes[0].plot(threads, efficiency, 'o-', color=color, label=f'Base grid {base}')
+            axes[1].plot(threads, rate, 'o-', color=color, label=f'Base grid {base}')
+        axes[0].axhline(1, color='black', linestyle='--', alpha=0.5)
+        axes[0].set_xlabel('Threads'); axes[0].set_ylabel('Scaled efficiency T(1)/T(p)')
+        axes[0].set_title(f'Weak Scaling ({"grid side x sqrt(p)" if scale == "grid" else "factor x p"})')
+        axes[1].set_xlabel('Threads'); axes[1].set_ylabel('Grid points evaluated / s / core')
+        axes[1].set_title('Per-core Throughput')
+        for ax in axes:
+            ax.legend(); ax.grid(True, alpha=0.3)
+        plt.tight_layout()
+        plt.savefig(os.path.join(self.images_dir, "weak_scaling.png"))
+        self.test_images.append(fig)
+        plt.show()
+
+    # ---------------- Racy/Deterministic Modes ----------------
+    def run_mode_comparison(self, grid_sizes=None, factors=None, seeds=None, tolerance=0.05):
+        """Time DungeonHunterParallel's deterministic mode against the racy default.
+
+        Overhead per (grid, factor) is the geometric mean over seeds of
+        deterministic median / racy median, with the band from the medians'
+        confidence intervals (crossover_search.point_speedup). The mode is
+        reported fit for production only when the upper end of the overall
+        band stays within `tolerance` (0.05 = 5%) of the racy mode.
+        """
+        grid_sizes = grid_sizes or [50, 100, 200, 315]
+        factors = factors or [0.1, 1, 3]
+        seeds = seeds or [3, 60, 90]
+
+        by_mode = {}
+        configured = self.parallel_mode
+        try:
+            for mode in ("racy", "deterministic"):
+                self.parallel_mode = None if mode == "racy" else mode
+                by_mode[mode] = self.profile_versions([self.parallel_class], grid_sizes, factors,
+                                                      seeds)[self.parallel_class]
+        finally:
+            self.parallel_mode = configured
+            self.close_servers()
+
+        points = []
+        for grid in grid_sizes:
+            for factor in factors:
+                def matching(mode):
+                    return [r for r in by_mode[mode] if r['grid_size'] == grid and r['num_searches_factor'] == factor]
+                point = point_speedup(matching("deterministic"), matching("racy"))
+                if point:
+                    points.append(dict(point, grid_size=grid, num_searches_factor=factor))
+
+        def geometric_mean(values):
+            return math.exp(sum(math.log(v) for v in values) / len(values)) if values else None
+
+        overall = {key: geometric_mean([p[key] for p in points]) for key in ('speedup', 'low', 'high')}
+        fit = overall['high'] is not None and overall['high'] <= 1 + tolerance
+        with open(f'{self.results_dir}/mode_results.json', 'w') as f:
+            json.dump({mode: records for mode, records in by_mode.items()}, f, indent=2)
+        with open(f'{self.results_dir}/mode_comparison.csv', 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["grid_size", "num_searches_factor", "overhead", "overhead_low", "overhead_high", "seeds"])
+            for p in points:
+                writer.writerow([p['grid_size'], p['num_searches_factor'], p['speedup'], p['low'], p['high'],
+                                 p['seeds']])
+        with open(f'{self.results_dir}/mode_summary.txt', 'w') as f:
+            f.write("RACY VS DETERMINISTIC PARALLEL MODE\n")
+            f.write("=" * 50 + "\n\n")
+            f.write(f"- Measurement: {(self.measurement or MeasurementPolicy()).describe()}\n")
+            f.write("- Overhead: deterministic median / racy median (1.00 = same time)\n\n")
+            f.write("Grid_Size | Factor | Overhead | Band\n")
+            f.write("-" * 45 + "\n")
+            for p in points:
+                f.write(f"{p['grid_size']:9d} | {p['num_searches_factor']:6.1f} | {p['speedup']:8.3f} | "
+                        f"{p['low']:.3f}-{p['high']:.3f}\n")
+            if overall['speedup'] is not None:
+                f.write(f"\nOverall overhead {overall['speedup']:.3f} (band {overall['low']:.3f}-{overall['high']:.3f}): ")
+                f.write(f"{'within' if fit else 'NOT within'} {tolerance:.0%} of the racy mode\n")
+        if overall['speedup'] is not None:
+            print(f"\nDeterministic mode takes {overall['speedup']:.3f}x the racy time "
+                  f"(band {overall['low']:.3f}-{overall['high']:.3f}); "
+                  f"{'within' if fit else 'NOT within'} {tolerance:.0%}")
+        return points
+
+    # ---------------- Crossover Search ----------------
+    def run_crossover_search(self, factors=None, seeds=None, coarse_grids=None, budget=None, min_gap=2,
+                             gradient_threshold=0.25):
+        """Find the grid size where DungeonHunterParallel starts beating DungeonHunter, per factor.
+
+        Every factor starts from `coarse_grids`; then the most valuable
+        interval over all factors (crossover brackets first, then steep
+        speedup changes, see crossover_search.interval_priority) is split at
+        its geometric midpoint until no interval is left or the next point
+        would exceed `budget` program runs (default: a third of run_analysis).
+        """
+        factors = factors or [0.1, 1, 3]
+        seeds = seeds or [3, 60]
+        coarse_grids = sorted(coarse_grids or COARSE_GRIDS)
+        runs_per_config = (self.measurement or MeasurementPolicy()).runs
+        point_cost = 2 * len(seeds) * runs_per_config
+        # run_analysis: 15 grid sizes x 3 factors x 3 seeds, both programs
+        full_matrix = 15 * 3 * 3 * 2 * runs_per_config
+        budget = budget or full_matrix // 3
+
+        curves = {factor: [] for factor in factors}
+        records = []
+        spent = 0
+
+        def measure_point(grid, factor):
+            results = self.profile_versions([self.serial_class, self.parallel_class], [grid], [factor], seeds)
+            serial, parallel = results[self.serial_class], results[self.parallel_class]
+            records.extend(serial + parallel)
+            point = point_speedup(serial, parallel)
+            if point:
+                curves[factor].append(dict(point, grid_size=grid, num_searches_factor=factor))
+                curves[factor].sort(key=lambda p: p['grid_size'])
+            return sum(r['runs'] for r in serial + parallel)
+
+        try:
+            for factor in factors:
+                for grid in coarse_grids:
+                    spent += measure_point(grid, factor)
+            while spent + point_cost <= budget:
+                candidates = [(interval, factor) for factor in factors
+                              for interval in [next_interval(curves[factor], min_gap, gradient_threshold)] if interval]
+                if not candidates:
+                    break
+                (priority, low, high), factor = max(candidates, key=lambda c: c[0])
+                print(f"Refining factor {factor} between grid {low} and {high} "
+                      f"({'crossover' if priority[0] == 3 else 'uncertain' if priority[0] == 2 else 'steep'})")
+                spent += measure_point(midpoint(low, high), factor)
+        finally:
+            self.close_servers()
+
+        estimates = [dict(estimate, num_searches_factor=factor)
+                     for factor in factors for estimate in crossover_estimates(curves[factor])]
+        with open(f'{self.results_dir}/crossover_results.json', 'w') as f:
+            json.dump(records, f, indent=2)
+        with open(f'{self.results_dir}/crossover_points.csv', 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["num_searches_factor", "grid_size", "speedup", "speedup_low", "speedup_high", "seeds"])
+            for factor in factors:
+                for p in curves[factor]:
+                    writer.writerow([factor, p['grid_size'], p['speedup'], p['low'], p['high'], p['seeds']])
+        with open(f'{self.results_dir}/crossover_summary.txt', 'w') as f:
+            f.write("SERIAL/PARALLEL CROSSOVER SEARCH\n")
+            f.write("=" * 50 + "\n\n")
+            f.write(f"- Program runs: {spent} (budget {budget}; the full run_analysis matrix is {full_matrix})\n")
+            f.write(f"- Seeds per point: {seeds}\n\n")
+            for factor in factors:
+                found = [e for e in estimates if e['num_searches_factor'] == factor]
+                f.write(f"Factor {factor}: {len(curves[factor])} grid sizes measured\n")
+                if not found:
+                    speedups = [p['speedup'] for p in curves[factor]]
+                    verdict = ("parallel faster everywhere" if speedups and min(speedups) > 1
+                               else "serial faster everywhere" if speedups and max(speedups) < 1 else "no data")
+                    f.write(f"  no crossover in [{coarse_grids[0]}, {coarse_grids[-1]}]: {verdict}\n")
+                for e in found:
+                    f.write(f"  crossover at grid {e['crossover_grid']:.1f} "
+                            f"(uncertainty {e['uncertainty_low']:.1f}-{e['uncertainty_high']:.1f}, "
+                            f"bracket {e['bracket_low']}-{e['bracket_high']}), {e['direction']}\n")
+        self.generate_crossover_graph(curves, estimates)
+        for e in estimates:
+            print(f"Factor {e['num_searches_factor']}: crossover at grid {e['crossover_grid']:.1f} "
+                  f"[{e['uncertainty_low']:.1f}, {e['uncertainty_high']:.1f}], {e['direction']}")
+        print(f"\nCrossover search used {spent} runs ({spent / full_matrix:.0%} of the full matrix)")
+        return estimates
+
+    def generate_crossover_graph(self, curves, estimates):
+        if not any(curves.values()):
+            return
+        colors = plt.cm.tab10(np.linspace(0, 1, len(curves)))
+        fig, ax = plt.subplots(figsize=(8, 6))
+        for color, (factor, points) in zip(colors, curves.items()):
+            grids = [p['grid_size'] for p in points]
+            ax.plot(grids, [p['speedup'] for p in points], 'o-', color=color, label=f'Factor {factor}')
+            ax.fill_between(grids, [p['low'] for p in points], [p['high'] for p in points], color=color, alpha=0.2)
+            for e in estimates:
+                if e['num_searches_factor'] == factor:
+                    ax.axvspan(e['uncertainty_low'], e['uncertainty_high'], color=color, alpha=0.1)
+                    ax.axvline(e['crossover_grid'], color=color, linestyle=':')
+        ax.axhline(1, color='black', linestyle='--', alpha=0.5)
+        ax.set_xscale('log')
+        ax.set_xlabel('Grid Size')
+        ax.set_ylabel('Speedup (serial / parallel median)')
+        ax.set_title('Serial/Parallel Crossover')
+        ax.legend(); ax.grid(True, alpha=0.3)
+        plt.tight_layout()
+        plt.savefig(os.path.join(self.images_dir, "crossover.png"))
+        self.test_images.append(fig)
+        plt.show()
+
+    # ---------------- Eager/Lazy Fill ----------------
+    def run_fill_crossover(self, grid_sizes=None, factors=None, seeds=None):
+        """Find the search factor where filling the mana map eagerly beats lazy evaluation, per grid size.
+
+        DungeonHunterParallel runs with -Ddungeon.fill=lazy and =eager at every
+        point; speedup is lazy / eager median, so above 1 eager wins. Crossovers
+        are reported as factors and as the expected coverage the auto mode
+        compares with -Ddungeon.eagerCoverage (DungeonMapParallel.expectedCoverage).
+        The median coverage of the crossovers above which eager wins is saved to
+        the fill tuning file, and later runs pass it with -Ddungeon.fill=auto.
+        """
+        grid_sizes = grid_sizes or [50, 150, 315]
+        factors = sorted(factors or FILL_FACTORS)
+        seeds = seeds or [3, 60]
+
+        records = []
+        curves = {}
+        try:
+            for grid in grid_sizes:
+                by_fill = {}
+                for fill in ("lazy", "eager"):
+                    flags = self.tuned_jvm_flags(grid) + [f"-Ddungeon.fill={fill}"]
+                    by_fill[fill] = self.profile_versions([self.parallel_class], [grid], factors, seeds,
+                                                          jvm_flags=flags)[self.parallel_class]
+                    records.extend(dict(r, fill=fill) for r in by_fill[fill])
+                curves[grid] = []
+                for factor in factors:
+                    point = point_speedup([r for r in by_fill["lazy"] if r['num_searches_factor'] == factor],
+                                          [r for r in by_fill["eager"] if r['num_searches_factor'] == factor])
+                    if point:
+                        curves[grid].append(dict(point, grid_size=grid, num_searches_factor=factor,
+                                                 expected_coverage=expected_coverage(grid, factor)))
+        finally:
+            self.close_servers()
+
+        estimates = []
+        for grid in grid_sizes:
+            for e in crossover_estimates(curves[grid], axis='num_searches_factor', faster='eager'):
+                estimates.append(dict(e, grid_size=grid,
+                                      expected_coverage=expected_coverage(grid, e['crossover_factor'])))
+        with open(f'{self.results_dir}/fill_results.json', 'w') as f:
+            json.dump(records, f, indent=2)
+        with open(f'{self.results_dir}/fill_points.csv', 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["grid_size", "num_searches_factor", "expected_coverage", "speedup", "speedup_low",
+                             "speedup_high", "seeds"])
+            for grid in grid_sizes:
+                for p in curves[grid]:
+                    writer.writerow([grid, p['num_searches_factor'], p['expected_coverage'], p['speedup'], p['low'],
+                                     p['high'], p['seeds']])
+        upward = [e for e in estimates if e['direction'] == "eager faster above"]
+        suggested = statistics.median(e['expected_coverage'] for e in upward) if upward else None
+        with open(f'{self.results_dir}/fill_summary.txt', 'w') as f:
+            f.write("EAGER/LAZY MANA FILL CROSSOVER\n")
+            f.write("=" * 50 + "\n\n")
+            f.write("- Speedup: lazy median / eager median (above 1: eager fill wins)\n")
+            f.write(f"- Factors: {factors}, seeds: {seeds}\n\n")
+            for grid in grid_sizes:
+                found = [e for e in estimates if e['grid_size'] == grid]
+                f.write(f"Grid {grid}:\n")
+                if not found:
+                    speedups = [p['speedup'] for p in curves[grid]]
+                    verdict = ("eager faster everywhere" if speedups and min(speedups) > 1
+                               else "lazy faster everywhere" if speedups and max(speedups) < 1 else "no data")
+                    f.write(f"  no crossover in factors [{factors[0]}, {factors[-1]}]: {verdict}\n")
+                for e in found:
+                    f.write(f"  crossover at factor {e['crossover_factor']:.3g} "
+                            f"(uncertainty {e['uncertainty_low']:.3g}-{e['uncertainty_high']:.3g}), "
+                            f"expected coverage {e['expected_coverage']:.0%}, {e['direction']}\n")
+            if suggested is not None:
+                f.write(f"\nMedian crossover coverage {suggested:.2f}"
+                        + (f", recorded in {self.fill_tuning_path}\n" if self.fill_tuning_path else "\n"))
+        self.generate_fill_graph(curves, estimates)
+        for e in estimates:
+            print(f"Grid {e['grid_size']}: crossover at factor {e['crossover_factor']:.3g} "
+                  f"(expected coverage {e['expected_coverage']:.0%}), {e['direction']}")
+        if suggested is not None and self.fill_tuning_path:
+            # Later runs fill eagerly above the measured coverage (-Ddungeon.fill=auto)
+            self.fill_tuning = write_fill_tuning(suggested, upward, self.fill_tuning_path)
+            print(f"\nEager fill above {suggested:.2f} expected coverage recorded in {self.fill_tuning_path}")
+        return estimates
+
+    def generate_fill_graph(self, curves, estimates):
+        if not any(curves.values()):
+            return
+        colors = plt.cm.tab10(np.linspace(0, 1, len(curves)))
+        fig, ax = plt.subplots(figsize=(8, 6))
+        for color, (grid, points) in zip(colors, curves.items()):
+            coverage = [p['expected_coverage'] for p in points]
+            ax.plot(coverage, [p['speedup'] for p in points], 'o-', color=color, label=f'Grid {grid}')
+            ax.fill_between(coverage, [p['low'] for p in points], [p['high'] for p in points], color=color, alpha=0.2)
+            for e in estimates:
+                if e['grid_size'] == grid:
+                    ax.axvline(e['expected_coverage'], color=color, linestyle=':')
+        ax.axhline(1, color='black', linestyle='--', alpha=0.5)
+        ax.set_xlabel('Expected Coverage')
+        ax.set_ylabel('Speedup (lazy / eager median)')
+        ax.set_title('Eager/Lazy Mana Fill Crossover')
+        ax.legend(); ax.grid(True, alpha=0.3)
+        plt.tight_layout()
+        plt.savefig(os.path.join(self.images_dir, "fill_crossover.png"))
+        self.test_images.append(fig)
+        plt.show()
+
+    # ---------------- Cutoff Tuning ----------------
+    def run_cutoff_tuning(self, grid_sizes=None, factors=None, seeds=None, thread_counts=None):
+        """Search the DungeonSearch sequential cutoff per (gridSize, numSearches, threads) bucket.
+
+        Candidates are 1, 4, 16, ... up to one chunk per thread plus the old
+        default of 10, then the geometric midpoints around the best one; the
+        fastest median over the seeds wins and is merged into the tuning table.
+        """
+        grid_sizes = grid_sizes or [25, 50, 100, 200, 315]
+        factors = factors or [0.1, 1, 3]
+        seeds = seeds or [3]
+        thread_counts = thread_counts or [len(self.scheduler.cpus)]
+
+        winners = []
+        try:
+            for grid in grid_sizes:
+                for factor in factors:
+                    searches = num_searches(grid, factor)
+                    for threads in thread_counts:
+                        timings = {}
+
+                        def try_cutoffs(cutoffs):
+                            for cutoff in cutoffs:
+                                records = self.profile_versions([self.parallel_class], [grid], [factor], seeds,
+                                                                threads=threads, cutoff=cutoff)[self.parallel_class]
+                                timings[cutoff] = statistics.median(r['median_time'] for r in records)
+
+                        try_cutoffs(sorted(set(coarse_cutoffs(searches, threads)) | {DEFAULT_CUTOFF}))
+                        best = min(timings, key=timings.get)
+                        try_cutoffs(refine_cutoffs(best, list(timings)))
+                        best = min(timings, key=timings.get)
+                        print(f"Grid {grid}, {searches} searches, {threads} threads: cutoff {best} "
+                              f"({timings[best]:.1f} ms; default {DEFAULT_CUTOFF}: {timings[DEFAULT_CUTOFF]:.1f} ms)")
+                        winners.append({'grid_size': grid, 'num_searches': searches, 'threads': threads,
+                                        'cutoff': best})
+        finally:
+            self.close_servers()
+
+        buckets = write_tuning_table(winners, self.tuning_path)
+        print(f"\nTuning table {self.tuning_path} now has {buckets} bucket(s)")
+        return winners
+
+    # ---------------- JVM Option Matrix ----------------
+    def run_jvm_matrix(self, option_sets=None, grid_sizes=None, factors=None, seeds=None, class_names=None,
+                       tuning_path=JVM_TUNING_FILE):
+        """Run the sweep once per JVM option set, rank the sets per grid band and record the winners.
+
+        Sets are ranked on end-to-end wall time of the JVM process: the
+        programs' own timer covers the search only and misses the startup,
+        heap and GC costs these flags change. CPU time is ranked alongside.
+        """
+        if self.use_server:
+            print("Warning: server mode reuses one JVM per option set, so JVM startup is not part of the ranking")
+        option_sets = supported_option_sets(self.java_path, option_sets or default_option_sets())
+        grid_sizes = grid_sizes or [10, 50, 100, 200, 315]
+        factors = factors or [1]
+        seeds = seeds or [3, 60, 90]
+        class_names = class_names or [self.serial_class, self.parallel_class]
+
+        runs = {class_name: [] for class_name in class_names}
+        try:
+            for name, flags in option_sets.items():
+                print(f"\nJVM option set '{name}': {' '.join(flags) or '(JVM defaults)'}")
+                results = self.profile_versions(class_names, grid_sizes, factors, seeds, jvm_flags=flags)
+                for class_name in class_names:
+                    runs[class_name] += [(name, record) for record in results[class_name]]
+        finally:
+            self.close_servers()
+
+        with open(f'{self.results_dir}/jvm_matrix.csv', 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["class", "option_set", "flags", "grid_size", "num_searches_factor", "random_seed",
+                             "median_time", "ci_low", "ci_high", "runs", "wall_time", "cpu_time_ms"])
+            for class_name, class_runs in runs.items():
+                for name, r in class_runs:
+                    writer.writerow([class_name, name, " ".join(option_sets[name]), r['grid_size'],
+                                     r['num_searches_factor'], r['random_seed'], r['median_time'], r['ci_low'],
+                                     r['ci_high'], r['runs'], r['wall_time'], cpu_time(r)])
+
+        # Production launches use the parallel program, so its ranking decides the recorded winners
+        ranked_class = self.parallel_class if self.parallel_class in runs else class_names[0]
+        rankings = {class_name: rank_option_sets(class_runs) for class_name, class_runs in runs.items()}
+        cpu_rankings = {class_name: rank_option_sets(class_runs, cpu_time) for class_name, class_runs in runs.items()}
+        bands = write_jvm_tuning(rankings[ranked_class], option_sets, tuning_path)
+
+        with open(f'{self.results_dir}/jvm_matrix_summary.txt', 'w') as f:
+            f.write("DUNGEON HUNTER JVM OPTION MATRIX\n")
+            f.write("=" * 50 + "\n\n")
+            f.write(f"- Measurement: {(self.measurement or MeasurementPolicy()).describe()}\n")
+            f.write(f"- Relative time: geometric mean of end-to-end wall time / '{BASELINE}' wall time per "
+                    f"configuration (configurations without a '{BASELINE}' run are left out)\n\n")
+            for class_name, class_rankings in rankings.items():
+                f.write(f"{class_name}:\n")
+                for band, _, _ in GRID_BANDS:
+                    if band in class_rankings:
+                        ranking = ", ".join(f"{name} {score:.3f}" for name, score in class_rankings[band])
+                        f.write(f"- {band}: {ranking}\n")
+                    if band in cpu_rankings[class_name]:
+                        ranking = ", ".join(f"{name} {score:.3f}" for name, score in cpu_rankings[class_name][band])
+                        f.write(f"  {band} CPU time: {ranking}\n")
+                f.write("\n")
+        for band, entry in bands.items():
+            print(f"{band} grids: {entry['winner']} ({' '.join(entry['flags']) or 'JVM defaults'}), "
+                  f"relative time {entry['ranking'][0]['relative_time']:.3f}")
+        print(f"\nWinning flags recorded in {tuning_path}")
+        return rankings
+
+    # ---------------- Regression Gate ----------------
+    def run_regression_check(self, baseline_dir, threshold=0.05, alpha=0.05, runs=10, class_names=None):
+        """Re-run every (grid, factor, seed) point of a stored baseline and test it for a slowdown.
+
+        Each point is compared with a Mann-Whitney test on the raw times and
+        Cliff's delta as effect size, or with a Welch t-test on the summary of
+        baselines saved without raw times (see regression_gate.compare_point).
+        Returns the regressions and keeps the untested points in
+        self.untested_points (None without a baseline); the new results are saved so the run can serve
+        as the next baseline.
+        """
+        self.untested_points = None  # None: no baseline to test against
+        baseline = load_baseline(baseline_dir)
+        class_names = [c for c in (class_names or [self.serial_class, self.parallel_class]) if c in baseline]
+        if not class_names:
+            print(f"No serial_results.json or parallel_results.json in {baseline_dir}")
+            return []
+        # Three runs per side can never reach p < 0.05, so sample more unless a policy was given
+        self.measurement = self.measurement or MeasurementPolicy(runs=runs)
+
+        comparisons = []
+        try:
+            for class_name in class_names:
+                points = baseline[class_name]
+                for count, (key, record) in enumerate(sorted(points.items()), 1):
+                    grid, factor, seed = key
+                    threads = record.get('threads') if class_name == self.parallel_class else None
+                    cutoff = record.get('cutoff') if class_name == self.parallel_class else None
+                    label = (f"Regression check {class_name} {count}/{len(points)} — "
+                             f"Grid: {grid}, Factor: {factor}, Seed: {seed}")
+                    current = self.profile_config(class_name, grid, factor, seed, label, threads=threads, cutoff=cutoff)
+                    (self.serial_results if class_name == self.serial_class else self.parallel_results).append(current)
+                    comparison = compare_point(record, current, alpha, threshold)
+                    comparison['class'] = class_name
+                    comparisons.append(comparison)
+        finally:
+            self.close_servers()
+
+        with open(f'{self.results_dir}/serial_results.json', 'w') as f:
+            json.dump(self.serial_results, f, indent=2)
+        with open(f'{self.results_dir}/parallel_results.json', 'w') as f:
+            json.dump(self.parallel_results, f, indent=2)
+        fields = ["class", "grid_size", "num_searches_factor", "random_seed", "baseline_time", "current_time",
+                  "ratio", "baseline_runs", "current_runs", "u_statistic", "p_value", "method", "cliffs_delta",
+                  "effect", "verdict"]
+        with open(f'{self.results_dir}/regression_report.csv', 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(comparisons)
+
+        regressions = [c for c in comparisons if c['verdict'] == "regression"]
+        with open(f'{self.results_dir}/regression_summary.txt', 'w') as f:
+            f.write("DUNGEON HUNTER PERFORMANCE REGRESSION CHECK\n")
+            f.write("=" * 50 + "\n\n")
+            f.write(f"- Baseline: {baseline_dir}\n")
+            f.write(f"- Measurement: {self.measurement.describe()}\n")
+            f.write(f"- Regression: Mann-Whitney p < {alpha} and median slower by more than {threshold:.0%} "
+                    f"(baselines without raw times: Welch t-test on their mean)\n")
+            for verdict in ("regression", "improvement", "within threshold", "no significant change", "untested"):
+                f.write(f"- {verdict}: {sum(1 for c in comparisons if c['verdict'] == verdict)}\n")
+            untested = [c for c in comparisons if c['verdict'] == "untested"]
+            if untested:
+                f.write(f"  ({len(untested)} baseline point(s) have neither raw times nor a mean and deviation; "
+                        f"only the ratio is shown)\n")
+            f.write("\nClass | Grid_Size | Factor | Seed | Baseline_ms | Current_ms | Ratio | p | Cliff's_delta | Verdict\n")
+            f.write("-" * 100 + "\n")
+            for c in comparisons:
+                p_value = f"{c['p_value']:.4f}" if c['p_value'] is not None else "N/A"
+                delta = f"{c['cliffs_delta']:+.2f} ({c['effect']})" if c['cliffs_delta'] is not None else "N/A"
+                f.write(f"{c['class']} | {c['grid_size']:8d} | {c['num_searches_factor']:6.1f} | "
+                        f"{c['random_seed']:4d} | {c['baseline_time']:11.1f} | {c['current_time']:10.1f} | "
+                        f"{c['ratio']:5.2f} | {p_value} | {delta} | {c['verdict']}\n")
+
+        for c in regressions:
+            print(f"REGRESSION {c['class']} grid {c['grid_size']}, factor {c['num_searches_factor']}, "
+                  f"seed {c['random_seed']}: {c['baseline_time']:.1f} -> {c['current_time']:.1f} ms "
+                  f"(x{c['ratio']:.2f}, p={c['p_value']:.4f}, {c['method']})")
+        self.untested_points = untested
+        print(f"\n{len(regressions)} regression(s), {len(untested)} untested, in {len(comparisons)} point(s); "
+              f"report in {self.results_dir}/regression_summary.txt")
+        return regressions
+
     # ---------------- Run Full Analysis ----------------
     def run_analysis(self):
         grid_sizes = [10, 25, 40, 50, 75, 90, 100, 115, 135, 150, 185, 200, 225, 275, 315]
         factors = [0.1, 1, 3]
         seeds = [3, 60,90]
 
-        self.serial_results = self.profile_version(self.serial_class, grid_sizes, factors, seeds)
-        self.parallel_results = self.profile_version(self.parallel_class, grid_sizes, factors, seeds)
+        try:
+            results = self.profile_versions([self.serial_class, self.parallel_class], grid_sizes, factors, seeds)
+        finally:
+            self.close_servers()
+        self.serial_results = results[self.serial_class]
+        self.parallel_results = results[self.parallel_class]
+        if self.verify_reference:
+            self.check_reference(self.serial_results + self.parallel_results)
 
         speedup_data = self.calculate_speedup()
         self.generate_speedup_graphs(speedup_data)
+        self.generate_phase_graph()
         self.save_results()
         print("\nAnalysis complete!")
 
 # ---------------- Main ----------------
 if __name__ == "__main__":
-    profiler = MinimalDungeonHunterProfiler()
-    profiler.run_analysis()
+    # --interleave: alternate serial/parallel runs in random order and repeat runs disturbed by other load
+    noise_control = "--interleave" in sys.argv
+    # --workers=N: run N configurations at once, each pinned to its own cores
+    workers = next((int(arg.split("=", 1)[1]) for arg in sys.argv if arg.startswith("--workers=")), 1)
+    profiler = MinimalDungeonHunterProfiler(parallel_mode="deterministic" if "--deterministic" in sys.argv else None,
+                                            max_workers=workers,
+                                            visualise="--visualise" in sys.argv, interleave=noise_control,
+                                            interference=InterferencePolicy() if noise_control else None)
+    if len(sys.argv) > 1 and sys.argv[1] == "scaling":
+        profiler.run_scaling_analysis()
+    elif len(sys.argv) > 1 and sys.argv[1] == "tune":
+        profiler.run_cutoff_tuning()
+    elif len(sys.argv) > 1 and sys.argv[1] == "jvm":
+        profiler.run_jvm_matrix()
+    elif len(sys.argv) > 1 and sys.argv[1] == "weak":
+        profiler.run_weak_scaling_analysis(scale=sys.argv[2] if len(sys.argv) > 2 else "grid")
+    elif len(sys.argv) > 1 and sys.argv[1] == "crossover":
+        profiler.run_crossover_search(budget=int(sys.argv[2]) if len(sys.argv) > 2 and sys.argv[2].isdigit() else None)
+    elif len(sys.argv) > 1 and sys.argv[1] == "modes":
+        profiler.run_mode_comparison()
+    elif len(sys.argv) > 1 and sys.argv[1] == "fill":
+        profiler.run_fill_crossover()
+    elif len(sys.argv) > 2 and sys.argv[1] == "regress":
+        # python benchmark_script.py regress <baseline_dir> [threshold]; exits 1 on a regression and
+        # 2 when the baseline or any of its points could not be tested
+        threshold = float(sys.argv[3]) if len(sys.argv) > 3 and not sys.argv[3].startswith("--") else 0.05
+        regressions = profiler.run_regression_check(sys.argv[2], threshold=threshold)
+        sys.exit(1 if regressions else 2 if profiler.untested_points is None or profiler.untested_points else 0)
+    else:
+        profiler.run_analysis()
@@ -1,22 +1,76 @@
+import multiprocessing
 import subprocess
 import os
 import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import numpy as np
 from PIL import Image
 import hashlib
 import csv
 from datetime import datetime
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import matplotlib.patches as patches
+from results_store import RESULTS_DB, ResultsStore
+
+
+def render_difference(img1_path, img2_path, diff_map, output_path):
+    """Render serial / parallel / difference panels at the downsampled diff map size (runs in a worker process)"""
+    size = (diff_map.shape[1], diff_map.shape[0])
+    with Image.open(img1_path) as img1, Image.open(img2_path) as img2:
+        small1 = img1.convert('RGB').resize(size, Image.BOX)
+        small2 = img2.convert('RGB').resize(size, Image.BOX)
+
+    # Figure without pyplot: no global state, safe in any thread or process
+    fig = Figure(figsize=(15, 5))
+    axes = fig.subplots(1, 3)
+
+    # Original images
+    axes[0].imshow(small1)
+    axes[0].set_title('Serial Version')
+    axes[0].axis('off')
+
+    axes[1].imshow(small2)
+    axes[1].set_title('Parallel Version')
+    axes[1].axis('off')
+
+    # Difference visualization (channel-summed, max-pooled)
+    im = axes[2].imshow(diff_map, cmap='hot', vmin=0, vmax=255)
+    axes[2].set_title('Differences (Red = Different)')
+    axes[2].axis('off')
+
+    fig.colorbar(im, ax=axes[2], fraction=0.046, pad=0.04)
+    fig.tight_layout()
+    fig.savefig(output_path, dpi=150, bbox_inches='tight')
 
 class DungeonHunterImageComparator:
-    def __init__(self, classpath="bin", java_path=None, results_dir="q1"):
-        self.classpath = classpath
+    def __init__(self, classpath="bin", java_path=None, results_dir="q1", max_workers=1,
+                 render_diffs=True, render_workers=None, diff_render_size=1024, band_rows=256, parallel_mode=None,
+                 store_path=RESULTS_DB):
+        # Absolute classpath: every run executes in its own scratch working directory
+        self.classpath = os.path.abspath(classpath)
         self.java_path = java_path or "java"
         self.serial_class = "DungeonHunter"
         self.parallel_class = "DungeonHunterParallel"
         self.results_dir = results_dir
         self.comparison_results = []
+        self.max_workers = max_workers
+        # "deterministic" runs DungeonHunterParallel in its serial-exact mode (images should then match)
+        self.parallel_mode = parallel_mode
+        # Pixel diffs are computed in bands of rows; difference renders are optional, downsampled to at most
+        # diff_render_size pixels per side and produced by a background process pool
+        self.band_rows = band_rows
+        self.render_diffs = render_diffs
+        self.render_workers = render_workers
+        self.diff_render_size = diff_render_size
+        self._render_pool = None
+        self._render_jobs = []
+        self._render_lock = threading.Lock()
+
+        # Comparison outcomes also go to the shared SQLite store (None disables it)
+        self.store = ResultsStore(store_path, self.classpath, self.java_path, "comparison_script",
+                                  results_dir) if store_path else None
 
         # Create results directory structure
         os.makedirs(self.results_dir, exist_ok=True)
@@ -30,38 +84,36 @@ class DungeonHunterImageComparator:
         args = [str(grid_size), str(num_searches_factor), str(random_seed)]
 
         try:
-            # Clean up any existing images
-            for img_file in ["visualiseSearch.png", "visualiseSearchPath.png"]:
-                if os.path.exists(img_file):
-                    os.remove(img_file)
-
-            # Run the program
-            result = subprocess.run(
-                [self.java_path, "-cp", self.classpath, class_name] + args,
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
-
-            if result.returncode != 0:
-                print(f"Error running {class_name}: {result.stderr}")
-                return None, None
-
-            # Capture generated images
-            search_img = None
-            path_img = None
-
-            if os.path.exists("visualiseSearch.png"):
-                search_dest = os.path.join(self.images_dir, f"{class_name}_{run_id}_search.png")
-                shutil.copy2("visualiseSearch.png", search_dest)
-                search_img = search_dest
-                os.remove("visualiseSearch.png")
-
-            if os.path.exists("visualiseSearchPath.png"):
-                path_dest = os.path.join(self.images_dir, f"{class_name}_{run_id}_path.png")
-                shutil.copy2("visualiseSearchPath.png", path_dest)
-                path_img = path_dest
-                os.remove("visualiseSearchPath.png")
+            # Each run writes visualiseSearch*.png into a private directory, so runs can overlap
+            with tempfile.TemporaryDirectory(prefix=f"{class_name}_{run_id}_") as scratch_dir:
+                options = []
+                if class_name == self.parallel_class and self.parallel_mode:
+                    options.append(f"-Ddungeon.mode={self.parallel_mode}")
+                result = subprocess.run(
+                    [self.java_path] + options + ["-cp", self.classpath, class_name] + args,
+                    capture_output=True,
+                    text=True,
+                    timeout=120,
+                    cwd=scratch_dir
+                )
+
+                if result.returncode != 0:
+                    print(f"Error running {class_name}: {result.stderr}")
+                    return None, None
+
+                # Capture generated images
+                search_img = None
+                path_img = None
+
+                scratch_search = os.path.join(scratch_dir, "visualiseSearch.png")
+                if os.path.exists(scratch_search):
+                    search_img = os.path.join(self.images_dir, f"{class_name}_{run_id}_search.png")
+                    shutil.move(scratch_search, search_img)
+
+                scratch_path = os.path.join(scratch_dir, "visualiseSearchPath.png")
+                if os.path.exists(scratch_path):
+                    path_img = os.path.join(self.images_dir, f"{class_name}_{run_id}_path.png")
+                    shutil.move(scratch_path, path_img)
 
             return search_img, path_img
 
@@ -78,86 +130,104 @@ class DungeonHunterImageComparator:
             return hashlib.md5(f.read()).hexdigest()
 
     def calculate_pixel_difference(self, img1_path, img2_path):
-        """Calculate pixel-wise differences between two images"""
+        """Calculate pixel-wise differences between two images, one band of rows at a time.
+
+        Only the int16 difference arithmetic is banded: crop() decodes each PNG
+        whole, so peak memory is still the two decoded uint8 images (3 bytes per
+        pixel each, about 30 MB per image at grid 315) plus one band's work.
+        """
         if not img1_path or not img2_path or not os.path.exists(img1_path) or not os.path.exists(img2_path):
             return None, None, None
 
         try:
-            # Load images
-            img1 = Image.open(img1_path).convert('RGB')
-            img2 = Image.open(img2_path).convert('RGB')
-
-            # Check if dimensions match
-            if img1.size != img2.size:
-                return None, f"Size mismatch: {img1.size} vs {img2.size}", None
-
-            # Convert to numpy arrays
-            arr1 = np.array(img1)
-            arr2 = np.array(img2)
-
-            # Calculate differences
-            diff = np.abs(arr1.astype(float) - arr2.astype(float))
+            with Image.open(img1_path) as img1, Image.open(img2_path) as img2:
+                # Check if dimensions match
+                if img1.size != img2.size:
+                    return None, f"Size mismatch: {img1.size} vs {img2.size}", None
+
+                img1 = img1 if img1.mode == 'RGB' else img1.convert('RGB')
+                img2 = img2 if img2.mode == 'RGB' else img2.convert('RGB')
+                width, height = img1.size
+
+                # Max-pooled, channel-summed difference map for the (optional) render
+                scale = max(1, -(-max(width, height) // self.diff_render_size))
+                diff_map = np.zeros((-(-height // scale), -(-width // scale)), dtype=np.uint16)
+                band_rows = scale * max(1, self.band_rows // scale)
+
+                different_pixels = 0
+                max_diff = 0
+                total_diff = 0
+                for top in range(0, height, band_rows):
+                    box = (0, top, width, min(top + band_rows, height))
+                    band1 = img1.crop(box).tobytes()
+                    band2 = img2.crop(box).tobytes()
+                    if band1 == band2:
+                        continue  # identical band: nothing to accumulate
+
+                    # Integer arithmetic on one band only
+                    arr1 = np.frombuffer(band1, dtype=np.uint8).reshape(-1, width, 3).astype(np.int16)
+                    arr2 = np.frombuffer(band2, dtype=np.uint8).reshape(-1, width, 3).astype(np.int16)
+                    diff = np.abs(arr1 - arr2)
+                    pixel_diff = diff.sum(axis=2)
+
+                    different_pixels += int(np.count_nonzero(pixel_diff))
+                    max_diff = max(max_diff, int(diff.max()))
+                    total_diff += int(diff.sum(dtype=np.int64))
+
+                    rows = pixel_diff.shape[0]
+                    padded = np.zeros((-(-rows // scale) * scale, diff_map.shape[1] * scale), dtype=np.uint16)
+                    padded[:rows, :width] = pixel_diff
+                    pooled = padded.reshape(padded.shape[0] // scale, scale, diff_map.shape[1], scale).max(axis=(1, 3))
+                    diff_map[top // scale:top // scale + pooled.shape[0]] = pooled
 
             # Calculate statistics
-            total_pixels = arr1.shape[0] * arr1.shape[1]
-            different_pixels = np.sum(np.any(diff > 0, axis=2))
-            max_diff = np.max(diff)
-            avg_diff = np.mean(diff)
-
+            total_pixels = width * height
             diff_stats = {
                 'total_pixels': total_pixels,
-                'different_pixels': int(different_pixels),
+                'different_pixels': different_pixels,
                 'percent_different': (different_pixels / total_pixels) * 100,
                 'max_difference': float(max_diff),
-                'avg_difference': float(avg_diff),
+                'avg_difference': total_diff / (total_pixels * 3),
                 'identical': different_pixels == 0
             }
 
-            return diff_stats, None, diff
+            return diff_stats, None, diff_map
 
         except Exception as e:
             return None, f"Error comparing images: {e}", None
 
-    def create_difference_visualization(self, img1_path, img2_path, diff_array, output_path):
-        """Create a visualization showing differences between images"""
-        if diff_array is None or img1_path is None or img2_path is None:
+    def create_difference_visualization(self, img1_path, img2_path, diff_map, output_path):
+        """Queue a visualization showing differences between images in the background render pool"""
+        if diff_map is None or img1_path is None or img2_path is None:
             return
 
-        try:
-            img1 = Image.open(img1_path)
-            img2 = Image.open(img2_path)
-
-            fig, axes = plt.subplots(1, 3, figsize=(15, 5))
-
-            # Original images
-            axes[0].imshow(img1)
-            axes[0].set_title('Serial Version')
-            axes[0].axis('off')
-
-            axes[1].imshow(img2)
-            axes[1].set_title('Parallel Version')
-            axes[1].axis('off')
-
-            # Difference visualization
-            diff_vis = np.sum(diff_array, axis=2)  # Sum across RGB channels
-            im = axes[2].imshow(diff_vis, cmap='hot', vmin=0, vmax=255)
-            axes[2].set_title('Differences (Red = Different)')
-            axes[2].axis('off')
-
-            plt.colorbar(im, ax=axes[2], fraction=0.046, pad=0.04)
-            plt.tight_layout()
-            plt.savefig(output_path, dpi=150, bbox_inches='tight')
-            plt.close()
-
-        except Exception as e:
-            print(f"Error creating difference visualization: {e}")
-
-    def compare_test_case(self, grid_size, num_searches_factor, random_seed):
+        with self._render_lock:
+            if self._render_pool is None:
+                # Called from comparison worker threads: forking this process mid-subprocess/decode is unsafe,
+                # so render workers come from a forkserver (spawn where there is none)
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                self._render_pool = ProcessPoolExecutor(max_workers=self.render_workers, mp_context=context)
+            future = self._render_pool.submit(render_difference, img1_path, img2_path, diff_map, output_path)
+            self._render_jobs.append((output_path, future))
+
+    def wait_for_renders(self):
+        """Block until every queued difference visualization has been written"""
+        with self._render_lock:
+            jobs, self._render_jobs = self._render_jobs, []
+            pool, self._render_pool = self._render_pool, None
+        for output_path, future in jobs:
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Error creating difference visualization {output_path}: {e}")
+        if pool is not None:
+            pool.shutdown()
+
+    def compare_test_case(self, grid_size, num_searches_factor, random_seed, record=True):
         """Compare images for a single test case"""
         run_id = f"g{grid_size}_f{num_searches_factor}_s{random_seed}"
 
-        print(f"Comparing: Grid={grid_size}, Factor={num_searches_factor}, Seed={random_seed}")
-
         # Run serial version
         serial_search, serial_path = self.run_and_capture_images(
             self.serial_class, grid_size, num_searches_factor, random_seed, f"serial_{run_id}"
@@ -188,14 +258,14 @@ class DungeonHunterImageComparator:
             search_comparison['hash_match'] = (search_comparison['serial_hash'] == search_comparison['parallel_hash'])
 
             if not search_comparison['hash_match']:
-                pixel_stats, error, diff_array = self.calculate_pixel_difference(serial_search, parallel_search)
+                pixel_stats, error, diff_map = self.calculate_pixel_difference(serial_search, parallel_search)
                 search_comparison['pixel_stats'] = pixel_stats
                 search_comparison['error'] = error
 
                 # Create difference visualization
-                if diff_array is not None:
+                if self.render_diffs and diff_map is not None and not pixel_stats['identical']:
                     diff_output = os.path.join(self.diff_dir, f"diff_{run_id}_search.png")
-                    self.create_difference_visualization(serial_search, parallel_search, diff_array, diff_output)
+                    self.create_difference_visualization(serial_search, parallel_search, diff_map, diff_output)
                     search_comparison['diff_visualization'] = diff_output
 
         # Compare path visualization images
@@ -218,19 +288,26 @@ class DungeonHunterImageComparator:
             path_comparison['hash_match'] = (path_comparison['serial_hash'] == path_comparison['parallel_hash'])
 
             if not path_comparison['hash_match']:
-                pixel_stats, error, diff_array = self.calculate_pixel_difference(serial_path, parallel_path)
+                pixel_stats, error, diff_map = self.calculate_pixel_difference(serial_path, parallel_path)
                 path_comparison['pixel_stats'] = pixel_stats
                 path_comparison['error'] = error
 
                 # Create difference visualization
-                if diff_array is not None:
+                if self.render_diffs and diff_map is not None and not pixel_stats['identical']:
                     diff_output = os.path.join(self.diff_dir, f"diff_{run_id}_path.png")
-                    self.create_difference_visualization(serial_path, parallel_path, diff_array, diff_output)
+                    self.create_difference_visualization(serial_path, parallel_path, diff_map, diff_output)
                     path_comparison['diff_visualization'] = diff_output
 
-        self.comparison_results.extend([search_comparison, path_comparison])
+        if record:
+            self.comparison_results.extend([search_comparison, path_comparison])
+            self.print_test_case(search_comparison, path_comparison)
+
+        return search_comparison, path_comparison
 
-        # Print results
+    def print_test_case(self, search_comparison, path_comparison):
+        """Print the outcome of one test case"""
+        print(f"Comparing: Grid={search_comparison['grid_size']}, Factor={search_comparison['num_searches_factor']}, "
+              f"Seed={search_comparison['random_seed']}")
         print(f"  Search image: {'✓ IDENTICAL' if search_comparison['hash_match'] else '✗ DIFFERENT'}")
         if not search_comparison['hash_match'] and search_comparison['pixel_stats']:
             stats = search_comparison['pixel_stats']
@@ -243,8 +320,6 @@ class DungeonHunterImageComparator:
 
         print()
 
-        return search_comparison, path_comparison
-
     def save_results_to_csv(self, filename=None):
         """Save comparison results to CSV"""
         if not filename:
@@ -320,16 +395,27 @@ class DungeonHunterImageComparator:
         print(f"- Random seeds: {random_seeds}")
         print()
 
-        test_count = 0
-
-        for grid_size in grid_sizes:
-            for num_searches_factor in num_searches_factors:
-                for random_seed in random_seeds:
-                    test_count += 1
-                    print(f"Test {test_count}/{total_tests}:")
-                    self.compare_test_case(grid_size, num_searches_factor, random_seed)
+        test_cases = [(grid_size, num_searches_factor, random_seed)
+                      for grid_size in grid_sizes
+                      for num_searches_factor in num_searches_factors
+                      for random_seed in random_seeds]
+
+        # Test cases run on a bounded pool; results are reported in configuration order
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(self.compare_test_case, *case, record=False) for case in test_cases]
+            for test_count, future in enumerate(futures, 1):
+                search_comparison, path_comparison = future.result()
+                print(f"Test {test_count}/{total_tests}:")
+                self.comparison_results.extend([search_comparison, path_comparison])
+                self.print_test_case(search_comparison, path_comparison)
+                if self.store:
+                    # Comparison runs always render the PNGs; stored like benchmark_script's visualise runs
+                    options = ([f"-Ddungeon.mode={self.parallel_mode}"] if self.parallel_mode else []) + ["visualise"]
+                    for comparison in (search_comparison, path_comparison):
+                        self.store.add_comparison(self.parallel_class, comparison, options)
 
         # Save results
+        self.wait_for_renders()
         csv_filename = self.save_results_to_csv()
 
         # Print summary
@@ -381,7 +467,8 @@ if __name__ == "__main__":
     import sys
 
     # Create comparator instance - saves everything to q1 folder
-    comparator = DungeonHunterImageComparator(classpath="bin")
+    comparator = DungeonHunterImageComparator(classpath="bin", max_workers=os.cpu_count() or 1,
+                                              parallel_mode="deterministic" if "--deterministic" in sys.argv else None)
 
     try:
         # Run the comparison
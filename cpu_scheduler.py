@@ -0,0 +1,73 @@
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+
+
+class CoreScheduler:
+    """Hands out disjoint CPU sets to concurrent benchmark runs, first come first served"""
+
+    def __init__(self, cpus=None):
+        if cpus is None:
+            cpus = os.sched_getaffinity(0) if hasattr(os, "sched_getaffinity") else range(os.cpu_count() or 1)
+        self.cpus = sorted(cpus)
+        self._free = list(self.cpus)
+        self._queue = []
+        self._cond = threading.Condition()
+        self._unpinned_warned = False
+
+    @property
+    def pinning_supported(self):
+        """Runs are pinned by launching them under taskset (util-linux)"""
+        return shutil.which("taskset") is not None
+
+    def acquire(self, count):
+        """Block until `count` cores are free and return them as a tuple.
+
+        Requests are granted strictly in arrival order so a wide request
+        (a parallel run asking for every core) is never starved by a stream
+        of narrow ones filling the gaps.
+        """
+        count = max(1, min(count, len(self.cpus)))
+        ticket = object()
+        with self._cond:
+            self._queue.append(ticket)
+            while self._queue[0] is not ticket or len(self._free) < count:
+                self._cond.wait()
+            self._queue.pop(0)
+            cpus = tuple(self._free[:count])
+            del self._free[:count]
+            self._cond.notify_all()
+        return cpus
+
+    def release(self, cpus):
+        with self._cond:
+            self._free.extend(cpus)
+            self._free.sort()
+            self._cond.notify_all()
+
+    @contextmanager
+    def reserved(self, count):
+        cpus = self.acquire(count)
+        try:
+            yield cpus
+        finally:
+            self.release(cpus)
+
+    def pin_command(self, cpus, command):
+        """`command` prefixed with taskset so the child starts pinned to `cpus`.
+
+        Runs are launched from worker threads, where a preexec_fn is not safe
+        (it can deadlock the forked child), and pinning after Popen would miss
+        the threads the JVM has already started. Without taskset the command
+        is returned unpinned, with a one-time warning.
+        """
+        if not cpus:
+            return list(command)
+        if not self.pinning_supported:
+            if not self._unpinned_warned:
+                self._unpinned_warned = True
+                print("Warning: taskset not found; runs are not pinned to their reserved cores, "
+                      "so concurrent or thread-count runs may share CPUs")
+            return list(command)
+        return ["taskset", "-c", ",".join(str(cpu) for cpu in sorted(cpus))] + list(command)
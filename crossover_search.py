@@ -0,0 +1,169 @@
+import json
+import math
+import os
+
+from cutoff_tuning import RESOLUTION, num_searches
+
+# FILL_TUNING_FILE holds the eager-fill coverage threshold measured by `python benchmark_script.py fill`;
+# while it is missing DungeonHunterParallel keeps its lazy default
+FILL_TUNING_FILE = "fill_tuning.json"
+
+# Coarse grid sizes measured first, spread roughly evenly in log(grid) over the run_analysis range
+COARSE_GRIDS = [10, 30, 100, 315]
+# Factors measured lazy vs eager; expected coverage runs from about 2% to 99.9%
+FILL_FACTORS = [0.001, 0.003, 0.01, 0.03, 0.1, 0.3, 1, 3]
+# Name of the crossover in an estimate, per measured axis
+AXIS_NAMES = {'grid_size': 'grid', 'num_searches_factor': 'factor'}
+
+
+# DungeonMapParallel.COVERAGE_SCALE/COVERAGE_EXPONENT, fitted to the stored serial runs
+COVERAGE_SCALE = 10.8
+COVERAGE_EXPONENT = 0.765
+
+
+def expected_coverage(grid_size, num_searches_factor):
+    """Share of the map the hunts are expected to evaluate, as DungeonMapParallel.expectedCoverage models it"""
+    cells = (grid_size * 2 * RESOLUTION) ** 2
+    return 1 - math.exp(-COVERAGE_SCALE * (num_searches(grid_size, num_searches_factor) / cells) ** COVERAGE_EXPONENT)
+
+
+def write_fill_tuning(eager_coverage, estimates, path=FILL_TUNING_FILE):
+    """Record the calibrated -Ddungeon.eagerCoverage with the crossovers it was taken from"""
+    tuning = {'eager_coverage': round(eager_coverage, 3),
+              'crossovers': [{'grid_size': e['grid_size'], 'crossover_factor': e['crossover_factor'],
+                              'expected_coverage': e['expected_coverage'], 'direction': e['direction']}
+                             for e in estimates]}
+    with open(path, 'w') as f:
+        json.dump(tuning, f, indent=2)
+    return tuning
+
+
+def load_fill_tuning(path=FILL_TUNING_FILE):
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def fill_flags(tuning):
+    """Auto fill at the calibrated threshold, or [] (lazy fill) when the threshold was never measured"""
+    if tuning.get('eager_coverage') is None:
+        return []
+    return ["-Ddungeon.fill=auto", f"-Ddungeon.eagerCoverage={tuning['eager_coverage']}"]
+
+
+def point_speedup(serial_records, parallel_records):
+    """Speedup at one (grid, factor) over the seeds both versions ran.
+
+    The central value is the geometric mean of serial median / parallel
+    median; `low`/`high` pair the ends of the median confidence intervals
+    (serial low / parallel high and vice versa), so the band is the
+    plausible speedup range given the measurement noise.
+    """
+    parallel = {r['random_seed']: r for r in parallel_records}
+    ratios, lows, highs = [], [], []
+    for s in serial_records:
+        p = parallel.get(s['random_seed'])
+        if not p or not p['median_time'] or not s['median_time']:
+            continue
+        ratios.append(s['median_time'] / p['median_time'])
+        lows.append((s.get('ci_low') or s['median_time']) / (p.get('ci_high') or p['median_time']))
+        highs.append((s.get('ci_high') or s['median_time']) / (p.get('ci_low') or p['median_time']))
+    if not ratios:
+        return None
+
+    def geometric_mean(values):
+        return math.exp(sum(math.log(v) for v in values) / len(values))
+
+    return {'speedup': geometric_mean(ratios), 'low': geometric_mean(lows), 'high': geometric_mean(highs),
+            'seeds': len(ratios)}
+
+
+def midpoint(low, high):
+    """Geometric midpoint of a grid interval, as an integer grid size strictly inside it"""
+    middle = int(round(math.sqrt(low * high)))
+    return min(max(middle, low + 1), high - 1)
+
+
+def interval_priority(left, right, gradient_threshold=0.25):
+    """How much refining between two measured points is worth, or None.
+
+    Brackets of the speedup=1 crossover come first (the wider the sooner),
+    then intervals where the speedup band touches 1 at one end, then steep
+    ones where |log speedup| changes by more than `gradient_threshold`.
+    """
+    log_left, log_right = math.log(left['speedup']), math.log(right['speedup'])
+    width = math.log(right['grid_size'] / left['grid_size'])
+    if log_left * log_right < 0 or log_left == 0 or log_right == 0:
+        return 3, width
+    if any(point['low'] < 1 < point['high'] for point in (left, right)):
+        return 2, width
+    change = abs(log_right - log_left)
+    if change > gradient_threshold:
+        return 1, change
+    return None
+
+
+def next_interval(points, min_gap=2, gradient_threshold=0.25):
+    """(priority, low grid, high grid) of the most valuable interval to split, or None.
+
+    `points` are one factor's measured points sorted by grid size; intervals
+    narrower than `min_gap` grid sizes are considered resolved.
+    """
+    best = None
+    for left, right in zip(points, points[1:]):
+        if right['grid_size'] - left['grid_size'] <= min_gap:
+            continue
+        priority = interval_priority(left, right, gradient_threshold)
+        if priority and (best is None or priority > best[0]):
+            best = (priority, left['grid_size'], right['grid_size'])
+    return best
+
+
+def _crossings(points, key, axis='grid_size'):
+    """Values of `axis` where log(speedup[key]) crosses 0, interpolated linearly in log(axis)"""
+    crossings = []
+    for left, right in zip(points, points[1:]):
+        a, b = math.log(left[key]), math.log(right[key])
+        if a == 0:
+            crossings.append((left[axis], left, right))
+        elif a * b < 0:
+            t = a / (a - b)
+            value = math.exp(math.log(left[axis]) + t * math.log(right[axis] / left[axis]))
+            crossings.append((value, left, right))
+    if points and math.log(points[-1][key]) == 0:
+        crossings.append((points[-1][axis], points[-2] if len(points) > 1 else points[-1], points[-1]))
+    return crossings
+
+
+def crossover_estimates(points, axis='grid_size', faster='parallel'):
+    """Every speedup=1 crossing of one curve with its uncertainty.
+
+    `points` are sorted by `axis` (one factor's grid sizes by default).
+    Each estimate is interpolated in log(axis) between the bracketing
+    measurements. The uncertainty range spans where the optimistic (`high`)
+    and pessimistic (`low`) speedup bands cross 1 near the estimate; a band
+    that does not cross there widens it to the neighbouring measured points.
+    """
+    grids = [p[axis] for p in points]
+    band_crossings = {key: [grid for grid, _, _ in _crossings(points, key, axis)] for key in ('low', 'high')}
+    estimates = []
+    for grid, left, right in _crossings(points, 'speedup', axis):
+        index = grids.index(left[axis])
+        bound_low, bound_high = grids[max(index - 1, 0)], grids[min(index + 2, len(grids) - 1)]
+        low, high = grid, grid
+        for crossings in band_crossings.values():
+            near = [g for g in crossings if bound_low <= g <= bound_high]
+            if near:
+                low, high = min([low] + near), max([high] + near)
+            else:
+                low, high = min(low, bound_low), max(high, bound_high)
+        estimates.append({
+            f"crossover_{AXIS_NAMES[axis]}": grid,
+            'uncertainty_low': low,
+            'uncertainty_high': high,
+            'bracket_low': left[axis],
+            'bracket_high': right[axis],
+            'direction': f"{faster} faster {'above' if right['speedup'] > left['speedup'] else 'below'}"
+        })
+    return estimates
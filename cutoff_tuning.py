@@ -0,0 +1,64 @@
+import csv
+import hashlib
+import os
+
+# Same file name CutoffTable.java looks for in the working directory
+TUNING_FILE = "dungeon_tuning.csv"
+TUNING_FIELDS = ["grid_size", "num_searches", "threads", "cutoff"]
+DEFAULT_CUTOFF = 10  # CutoffTable.DEFAULT_CUTOFF
+RESOLUTION = 5
+
+
+def num_searches(grid_size, num_searches_factor):
+    """numSearches exactly as DungeonHunterParallel.main computes it"""
+    return int(float(num_searches_factor) * (grid_size * 2) * (grid_size * 2) * RESOLUTION)
+
+
+def coarse_cutoffs(searches, threads, step=4):
+    """Geometric candidates from 1 up to one chunk per thread (no splitting beyond that)"""
+    limit = max(1, searches // max(1, threads))
+    cutoffs, cutoff = [], 1
+    while cutoff < limit:
+        cutoffs.append(cutoff)
+        cutoff *= step
+    cutoffs.append(limit)
+    return cutoffs
+
+
+def refine_cutoffs(best, tried):
+    """Halfway points between the best cutoff and its tried neighbours"""
+    ordered = sorted(tried)
+    i = ordered.index(best)
+    candidates = set()
+    if i > 0:
+        candidates.add(round((ordered[i - 1] * best) ** 0.5))
+    if i < len(ordered) - 1:
+        candidates.add(round((ordered[i + 1] * best) ** 0.5))
+    return sorted(c for c in candidates if c not in tried and c >= 1)
+
+
+def read_tuning_table(path=TUNING_FILE):
+    if not os.path.exists(path):
+        return []
+    with open(path, newline='') as f:
+        return [{k: int(row[k]) for k in TUNING_FIELDS} for row in csv.DictReader(f)]
+
+
+def write_tuning_table(rows, path=TUNING_FILE):
+    """Merge `rows` into the table, replacing entries for the same (grid_size, num_searches, threads) bucket"""
+    table = {(r['grid_size'], r['num_searches'], r['threads']): r for r in read_tuning_table(path)}
+    for r in rows:
+        table[(r['grid_size'], r['num_searches'], r['threads'])] = {k: int(r[k]) for k in TUNING_FIELDS}
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=TUNING_FIELDS)
+        writer.writeheader()
+        writer.writerows(table[key] for key in sorted(table))
+    return len(table)
+
+
+def table_hash(path=TUNING_FILE):
+    """Content hash of the table, so cached timings are not reused after a retune"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
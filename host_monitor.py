@@ -0,0 +1,192 @@
+import glob
+import os
+import resource
+import statistics
+import threading
+import time
+
+_CPUFREQ = "/sys/devices/system/cpu/cpu{}/cpufreq/{}"
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def online_cpus():
+    return sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+
+
+def cpu_frequencies(cpus=None):
+    """Current frequency in MHz per CPU from cpufreq (empty where the kernel does not expose it, e.g. most VMs)"""
+    frequencies = {}
+    for cpu in cpus if cpus is not None else online_cpus():
+        value = _read(_CPUFREQ.format(cpu, "scaling_cur_freq"))
+        if value and value.isdigit():
+            frequencies[cpu] = int(value) / 1000
+    return frequencies
+
+
+def max_frequency(cpus=None):
+    """Highest frequency (MHz) the CPUs may reach, including turbo where the driver reports it"""
+    values = [_read(_CPUFREQ.format(cpu, "cpuinfo_max_freq")) for cpu in (cpus or online_cpus())]
+    values = [int(v) / 1000 for v in values if v and v.isdigit()]
+    return max(values) if values else None
+
+
+def governors():
+    return sorted({g for g in (_read(path) for path in glob.glob(_CPUFREQ.format("*", "scaling_governor"))) if g})
+
+
+def busy_cpu_ms():
+    """System-wide non-idle CPU time in ms since boot from /proc/stat (None off Linux)"""
+    line = _read("/proc/stat")
+    if not line or not line.startswith("cpu "):
+        return None
+    fields = [int(v) for v in line.split("\n", 1)[0].split()[1:]]
+    idle = fields[3] + (fields[4] if len(fields) > 4 else 0)  # idle + iowait
+    return (sum(fields[:8]) - idle) * 1000 / os.sysconf("SC_CLK_TCK")
+
+
+def process_cpu_ms(pid):
+    """User + system CPU time of one process in ms from /proc/<pid>/stat (None off Linux or once it exited)"""
+    line = _read(f"/proc/{pid}/stat")
+    if not line:
+        return None
+    fields = line.rsplit(")", 1)[1].split()  # the command name may contain spaces
+    return (int(fields[11]) + int(fields[12])) * 1000 / os.sysconf("SC_CLK_TCK")
+
+
+def _own_cpu_ms():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return (usage.ru_utime + usage.ru_stime) * 1000
+
+
+def host_state():
+    """Load averages, cpufreq governors and frequencies right now"""
+    load = os.getloadavg() if hasattr(os, "getloadavg") else (None, None, None)
+    frequencies = list(cpu_frequencies().values())
+    return {
+        'load_1m': load[0],
+        'load_5m': load[1],
+        'cpu_count': os.cpu_count(),
+        'governors': governors(),
+        'cpu_mhz_mean': statistics.mean(frequencies) if frequencies else None,
+        'cpu_mhz_max_possible': max_frequency(),
+        'time': time.time()
+    }
+
+
+class InterferencePolicy:
+    """When a run counts as disturbed and how often to repeat it.
+
+    A run is flagged when processes other than the benchmark kept more than
+    `max_foreign_cores` cores busy on average (system busy time from
+    /proc/stat minus the CPU time of the run and of the profiler, over its
+    wall time), or when the fastest of its CPUs stayed below
+    `min_frequency_ratio` of the maximum frequency (thermal or power
+    throttling). Flagged runs are
+    repeated up to `max_reruns` times; the last attempt is kept either way.
+    """
+
+    def __init__(self, max_foreign_cores=0.5, min_frequency_ratio=0.7, max_reruns=2, interval=0.05):
+        self.max_foreign_cores = max_foreign_cores
+        self.min_frequency_ratio = min_frequency_ratio
+        self.max_reruns = max_reruns
+        self.interval = interval
+
+    def check(self, state):
+        reasons = []
+        foreign = state.get('foreign_cores')
+        if foreign is not None and foreign > self.max_foreign_cores:
+            reasons.append(f"other processes used {foreign:.2f} cores")
+        ratio = state.get('frequency_ratio')
+        if ratio is not None and ratio < self.min_frequency_ratio:
+            reasons.append(f"CPUs ran at {ratio:.0%} of their maximum frequency")
+        return reasons
+
+    def describe(self):
+        return (f"runs with > {self.max_foreign_cores} foreign busy cores or < {self.min_frequency_ratio:.0%} of "
+                f"max CPU frequency are repeated up to {self.max_reruns} times")
+
+
+class RunMonitor:
+    """Samples load and CPU frequency in the background while one run executes.
+
+    Foreign CPU use is only meaningful when runs do not overlap (max_workers=1):
+    a concurrent worker's run is, by design, interference for this one. The
+    run's own CPU time comes from its rusage, or, for a run inside a
+    long-lived server JVM, from that process's /proc counters (`pid`).
+    """
+
+    def __init__(self, cpus=None, interval=0.05, pid=None):
+        self.cpus = list(cpus) if cpus else None
+        self.interval = interval
+        self.pid = pid
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frequencies = cpu_frequencies(self.cpus)
+            self.samples.append(max(frequencies.values()) if frequencies else None)
+
+    def start(self):
+        self.before = host_state()
+        self._busy_start = busy_cpu_ms()
+        self._self_start = _own_cpu_ms()
+        self._pid_start = process_cpu_ms(self.pid) if self.pid else None
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, usage=None):
+        """Host state of the run: load before it, foreign CPU use and frequency during it"""
+        wall_ms = (time.perf_counter() - self._started) * 1000
+        busy_end = busy_cpu_ms()
+        self._stop.set()
+        self._thread.join()
+        run_cpu = usage['cpu_time_ms'] if usage else None
+        if run_cpu is None and self._pid_start is not None:
+            pid_end = process_cpu_ms(self.pid)
+            run_cpu = pid_end - self._pid_start if pid_end is not None else None
+        foreign = None
+        if run_cpu is not None and self._busy_start is not None and busy_end is not None and wall_ms > 0:
+            # Neither the run nor this profiler (pipe readers, this sampler) counts as interference
+            own = run_cpu + _own_cpu_ms() - self._self_start
+            foreign = max(0.0, (busy_end - self._busy_start - own) / wall_ms)
+        peaks = [f for f in self.samples if f is not None]
+        maximum = max_frequency(self.cpus)
+        return {
+            'load_1m_before': self.before['load_1m'],
+            'governors': self.before['governors'],
+            'foreign_cores': foreign,
+            'cpu_mhz_peak_mean': statistics.mean(peaks) if peaks else None,
+            'frequency_ratio': statistics.mean(peaks) / maximum if peaks and maximum else None
+        }
+
+
+def summarise_host_states(states):
+    """Per-configuration view of the runs' host states (None when no run was monitored)"""
+    states = [s for s in states if s]
+    if not states:
+        return None
+
+    def median(field):
+        values = [s[field] for s in states if s.get(field) is not None]
+        return statistics.median(values) if values else None
+
+    foreign = [s['foreign_cores'] for s in states if s.get('foreign_cores') is not None]
+    ratios = [s['frequency_ratio'] for s in states if s.get('frequency_ratio') is not None]
+    return {
+        'load_1m_before': median('load_1m_before'),
+        'foreign_cores_median': median('foreign_cores'),
+        'foreign_cores_max': max(foreign) if foreign else None,
+        'frequency_ratio_min': min(ratios) if ratios else None,
+        'governors': sorted({g for s in states for g in s.get('governors') or []})
+    }
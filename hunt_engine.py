@@ -0,0 +1,217 @@
+"""Batched NumPy hill-climb engine for the Dungeon Hunter searches.
+
+Holds every hunt's position in arrays and advances all active hunts one
+step per iteration, with a vectorised 8-neighbour argmax over a lazily
+filled (or precomputed) mana grid from mana_reference.
+
+Two deterministic rules for "stop on a visited cell" are available:
+
+- mode="serial" reproduces DungeonHunter exactly. Hill-climb paths never
+  split once they meet, so the cells visited by hunts 1..i-1 are exactly
+  the union of their unobstructed paths. Every cell therefore keeps the
+  smallest hunt id whose path crosses it, and hunt i's serial path is the
+  run of cells it owns.
+- mode="lockstep" lets hunts claim cells in the order they reach them; on
+  a tie in the same step the lower id wins. This models a concurrent hunt
+  without the timing noise of DungeonHunterParallel.
+
+Usage:
+    python hunt_engine.py <gridSize> <numSearchesFactor> <randomSeed> [lockstep]
+"""
+import sys
+
+import numpy as np
+
+from mana_reference import DungeonManaReference, JavaRandom, RESOLUTION
+
+# STAY first, then the neighbour order of DungeonMap.getNextStepDirection:
+# argmax picks the first maximum, matching the strict '>' comparison in Java
+OFFSETS = np.array([[0, 0], [-1, 0], [1, 0], [0, -1], [0, 1], [-1, -1], [1, -1], [-1, 1], [1, 1]])
+NOT_EVALUATED = np.iinfo(np.int32).min
+OUT_OF_BOUNDS = -(1 << 40)
+
+
+class BatchedHuntEngine:
+    """All hunts of one `DungeonHunter <gridSize> <numSearchesFactor> <randomSeed>` run"""
+
+    def __init__(self, grid_size, num_searches_factor, seed, precompute=False):
+        self.reference = DungeonManaReference(grid_size, seed)
+        self.grid_size = grid_size
+        self.num_searches_factor = num_searches_factor
+        self.seed = seed
+        self.rows, self.columns = self.reference.rows, self.reference.columns
+        self.num_searches = int(float(num_searches_factor) * (grid_size * 2) * (grid_size * 2) * RESOLUTION)
+
+        cells = self.rows * self.columns
+        self.precomputed = precompute
+        if precompute:
+            self.mana = self.reference.mana_grid().ravel()
+        else:
+            self.mana = np.full(cells, NOT_EVALUATED, dtype=np.int32)
+        self.evaluated = np.zeros(cells, dtype=bool)
+        self._pending = np.zeros(cells, dtype=bool)
+        self.moves = np.full(cells, -1, dtype=np.int8)
+
+    # ---------------- Grid Access ----------------
+    def start_positions(self):
+        """Hunt start cells drawn exactly as DungeonHunter.main does"""
+        rand = JavaRandom(self.seed)
+        if self.rows == self.columns:
+            draws = rand.next_ints(self.rows, 2 * self.num_searches)
+            return draws[0::2].copy(), draws[1::2].copy()
+        rows, cols = np.empty(self.num_searches, np.int64), np.empty(self.num_searches, np.int64)
+        for i in range(self.num_searches):
+            rows[i], cols[i] = rand.next_int(self.rows), rand.next_int(self.columns)
+        return rows, cols
+
+    def lookup(self, flat):
+        """Mana at flat cell indices, evaluating missing cells on first touch"""
+        values = self.mana[flat]
+        if not self.precomputed:
+            missing = values == NOT_EVALUATED
+            if missing.any():
+                # De-duplicate through a scratch mask: much cheaper than np.unique on large batches
+                self._pending[flat[missing]] = True
+                cells = np.flatnonzero(self._pending)
+                self._pending[cells] = False
+                self.mana[cells] = self.reference.mana_at(cells // self.columns, cells % self.columns)
+                values = self.mana[flat]
+        self.evaluated[flat] = True
+        return values
+
+    def climb(self, rows, cols):
+        """Best move (index into OFFSETS) and mana for each (row, col); records the move per cell"""
+        neighbour_rows = rows[:, None] + OFFSETS[:, 0]
+        neighbour_cols = cols[:, None] + OFFSETS[:, 1]
+        inside = ((neighbour_rows >= 0) & (neighbour_rows < self.rows) &
+                  (neighbour_cols >= 0) & (neighbour_cols < self.columns))
+        values = np.full(neighbour_rows.shape, OUT_OF_BOUNDS, dtype=np.int64)
+        values[inside] = self.lookup(neighbour_rows[inside] * self.columns + neighbour_cols[inside])
+        move = np.argmax(values, axis=1)
+        self.moves[rows * self.columns + cols] = move
+        return move, values[:, 0]
+
+    # ---------------- Search Modes ----------------
+    def run(self, mode="serial"):
+        start_rows, start_cols = self.start_positions()
+        if mode == "serial":
+            power, end_rows, end_cols, steps, iterations = self._run_serial(start_rows, start_cols)
+        elif mode == "lockstep":
+            power, end_rows, end_cols, steps, iterations = self._run_lockstep(start_rows, start_cols)
+        else:
+            raise ValueError(f"Unknown mode {mode}")
+
+        finder = int(np.argmax(power))  # first hunt with the highest mana, as in the Java reduction
+        return {
+            'mode': mode,
+            'grid_size': self.grid_size,
+            'num_searches_factor': self.num_searches_factor,
+            'random_seed': self.seed,
+            'num_searches': self.num_searches,
+            'mana': int(power[finder]),
+            'finder': finder,
+            'row': int(end_rows[finder]),
+            'col': int(end_cols[finder]),
+            'x': self.reference.x_coord(int(end_rows[finder])),
+            'y': self.reference.y_coord(int(end_cols[finder])),
+            'grid_points_evaluated': int(self.evaluated.sum()),
+            'steps_total': int(steps.sum()),
+            'steps_max': int(steps.max()) if steps.size else 0,
+            'iterations': iterations
+        }
+
+    def _run_serial(self, start_rows, start_cols):
+        n = self.num_searches
+        unowned = n + 1
+        owner = np.full(self.rows * self.columns, unowned, dtype=np.int64)
+
+        # Phase 1: walk the unobstructed paths, keeping the smallest hunt id per cell.
+        # A hunt can stop as soon as a smaller id owns its cell: that hunt covers the rest of the path.
+        active = np.arange(n)
+        rows, cols = start_rows.copy(), start_cols.copy()
+        iterations = 0
+        while active.size:
+            iterations += 1
+            flat = rows * self.columns + cols
+            ids = active + 1
+            np.minimum.at(owner, flat, ids)
+            mine = owner[flat] == ids
+            active, rows, cols, flat = active[mine], rows[mine], cols[mine], flat[mine]
+            move = self.moves[flat].astype(np.int64)
+            unknown = move < 0
+            if unknown.any():
+                move[unknown], _ = self.climb(rows[unknown], cols[unknown])
+            moving = move != 0
+            active, rows, cols, move = active[moving], rows[moving], cols[moving], move[moving]
+            rows = rows + OFFSETS[move, 0]
+            cols = cols + OFFSETS[move, 1]
+
+        # Phase 2: hunt i visited exactly the cells it owns, a prefix of its path
+        steps = np.bincount(owner[owner <= n], minlength=n + 1)[1:]
+        power = np.full(n, NOT_EVALUATED, dtype=np.int64)
+        end_rows, end_cols = start_rows.copy(), start_cols.copy()
+        walkers = np.flatnonzero(steps)
+        rows, cols = start_rows[walkers], start_cols[walkers]
+        remaining = steps[walkers] - 1
+        while True:
+            moving = np.flatnonzero(remaining > 0)
+            if not moving.size:
+                break
+            move = self.moves[rows[moving] * self.columns + cols[moving]]
+            rows[moving] += OFFSETS[move, 0]
+            cols[moving] += OFFSETS[move, 1]
+            remaining[moving] -= 1
+        last = rows * self.columns + cols
+        power[walkers] = self.mana[last]
+        move = self.moves[last]
+        end_rows[walkers] = rows + OFFSETS[move, 0]
+        end_cols[walkers] = cols + OFFSETS[move, 1]
+        return power, end_rows, end_cols, steps, iterations
+
+    def _run_lockstep(self, start_rows, start_cols):
+        n = self.num_searches
+        visit = np.zeros(self.rows * self.columns, dtype=np.int64)
+        power = np.full(n, NOT_EVALUATED, dtype=np.int64)
+        steps = np.zeros(n, dtype=np.int64)
+        rows, cols = start_rows.copy(), start_cols.copy()
+        active = np.arange(n)
+        iterations = 0
+        while active.size:
+            iterations += 1
+            flat = rows[active] * self.columns + cols[active]
+            free = visit[flat] == 0
+            active, flat = active[free], flat[free]
+            # Several hunts stepping onto the same cell: the lowest id claims it, the rest stop there
+            order = np.argsort(flat, kind='stable')
+            first = np.ones(order.size, dtype=bool)
+            first[1:] = flat[order][1:] != flat[order][:-1]
+            claimed = np.sort(order[first])
+            active, flat = active[claimed], flat[claimed]
+            visit[flat] = active + 1
+            steps[active] += 1
+            move, power[active] = self.climb(rows[active], cols[active])
+            moving = move != 0
+            active, move = active[moving], move[moving]
+            rows[active] += OFFSETS[move, 0]
+            cols[active] += OFFSETS[move, 1]
+        return power, rows, cols, steps, iterations
+
+
+def what_if(grid_sizes, factors, seeds, mode="serial"):
+    """Run the engine over a parameter grid, e.g. to study search factors without a JVM"""
+    return [BatchedHuntEngine(grid, factor, seed).run(mode)
+            for grid in grid_sizes for factor in factors for seed in seeds]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (4, 5):
+        print("Usage: python hunt_engine.py <gridSize> <numSearchesFactor> <randomSeed> [lockstep]")
+        sys.exit(1)
+    engine = BatchedHuntEngine(int(sys.argv[1]), float(sys.argv[2]), int(sys.argv[3]))
+    result = engine.run(sys.argv[4] if len(sys.argv) == 5 else "serial")
+    print(f"\t rows: {engine.rows}, columns: {engine.columns}")
+    print(f"\t Number searches: {result['num_searches']}")
+    evaluated = result['grid_points_evaluated']
+    print(f"\tnumber dungeon grid points evaluated: {evaluated}  "
+          f"({evaluated * 100.0 / (engine.rows * engine.columns):2.0f}%)")
+    print(f"Dungeon Master (mana {result['mana']}) found at:  x={result['x']:.1f} y={result['y']:.1f}")
@@ -0,0 +1,75 @@
+import subprocess
+import threading
+
+END_MARKER = "@@END"
+ERROR_MARKER = "@@ERROR"
+
+
+class DungeonHunterServerClient:
+    """Client for a long-lived DungeonHunterServer JVM, started on first use"""
+
+    def __init__(self, command):
+        self.command = command
+        self.process = None
+
+    def start(self):
+        self.process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1
+        )
+
+    def is_running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def run(self, class_name, args, timeout=None):
+        """Run one program inside the server and return a CompletedProcess like subprocess.run"""
+        if not self.is_running():
+            self.start()
+
+        request = [class_name] + [str(a) for a in args]
+        process = self.process
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            process.kill()
+
+        timer = None
+        if timeout is not None:
+            # A hung run can only be interrupted by killing the server; it is restarted on next use
+            timer = threading.Timer(timeout, kill)
+            timer.start()
+        try:
+            self.process.stdin.write(" ".join(request) + "\n")
+            self.process.stdin.flush()
+            lines = []
+            for line in self.process.stdout:
+                if line.startswith(END_MARKER):
+                    return subprocess.CompletedProcess(request, 0, "".join(lines), "")
+                if line.startswith(ERROR_MARKER):
+                    return subprocess.CompletedProcess(request, 1, "".join(lines), line[len(ERROR_MARKER):].strip())
+                lines.append(line)
+        except (BrokenPipeError, OSError):
+            pass
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+        self.process.wait()
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(request, timeout)
+        raise RuntimeError(f"DungeonHunterServer exited with status {self.process.returncode}")
+
+    def close(self):
+        if not self.is_running():
+            return
+        try:
+            self.process.stdin.write("QUIT\n")
+            self.process.stdin.close()
+            self.process.wait(timeout=10)
+        except (BrokenPipeError, OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
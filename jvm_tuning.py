@@ -0,0 +1,138 @@
+import json
+import math
+import os
+import subprocess
+from collections import defaultdict
+
+# JVM_TUNING_FILE holds the winning option set per grid band, written by
+# `python benchmark_script.py jvm`; jvm_<band>.args are the same flags as java @argfiles.
+JVM_TUNING_FILE = "jvm_tuning.json"
+
+# (name, smallest grid, largest grid); grid 315 allocates two 3150x3150 int arrays
+GRID_BANDS = [("small", 1, 50), ("medium", 51, 150), ("large", 151, None)]
+
+BASELINE = "default"
+
+
+def default_option_sets(heap="2g"):
+    """GC, heap, JIT and memory option sets to compare against the JVM defaults"""
+    option_sets = {
+        BASELINE: [],
+        "parallel-gc": ["-XX:+UseParallelGC"],
+        "serial-gc": ["-XX:+UseSerialGC"],
+        "fixed-heap": [f"-Xms{heap}", f"-Xmx{heap}"],
+        "fixed-heap-pretouch": [f"-Xms{heap}", f"-Xmx{heap}", "-XX:+AlwaysPreTouch"],
+        "parallel-gc-fixed-heap": ["-XX:+UseParallelGC", f"-Xms{heap}", f"-Xmx{heap}"],
+        "c1-only": ["-XX:TieredStopAtLevel=1"],
+        "c2-only": ["-XX:-TieredCompilation"],
+        "early-c2": ["-XX:Tier3InvocationThreshold=100", "-XX:Tier4InvocationThreshold=1000",
+                     "-XX:Tier4CompileThreshold=1500"],
+    }
+    if large_pages_available():
+        option_sets["large-pages"] = ["-XX:+UseTransparentHugePages", f"-Xms{heap}", f"-Xmx{heap}"]
+    return option_sets
+
+
+def large_pages_available():
+    """Transparent huge pages can be requested with madvise (Linux only)"""
+    try:
+        with open("/sys/kernel/mm/transparent_hugepage/enabled") as f:
+            setting = f.read()
+    except OSError:
+        return False
+    return "[always]" in setting or "[madvise]" in setting
+
+
+def supported_option_sets(java_path, option_sets):
+    """Drop option sets this JVM rejects (unknown flag, heap too large for the machine)"""
+    supported = {}
+    for name, flags in option_sets.items():
+        try:
+            check = subprocess.run([java_path] + flags + ["-version"], capture_output=True, text=True, timeout=60)
+        except (OSError, subprocess.SubprocessError):
+            continue
+        if check.returncode == 0:
+            supported[name] = flags
+    return supported
+
+
+def band_of(grid_size):
+    for name, low, high in GRID_BANDS:
+        if grid_size >= low and (high is None or grid_size <= high):
+            return name
+    return GRID_BANDS[-1][0]
+
+
+def end_to_end_time(record):
+    """Median wall time of the whole JVM process (startup, heap setup and GC included), in ms"""
+    return record.get('wall_time')
+
+
+def cpu_time(record):
+    """Median user + system CPU time of the JVM process, in ms (None in server mode)"""
+    return (record.get('rusage') or {}).get('cpu_time_ms')
+
+
+def rank_option_sets(runs, value=end_to_end_time):
+    """Rank option sets per grid band from (option_set, record) pairs.
+
+    The flags mostly change JVM startup, heap sizing and GC, which the
+    programs' own timer (search only) does not see, so configurations are
+    compared on `value(record)`, end-to-end wall time by default. Each
+    configuration's value is divided by the baseline's for the same
+    configuration; option sets are ordered by the geometric mean of those
+    ratios (lower is faster). Configurations without a baseline run or
+    without a value are left out.
+    """
+    values = {}
+    for name, record in runs:
+        values[(name, record['grid_size'], record['num_searches_factor'], record['random_seed'])] = value(record)
+
+    ratios = defaultdict(lambda: defaultdict(list))
+    for (name, grid, factor, seed), measured in values.items():
+        baseline = values.get((BASELINE, grid, factor, seed))
+        if measured and baseline:
+            ratios[band_of(grid)][name].append(measured / baseline)
+
+    rankings = {}
+    for band, by_set in ratios.items():
+        scores = {name: math.exp(sum(math.log(r) for r in values) / len(values))
+                  for name, values in by_set.items()}
+        rankings[band] = sorted(scores.items(), key=lambda item: item[1])
+    return rankings
+
+
+def write_jvm_tuning(rankings, option_sets, path=JVM_TUNING_FILE):
+    """Record the winner per band as JSON and as a java @argfile next to it"""
+    bands = {}
+    directory = os.path.dirname(os.path.abspath(path))
+    for name, low, high in GRID_BANDS:
+        if name not in rankings or not rankings[name]:
+            continue
+        winner = rankings[name][0][0]
+        argfile = os.path.join(directory, f"jvm_{name}.args")
+        with open(argfile, 'w') as f:
+            f.write("\n".join(option_sets[winner]) + "\n")
+        bands[name] = {
+            'grid_range': [low, high],
+            'winner': winner,
+            'flags': option_sets[winner],
+            'argfile': os.path.basename(argfile),
+            'ranking': [{'option_set': option_set, 'relative_time': score} for option_set, score in rankings[name]]
+        }
+    with open(path, 'w') as f:
+        json.dump(bands, f, indent=2)
+    return bands
+
+
+def load_jvm_tuning(path=JVM_TUNING_FILE):
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def flags_for_grid(tuning, grid_size):
+    """Winning flags recorded for the grid's band, or [] when the band was never tuned"""
+    band = tuning.get(band_of(grid_size))
+    return list(band['flags']) if band else []
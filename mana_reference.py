@@ -0,0 +1,210 @@
+"""NumPy reference implementation of the dungeon mana function.
+
+Reproduces DungeonMap/DungeonMapParallel: grid size and RESOLUTION, boss
+placement from java.util.Random(seed), the mana formula (same operation
+order) and the PRECISION fixed-point truncation. The Java side evaluates
+Math.sin/cos/exp/log with HotSpot intrinsics that are allowed to differ
+from the C library by one ulp, so in principle a value that lands within
+an ulp of an integer boundary could truncate differently; in practice the
+fixed-point values agree.
+
+Usage:
+    python mana_reference.py <gridSize> <randomSeed>
+"""
+import math
+import sys
+
+import numpy as np
+
+PRECISION = 10000
+RESOLUTION = 5
+
+
+class JavaRandom:
+    """Bit-exact port of java.util.Random (48-bit LCG)"""
+    MULTIPLIER = 0x5DEECE66D
+    ADDEND = 0xB
+    MASK = (1 << 48) - 1
+
+    def __init__(self, seed):
+        self.seed = (seed ^ self.MULTIPLIER) & self.MASK
+
+    def next(self, bits):
+        self.seed = (self.seed * self.MULTIPLIER + self.ADDEND) & self.MASK
+        value = self.seed >> (48 - bits)
+        return value - (1 << 32) if bits == 32 and value >= (1 << 31) else value
+
+    def next_double(self):
+        return ((self.next(26) << 27) + self.next(27)) * 2.0 ** -53
+
+    _jump_tables = {}
+
+    @classmethod
+    def _jump_table(cls, block):
+        # seed after k steps = A[k-1] * seed + C[k-1] (mod 2^48), for k = 1..block
+        if block not in cls._jump_tables:
+            a, c = np.empty(block, dtype=np.uint64), np.empty(block, dtype=np.uint64)
+            multiplier, addend = 1, 0
+            for k in range(block):
+                multiplier = (multiplier * cls.MULTIPLIER) & cls.MASK
+                addend = (addend * cls.MULTIPLIER + cls.ADDEND) & cls.MASK
+                a[k], c[k] = multiplier, addend
+            cls._jump_tables[block] = (a, c)
+        return cls._jump_tables[block]
+
+    def next_ints(self, bound, count, block=1 << 16):
+        """Vectorised equivalent of [next_int(bound) for _ in range(count)], leaving the generator in the same state"""
+        if bound <= 0:
+            raise ValueError("bound must be positive")
+        a, c = self._jump_table(block)
+        mask = np.uint64(self.MASK)
+        out = np.empty(count, dtype=np.int64)
+        filled = 0
+        while filled < count:
+            # uint64 arithmetic wraps modulo 2^64, a multiple of 2^48, so masking afterwards is exact
+            states = (a * np.uint64(self.seed) + c) & mask
+            bits = (states >> np.uint64(17)).astype(np.int64)  # next(31)
+            if bound & -bound == bound:
+                values = (bound * bits) >> 31
+                accepted = np.arange(block)
+            else:
+                values = bits % bound
+                accepted = np.flatnonzero(bits - values + (bound - 1) < (1 << 31))
+            need = count - filled
+            if accepted.size >= need:
+                out[filled:] = values[accepted[:need]]
+                self.seed = int(states[accepted[need - 1]])
+                break
+            out[filled:filled + accepted.size] = values[accepted]
+            filled += accepted.size
+            self.seed = int(states[-1])
+        return out
+
+    def next_int(self, bound):
+        if bound <= 0:
+            raise ValueError("bound must be positive")
+        if bound & -bound == bound:  # power of two
+            return (bound * self.next(31)) >> 31
+        while True:
+            bits = self.next(31)
+            value = bits % bound
+            if bits - value + (bound - 1) < (1 << 31):  # Java int overflow check
+                return value
+
+
+class DungeonManaReference:
+    """Vectorised ground-truth mana map for `java DungeonHunter <gridSize> <factor> <seed>`"""
+
+    def __init__(self, grid_size, seed):
+        if grid_size <= 0:
+            raise ValueError("Grid size must be greater than 0.")
+        if seed <= 0:
+            raise ValueError("Seed 0 uses an unseeded java.util.Random and cannot be reproduced.")
+        self.grid_size = grid_size
+        self.seed = seed
+        self.xmin, self.xmax = float(-grid_size), float(grid_size)
+        self.ymin, self.ymax = float(-grid_size), float(grid_size)
+        self.rows = int(math.floor((self.xmax - self.xmin) * RESOLUTION + 0.5))  # Math.round
+        self.columns = int(math.floor((self.ymax - self.ymin) * RESOLUTION + 0.5))
+
+        rand = JavaRandom(seed)
+        x_range = self.xmax - self.xmin
+        self.boss_x = self.xmin + x_range * rand.next_double()
+        self.boss_y = self.ymin + (self.ymax - self.ymin) * rand.next_double()
+
+    def x_coord(self, row):
+        return self.xmin + ((self.xmax - self.xmin) / self.rows) * row
+
+    def y_coord(self, col):
+        return self.ymin + ((self.ymax - self.ymin) / self.columns) * col
+
+    def row_of(self, x):
+        return int(round((x - self.xmin) * self.rows / (self.xmax - self.xmin)))
+
+    def col_of(self, y):
+        return int(round((y - self.ymin) * self.columns / (self.ymax - self.ymin)))
+
+    def mana_at(self, rows, cols):
+        """Fixed-point mana for arrays of grid indices (broadcast together)"""
+        x = self.x_coord(np.asarray(rows, dtype=np.float64))
+        y = self.y_coord(np.asarray(cols, dtype=np.float64))
+        boss_x, boss_y = self.boss_x, self.boss_y
+        dx = x - boss_x
+        dy = y - boss_y
+        distance_squared = dx * dx + dy * dy
+
+        # Same expression and evaluation order as DungeonMap.getManaLevel
+        mana = (2 * np.sin(x + 0.1 * np.sin(y / 5.0) + math.pi / 2) *
+                np.cos((y + 0.1 * np.cos(x / 5.0) + math.pi / 2) / 2.0) +
+                0.7 * np.sin((x * 0.5) + (y * 0.3) + 0.2 * np.sin(x / 6.0) + math.pi / 2) +
+                0.3 * np.sin((x * 1.5) - (y * 0.8) + 0.15 * np.cos(y / 4.0)) +
+                -0.2 * np.log(np.abs(y - math.pi * 2) + 0.1) +
+                0.5 * np.sin((x * y) / 4.0 + 0.05 * np.sin(x)) +
+                1.5 * np.cos((x + y) / 5.0 + 0.1 * np.sin(y)) +
+                3.0 * np.exp(-0.03 * ((x - boss_x - 15) * (x - boss_x - 15) +
+                                      (y - boss_y + 10) * (y - boss_y + 10))) +
+                8.0 * np.exp(-0.01 * distance_squared) +
+                2.0 / (1.0 + 0.05 * distance_squared))
+
+        # (int)(PRECISION * mana): truncation towards zero
+        return np.trunc(PRECISION * mana).astype(np.int32)
+
+    def mana_rows(self, start, stop):
+        """Mana for rows [start, stop) as a (stop - start, columns) int32 block"""
+        rows = np.arange(start, stop)[:, None]
+        cols = np.arange(self.columns)[None, :]
+        return self.mana_at(rows, cols)
+
+    def iter_chunks(self, chunk_rows=None):
+        """Yield (start_row, block) pairs covering the whole map, about 4M cells per block by default"""
+        chunk_rows = chunk_rows or max(1, (1 << 22) // self.columns)
+        for start in range(0, self.rows, chunk_rows):
+            stop = min(start + chunk_rows, self.rows)
+            yield start, self.mana_rows(start, stop)
+
+    def mana_grid(self, chunk_rows=None):
+        grid = np.empty((self.rows, self.columns), dtype=np.int32)
+        for start, block in self.iter_chunks(chunk_rows):
+            grid[start:start + block.shape[0]] = block
+        return grid
+
+    def global_max(self, chunk_rows=None):
+        """Global maximum of the map without materialising it (first cell in row-major order on ties)"""
+        best = None
+        for start, block in self.iter_chunks(chunk_rows):
+            flat = int(np.argmax(block))
+            value = int(block.flat[flat])
+            if best is None or value > best[0]:
+                best = (value, start + flat // self.columns, flat % self.columns)
+        mana, row, col = best
+        return {'mana': mana, 'row': row, 'col': col, 'x': self.x_coord(row), 'y': self.y_coord(col)}
+
+    def verify(self, solution_info, global_max=None):
+        """Check a program's reported mana/x/y against the reference map.
+
+        `consistent`: the reported mana is the true value at the reported location.
+        `found_global_max`: the report is the global maximum of the map.
+        """
+        global_max = global_max or self.global_max()
+        check = {'expected_mana': global_max['mana'], 'consistent': None, 'found_global_max': None}
+        if 'mana' not in solution_info:
+            return check
+        check['found_global_max'] = solution_info['mana'] == global_max['mana']
+        if 'x' in solution_info and 'y' in solution_info:
+            row, col = self.row_of(solution_info['x']), self.col_of(solution_info['y'])
+            if 0 <= row < self.rows and 0 <= col < self.columns:
+                check['consistent'] = int(self.mana_at(row, col)) == solution_info['mana']
+            else:
+                check['consistent'] = False
+        return check
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python mana_reference.py <gridSize> <randomSeed>")
+        sys.exit(1)
+    reference = DungeonManaReference(int(sys.argv[1]), int(sys.argv[2]))
+    peak = reference.global_max()
+    print(f"\t rows: {reference.rows}, columns: {reference.columns}")
+    print(f"\t boss at x={reference.boss_x:.3f} y={reference.boss_y:.3f}")
+    print(f"Global maximum (mana {peak['mana']}) at:  x={peak['x']:.1f} y={peak['y']:.1f}")
@@ -0,0 +1,131 @@
+import math
+import statistics
+import time
+
+
+class MeasurementPolicy:
+    """How many times to run a configuration and which samples to keep.
+
+    The defaults reproduce the original behaviour: three runs, no warmup,
+    mean/stdev reporting. With warmup > 0 the first runs are discarded;
+    max_warmup > warmup keeps warming until the last `steady_window` warmup
+    times agree within `steady_tolerance`. With adaptive=True sampling
+    continues past `runs` until the confidence interval of the median is
+    narrower than `ci_width` (relative to the median), `max_runs` is reached
+    or `time_budget` seconds have been spent on the configuration.
+    """
+
+    def __init__(self, runs=3, warmup=0, max_warmup=None, steady_window=3, steady_tolerance=0.1,
+                 adaptive=False, ci_width=0.05, confidence=0.95, max_runs=30, time_budget=None):
+        self.runs = runs
+        self.warmup = warmup
+        self.max_warmup = warmup if max_warmup is None else max(warmup, max_warmup)
+        self.steady_window = steady_window
+        self.steady_tolerance = steady_tolerance
+        self.adaptive = adaptive
+        self.ci_width = ci_width
+        self.confidence = confidence
+        self.max_runs = max(runs, max_runs) if adaptive else runs
+        self.time_budget = time_budget
+
+    def describe(self):
+        text = f"{self.runs} runs"
+        if self.max_warmup:
+            text += f", {self.warmup}-{self.max_warmup} warmup runs discarded"
+        if self.adaptive:
+            text += (f", adaptive up to {self.max_runs} runs until the {self.confidence:.0%} CI of the median "
+                     f"is within {self.ci_width:.0%}")
+        return text
+
+
+def binomial_cdf(k, n, p=0.5):
+    return sum(math.comb(n, i) * p ** i * (1 - p) ** (n - i) for i in range(k + 1))
+
+
+def median_confidence_interval(samples, confidence=0.95):
+    """Distribution-free confidence interval for the median from order statistics.
+
+    Returns (low, high, coverage). With too few samples to reach the requested
+    confidence the full range is returned together with its actual coverage.
+    """
+    data = sorted(samples)
+    n = len(data)
+    if n == 0:
+        return None, None, 0.0
+    # [x(k), x(n-k+1)] covers the median with probability 1 - 2 * P(B <= k-1), B ~ Bin(n, 1/2)
+    best_k, coverage = 1, 1 - 2 * binomial_cdf(0, n)
+    for k in range(2, n // 2 + 1):
+        k_coverage = 1 - 2 * binomial_cdf(k - 1, n)
+        if k_coverage < confidence:
+            break
+        best_k, coverage = k, k_coverage
+    return data[best_k - 1], data[n - best_k], coverage
+
+
+def is_steady(times, window, tolerance):
+    if len(times) < window:
+        return False
+    recent = times[-window:]
+    centre = statistics.median(recent)
+    return centre > 0 and (max(recent) - min(recent)) / centre <= tolerance
+
+
+def measure(run_once, policy=None, samples=None, on_sample=None):
+    """Repeatedly call run_once() -> (time_ms, payload) according to `policy`.
+
+    `samples` are previously collected (time_ms, payload) pairs, e.g. from a
+    result cache; they count towards the run total and skip warmup.
+    `on_sample(time_ms, payload)` is called for every new run kept as a
+    sample (never for warmup runs), e.g. to append it to that cache.
+    """
+    policy = policy or MeasurementPolicy()
+    samples = list(samples or [])
+    warmup_times = []
+    started = time.time()
+
+    if not samples:
+        while len(warmup_times) < policy.max_warmup:
+            if len(warmup_times) >= policy.warmup and is_steady(warmup_times, policy.steady_window,
+                                                                 policy.steady_tolerance):
+                break
+            warmup_times.append(run_once()[0])
+
+    def finished():
+        if len(samples) < policy.runs:
+            return False
+        if not policy.adaptive or len(samples) >= policy.max_runs:
+            return True
+        if policy.time_budget is not None and time.time() - started >= policy.time_budget:
+            return True
+        return interval_converged([t for t, _ in samples], policy)
+
+    while not finished():
+        sample = run_once()
+        samples.append(sample)
+        if on_sample:
+            on_sample(*sample)
+
+    return summarise([t for t, _ in samples], [p for _, p in samples], policy, warmup_times)
+
+
+def interval_converged(times, policy):
+    low, high, coverage = median_confidence_interval(times, policy.confidence)
+    median = statistics.median(times)
+    return coverage >= policy.confidence and median > 0 and (high - low) / median <= policy.ci_width
+
+
+def summarise(times, payloads, policy, warmup_times=()):
+    low, high, coverage = median_confidence_interval(times, policy.confidence)
+    return {
+        'avg_time': statistics.mean(times),
+        'std_time': statistics.stdev(times) if len(times) > 1 else 0,
+        'median_time': statistics.median(times),
+        'ci_low': low,
+        'ci_high': high,
+        'ci_coverage': coverage,
+        'converged': interval_converged(times, policy),
+        'runs': len(times),
+        'times': times,
+        'warmup_times': list(warmup_times),
+        'outputs': payloads
+    }
@@ -0,0 +1,91 @@
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+_MAXRSS_TO_KB = 1 / 1024 if sys.platform == "darwin" else 1
+
+USAGE_FIELDS = ["user_time_ms", "sys_time_ms", "cpu_time_ms", "wall_time_ms", "max_rss_kb",
+                "voluntary_switches", "involuntary_switches", "minor_faults", "major_faults"]
+
+
+def run_with_rusage(command, timeout=None):
+    """subprocess.run(capture_output=True, text=True) that also collects the child's rusage.
+
+    The child is reaped with os.wait4, so the returned CompletedProcess has an
+    extra `rusage` dict (see USAGE_FIELDS) covering the JVM and every thread it
+    started. Platforms without os.wait4 fall back to subprocess.run and
+    rusage=None.
+    """
+    if not hasattr(os, "wait4"):
+        result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+        result.rusage = None
+        return result
+
+    started = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    # Drain both pipes concurrently so a chatty child never blocks on a full pipe
+    captured = {}
+
+    def drain(name, stream):
+        captured[name] = stream.read()
+        stream.close()
+
+    readers = [threading.Thread(target=drain, args=(name, stream), daemon=True)
+               for name, stream in (("stdout", process.stdout), ("stderr", process.stderr))]
+    for reader in readers:
+        reader.start()
+
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        process.kill()
+
+    timer = threading.Timer(timeout, kill) if timeout else None
+    if timer:
+        timer.start()
+    try:
+        _, status, usage = os.wait4(process.pid, 0)
+    finally:
+        if timer:
+            timer.cancel()
+    wall_ms = (time.perf_counter() - started) * 1000
+    process.returncode = os.waitstatus_to_exitcode(status)
+    for reader in readers:
+        reader.join()
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(command, timeout, captured.get("stdout"), captured.get("stderr"))
+
+    result = subprocess.CompletedProcess(command, process.returncode, captured.get("stdout", ""),
+                                         captured.get("stderr", ""))
+    result.rusage = {
+        'user_time_ms': usage.ru_utime * 1000,
+        'sys_time_ms': usage.ru_stime * 1000,
+        'cpu_time_ms': (usage.ru_utime + usage.ru_stime) * 1000,
+        'wall_time_ms': wall_ms,
+        'max_rss_kb': usage.ru_maxrss * _MAXRSS_TO_KB,
+        'voluntary_switches': usage.ru_nvcsw,
+        'involuntary_switches': usage.ru_nivcsw,
+        'minor_faults': usage.ru_minflt,
+        'major_faults': usage.ru_majflt
+    }
+    return result
+
+
+def cpu_utilisation(usage, threads):
+    """cpu_time / (wall x threads): 1.0 means every granted core was busy for the whole run"""
+    if not usage or not usage.get('wall_time_ms') or not threads:
+        return None
+    return usage['cpu_time_ms'] / (usage['wall_time_ms'] * threads)
+
+
+def summarise_rusage(usages):
+    """Median of every rusage field over the runs that have one (None if none do)"""
+    usages = [u for u in usages if u]
+    if not usages:
+        return None
+    return {field: statistics.median(u[field] for u in usages) for field in USAGE_FIELDS}
@@ -0,0 +1,211 @@
+import json
+import math
+import os
+import statistics
+from functools import lru_cache
+
+# Result files written by MinimalDungeonHunterProfiler.save_results, by program
+BASELINE_FILES = {"DungeonHunter": "serial_results.json", "DungeonHunterParallel": "parallel_results.json"}
+
+# Exact Mann-Whitney distribution up to this many samples in total (and no ties)
+EXACT_LIMIT = 50
+
+# Runs behind each record of baselines saved before records carried `runs` (the original fixed count)
+LEGACY_RUNS = 3
+
+# |Cliff's delta| thresholds for negligible/small/medium/large (Romano et al.)
+DELTA_MAGNITUDES = [(0.147, "negligible"), (0.33, "small"), (0.474, "medium"), (1.0, "large")]
+
+
+def point_key(record):
+    return record['grid_size'], record['num_searches_factor'], record['random_seed']
+
+
+def load_baseline(directory):
+    """{class_name: {(grid, factor, seed): record}} from a results directory; missing files are skipped"""
+    baseline = {}
+    for class_name, filename in BASELINE_FILES.items():
+        path = os.path.join(directory, filename)
+        if not os.path.exists(path):
+            continue
+        with open(path) as f:
+            baseline[class_name] = {point_key(record): record for record in json.load(f)}
+    return baseline
+
+
+@lru_cache(maxsize=None)
+def _u_counts(m, n):
+    """Number of orderings of m x-samples and n y-samples giving each U = #(x > y) (no ties)"""
+    if m == 0 or n == 0:
+        return (1,)
+    # The largest value is either an x (beating all n y's) or a y
+    counts = [0] * (m * n + 1)
+    for u, c in enumerate(_u_counts(m - 1, n)):
+        counts[u + n] += c
+    for u, c in enumerate(_u_counts(m, n - 1)):
+        counts[u] += c
+    return tuple(counts)
+
+
+def mann_whitney(x, y):
+    """Two-sided Mann-Whitney U test; returns (U for x, p-value, method).
+
+    U counts pairs with x > y (ties count one half). Small samples without
+    ties use the exact permutation distribution, otherwise the normal
+    approximation with tie and continuity corrections.
+    """
+    m, n = len(x), len(y)
+    if m == 0 or n == 0:
+        return None, None, None
+    u = sum(1.0 if a > b else 0.5 if a == b else 0.0 for a in x for b in y)
+    mean = m * n / 2
+    tied = len(set(x) | set(y)) < m + n
+
+    if not tied and m + n <= EXACT_LIMIT:
+        counts = _u_counts(m, n)
+        total = math.comb(m + n, m)
+        extreme = min(u, m * n - u)
+        tail = sum(counts[:int(extreme) + 1]) / total
+        return u, min(1.0, 2 * tail), "exact"
+
+    combined = sorted(x + y)
+    ties = 0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j < len(combined) and combined[j] == combined[i]:
+            j += 1
+        t = j - i
+        ties += t ** 3 - t
+        i = j
+    total = m + n
+    variance = m * n / 12 * ((total + 1) - ties / (total * (total - 1)))
+    if variance <= 0:
+        return u, 1.0, "normal"
+    z = (abs(u - mean) - 0.5) / math.sqrt(variance)
+    return u, min(1.0, math.erfc(max(z, 0.0) / math.sqrt(2))), "normal"
+
+
+def _incomplete_beta(a, b, x):
+    """Regularized incomplete beta I_x(a, b), by Lentz's continued fraction"""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    if x > (a + 1) / (a + b + 2):
+        return 1.0 - _incomplete_beta(b, a, 1 - x)
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x)) / a
+    tiny = 1e-300
+    f, c, d = 1.0, 1.0, 0.0
+    for i in range(400):
+        m = i // 2
+        if i == 0:
+            numerator = 1.0
+        elif i % 2 == 0:
+            numerator = m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m))
+        else:
+            numerator = -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))
+        d = 1.0 + numerator * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + numerator / c
+        c = c if abs(c) > tiny else tiny
+        f *= c * d
+        if abs(1.0 - c * d) < 1e-12:
+            break
+    return front * (f - 1.0)
+
+
+def welch_test(x, mean, std, n):
+    """Two-sided Welch t-test of samples x against a summary (mean, std, n); returns (t, p)"""
+    if len(x) < 2 or n < 2:
+        return None, None
+    x_mean = statistics.mean(x)
+    x_error, y_error = statistics.variance(x) / len(x), std ** 2 / n
+    error = x_error + y_error
+    if error == 0:
+        return (0.0, 1.0) if x_mean == mean else (math.copysign(math.inf, x_mean - mean), 0.0)
+    t = (x_mean - mean) / math.sqrt(error)
+    df = error ** 2 / (x_error ** 2 / (len(x) - 1) + y_error ** 2 / (n - 1))
+    return t, _incomplete_beta(df / 2, 0.5, df / (df + t * t))
+
+
+def minimum_p_value(m, n):
+    """Smallest two-sided p the exact test can reach with these sample sizes"""
+    if m == 0 or n == 0:
+        return 1.0
+    return min(1.0, 2 / math.comb(m + n, m))
+
+
+def cliffs_delta(x, y):
+    """P(x > y) - P(x < y); positive when x tends to be larger (slower, for times)"""
+    if not x or not y:
+        return None
+    greater = sum(1 for a in x for b in y if a > b)
+    less = sum(1 for a in x for b in y if a < b)
+    return (greater - less) / (len(x) * len(y))
+
+
+def delta_magnitude(delta):
+    if delta is None:
+        return None
+    for limit, label in DELTA_MAGNITUDES:
+        if abs(delta) < limit:
+            return label
+    return DELTA_MAGNITUDES[-1][1]
+
+
+def compare_point(baseline, current, alpha=0.05, threshold=0.05):
+    """Compare one configuration's new run against its baseline record.
+
+    A regression needs both a significant Mann-Whitney test (p < alpha) and
+    a median slowdown beyond `threshold` (0.05 = 5%); improvements mirror
+    that. Legacy baselines without raw `times` are tested on their summary
+    instead: a Welch t-test of the new times against the baseline's
+    avg_time/std_time over `runs` (LEGACY_RUNS when not recorded), with the
+    ratio of the means. Only baselines without a usable summary stay
+    "untested".
+    """
+    base_times = baseline.get('times')
+    new_times = current['times']
+    if base_times:
+        base_centre, new_centre = statistics.median(base_times), statistics.median(new_times)
+    else:
+        base_centre, new_centre = baseline['avg_time'], statistics.mean(new_times)
+    comparison = {
+        'grid_size': current['grid_size'],
+        'num_searches_factor': current['num_searches_factor'],
+        'random_seed': current['random_seed'],
+        'baseline_time': base_centre,
+        'current_time': new_centre,
+        'ratio': new_centre / base_centre if base_centre else None,
+        'baseline_runs': len(base_times) if base_times else baseline.get('runs') or LEGACY_RUNS,
+        'current_runs': len(new_times),
+        'u_statistic': None,
+        'p_value': None,
+        'method': None,
+        'cliffs_delta': None,
+        'effect': None,
+        'verdict': "untested"
+    }
+    if base_times:
+        u, p, method = mann_whitney(new_times, base_times)
+        delta = cliffs_delta(new_times, base_times)
+        comparison.update(u_statistic=u, p_value=p, method=method, cliffs_delta=delta, effect=delta_magnitude(delta))
+    elif baseline.get('std_time') is not None:
+        _, p = welch_test(new_times, baseline['avg_time'], baseline['std_time'], comparison['baseline_runs'])
+        if p is None:
+            return comparison
+        comparison.update(p_value=p, method="welch (baseline summary)")
+    else:
+        return comparison
+    ratio = comparison['ratio']
+    if p is not None and p < alpha and ratio is not None:
+        if ratio > 1 + threshold:
+            comparison['verdict'] = "regression"
+        elif ratio < 1 - threshold:
+            comparison['verdict'] = "improvement"
+        else:
+            comparison['verdict'] = "within threshold"
+    else:
+        comparison['verdict'] = "no significant change"
+    return comparison
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import threading
+from collections import defaultdict
+
+
+def build_hash(classpath="bin"):
+    """Hash of every compiled .class file under the classpath; changes whenever src/*.java is recompiled"""
+    digest = hashlib.sha256()
+    if os.path.isdir(classpath):
+        for root, dirs, files in os.walk(classpath):
+            dirs.sort()
+            for name in sorted(files):
+                if not name.endswith(".class"):
+                    continue
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, classpath).encode())
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+
+def host_fingerprint(java_path="java"):
+    """Identify the machine and JVM the measurements were taken on"""
+    try:
+        version = subprocess.run([java_path, "-version"], capture_output=True, text=True, timeout=30)
+        java_version = (version.stderr or version.stdout).strip()
+    except (OSError, subprocess.SubprocessError):
+        java_version = "unknown"
+    fingerprint = {
+        'host': platform.node(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'system': platform.system(),
+        'release': platform.release(),
+        'cpu_count': os.cpu_count(),
+        'java_version': java_version
+    }
+    return hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode()).hexdigest(), fingerprint
+
+
+class ResultCache:
+    """Append-only JSON-lines store of per-run measurements.
+
+    Entries are keyed by class name, program arguments, extra launch options,
+    the hash of the compiled classes and the host/JVM fingerprint, so a
+    recompile or a different machine never reuses stale samples. Every run is
+    appended (and flushed) as soon as it finishes, which lets an interrupted
+    sweep resume where it stopped.
+
+    `payload_fields` are the keys every payload of this cache must carry. They
+    are part of the key, and entries whose payload lacks any of them are not
+    loaded, so profilers sharing a cache file never reuse each other's runs.
+    """
+
+    def __init__(self, path="benchmark_cache.jsonl", classpath="bin", java_path="java", payload_fields=()):
+        self.path = path
+        self.payload_fields = sorted(payload_fields)
+        self.build_hash = build_hash(classpath)
+        self.host_hash, self.host_info = host_fingerprint(java_path)
+        self._entries = defaultdict(list)
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn last line from an interrupted write
+                if (entry.get('build') == self.build_hash and entry.get('host') == self.host_hash
+                        and self._has_fields(entry.get('payload'))):
+                    self._entries[entry['key']].append((entry['time'], entry.get('payload')))
+
+    def _has_fields(self, payload):
+        if not self.payload_fields:
+            return True
+        return isinstance(payload, dict) and all(field in payload for field in self.payload_fields)
+
+    def key(self, class_name, args, options=()):
+        material = [class_name, [str(a) for a in args], list(options), self.build_hash, self.host_hash]
+        if self.payload_fields:
+            material.append(self.payload_fields)
+        return hashlib.sha256(json.dumps(material).encode()).hexdigest()
+
+    def samples(self, key):
+        with self._lock:
+            return list(self._entries.get(key, []))
+
+    def append(self, key, class_name, args, time_ms, payload=None):
+        entry = {
+            'key': key,
+            'class': class_name,
+            'args': [str(a) for a in args],
+            'build': self.build_hash,
+            'host': self.host_hash,
+            'time': time_ms,
+            'payload': payload
+        }
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+            self._entries[key].append((time_ms, payload))
+
+    def prune(self):
+        """Rewrite the cache file keeping only entries for the current build and host"""
+        with self._lock:
+            if not os.path.exists(self.path):
+                return 0
+            kept, dropped = [], 0
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        dropped += 1
+                        continue
+                    if entry.get('build') == self.build_hash and entry.get('host') == self.host_hash:
+                        kept.append(line if line.endswith("\n") else line + "\n")
+                    else:
+                        dropped += 1
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w') as f:
+                f.writelines(kept)
+            os.replace(tmp_path, self.path)
+            return dropped
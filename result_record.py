@@ -0,0 +1,104 @@
+import json
+import re
+import statistics
+
+# JVM flag that makes DungeonHunter/DungeonHunterParallel print a RunRecord JSON line
+RECORD_FLAG = "-Ddungeon.json=true"
+
+# JVM flag that skips the PNG power maps; rendering is not part of the measured hunt
+NO_VISUALISE_FLAG = "-Ddungeon.visualise=false"
+
+# RunRecord key -> solution_info key used by the profilers
+SOLUTION_FIELDS = {
+    'mana': 'mana',
+    'x': 'x',
+    'y': 'y',
+    'row': 'row',
+    'col': 'col',
+    'gridPointsEvaluated': 'grid_points_evaluated',
+    'numSearches': 'num_searches',
+    'stepsTotal': 'steps_total',
+    'stepsMax': 'steps_max',
+    'stepsMean': 'steps_mean',
+    'threads': 'threads',
+    'cutoff': 'cutoff',
+    'gridBytes': 'grid_bytes',
+    'mode': 'mode',
+    'fill': 'fill',
+    'expectedCoverage': 'expected_coverage',
+}
+
+# RunRecord "phases" keys -> phase names, in program order
+PHASES = {
+    'mapInitMs': 'map_init',
+    'huntSetupMs': 'hunt_setup',
+    'fillMs': 'fill',
+    'searchMs': 'search',
+    'reductionMs': 'reduction',
+    'visualisationMs': 'visualisation',
+}
+
+
+def parse_result_record(output):
+    """The run's JSON record from program output, or None for builds that do not print one"""
+    for line in reversed(output.splitlines()):
+        line = line.strip()
+        if line.startswith('{') and '"program"' in line:
+            try:
+                return json.loads(line)
+            except ValueError:
+                return None
+    return None
+
+
+def execution_time(output):
+    """Program-reported execution time in ms, from the record or the 'time: N ms' line"""
+    record = parse_result_record(output)
+    if record and 'timeMs' in record:
+        return float(record['timeMs'])
+    for line in output.split('\n'):
+        if 'time:' in line and 'ms' in line:
+            try:
+                return float(line.split('time:')[1].split('ms')[0].strip())
+            except ValueError:
+                continue
+    return None
+
+
+def solution_info(output):
+    """Mana, location and search statistics, from the record or the printed summary"""
+    record = parse_result_record(output)
+    if record:
+        info = {name: record[key] for key, name in SOLUTION_FIELDS.items() if key in record}
+        if 'phases' in record:
+            info['phases'] = {name: record['phases'][key] for key, name in PHASES.items() if key in record['phases']}
+        return info
+
+    info = {}
+    for line in output.split('\n'):
+        if 'mana' in line:
+            try:
+                info['mana'] = int(line.split('mana ')[1].split(')')[0])
+            except (IndexError, ValueError):
+                pass
+        if 'x=' in line and 'y=' in line:
+            x_match = re.search(r'x=([+-]?\d*\.?\d+)', line)
+            y_match = re.search(r'y=([+-]?\d*\.?\d+)', line)
+            if x_match and y_match:
+                info['x'] = float(x_match.group(1))
+                info['y'] = float(y_match.group(1))
+        if 'number dungeon grid points evaluated:' in line:
+            match = re.search(r'number dungeon grid points evaluated:\s*(\d+)', line)
+            if match:
+                info['grid_points_evaluated'] = int(match.group(1))
+    return info
+
+
+def median_phases(outputs):
+    """Median ms per phase over the runs' outputs, or None for builds without phase timings"""
+    runs = [solution_info(output).get('phases') for output in outputs]
+    runs = [phases for phases in runs if phases]
+    if not runs:
+        return None
+    return {name: statistics.median(phases.get(name, 0.0) for phases in runs)
+            for name in PHASES.values() if any(name in phases for phases in runs)}
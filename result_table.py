@@ -0,0 +1,130 @@
+import numpy as np
+
+# Columns every profile_config record provides; missing values are NaN (floats) or 0 (threads)
+KEY_FIELDS = ('grid_size', 'num_searches_factor', 'random_seed')
+DTYPE = np.dtype([
+    ('class_id', np.int32),
+    ('grid_size', np.int64),
+    ('num_searches_factor', np.float64),
+    ('random_seed', np.int64),
+    ('threads', np.int64),
+    ('avg_time', np.float64),
+    ('median_time', np.float64),
+    ('ci_low', np.float64),
+    ('ci_high', np.float64),
+    ('runs', np.int64),
+])
+
+
+def _number(value, default=np.nan):
+    return default if value is None else value
+
+
+class ResultTable:
+    """Columnar copy of profiler records in one NumPy structured array.
+
+    Rows keep their original record (self.records[i]) for the fields that
+    are not columns (solution_info, rusage, phases). Joins and group-bys
+    go through np.unique/argsort on the key columns, so they cost
+    O(n log n) instead of one list scan per row.
+    """
+
+    def __init__(self, data, records, class_names):
+        self.data = data
+        self.records = records
+        self.class_names = class_names
+
+    @classmethod
+    def from_records(cls, records_by_class):
+        """{class_name: [record, ...]} as one table; row order follows the input order"""
+        class_names = list(records_by_class)
+        records = [record for name in class_names for record in records_by_class[name]]
+        data = np.empty(len(records), dtype=DTYPE)
+        data['class_id'] = [i for i, name in enumerate(class_names) for _ in records_by_class[name]]
+        for field in KEY_FIELDS:
+            data[field] = [record[field] for record in records]
+        data['threads'] = [record.get('threads') or 0 for record in records]
+        for field in ('avg_time', 'median_time', 'ci_low', 'ci_high'):
+            data[field] = [_number(record.get(field)) for record in records]
+        data['runs'] = [record.get('runs') or 0 for record in records]
+        return cls(data, records, class_names)
+
+    def __len__(self):
+        return len(self.data)
+
+    def rows(self, class_name):
+        """Row numbers of one class, in input order"""
+        if class_name not in self.class_names:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(self.data['class_id'] == self.class_names.index(class_name))
+
+    def key_ids(self, fields, rows=None):
+        """Dense group id per row for the given key columns, plus the distinct keys (sorted)"""
+        keys = self.data[list(fields)] if rows is None else self.data[list(fields)][rows]
+        unique, inverse = np.unique(keys, return_inverse=True)
+        return inverse.ravel(), unique
+
+    def match(self, left_class, right_class, fields=KEY_FIELDS):
+        """(left_rows, right_rows) pairing each left row with the first right row of the same key"""
+        left, right = self.rows(left_class), self.rows(right_class)
+        ids, _ = self.key_ids(fields, np.concatenate([left, right]))
+        left_ids, right_ids = ids[:len(left)], ids[len(left):]
+        # np.unique's first index per id is the first right row in input order
+        present, first = np.unique(right_ids, return_index=True)
+        lookup = np.full(ids.max() + 1 if len(ids) else 0, -1, dtype=np.int64)
+        lookup[present] = right[first]
+        partner = lookup[left_ids] if len(left) else np.empty(0, dtype=np.int64)
+        found = partner >= 0
+        return left[found], partner[found]
+
+
+def group_percentiles(values, group_ids, q):
+    """Linear-interpolated q-th percentile (0-100) of `values` per group id, vectorized.
+
+    Returns one value per id 0..max(group_ids); NaN values are ignored.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    group_ids = np.asarray(group_ids)
+    keep = ~np.isnan(values)
+    values, group_ids = values[keep], group_ids[keep]
+    if len(values) == 0:
+        return np.empty(0)
+    order = np.lexsort((values, group_ids))
+    values, group_ids = values[order], group_ids[order]
+    counts = np.bincount(group_ids)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    position = starts + (q / 100.0) * np.maximum(counts - 1, 0)
+    low = np.floor(position).astype(np.int64)
+    high = np.minimum(np.ceil(position).astype(np.int64), np.maximum(starts + counts - 1, 0))
+    low = np.minimum(low, high)
+    result = values[low] + (values[high] - values[low]) * (position - low)
+    result[counts == 0] = np.nan
+    return result
+
+
+def split_groups(key_columns, order_by=None):
+    """{key tuple: indices} over parallel key arrays, keys in sorted order and each group's
+    indices ordered by `order_by` (input order when None)"""
+    key_columns = [np.asarray(column) for column in key_columns]
+    count = len(key_columns[0]) if key_columns else 0
+    if count == 0:
+        return {}
+    secondary = np.arange(count) if order_by is None else np.asarray(order_by)
+    order = np.lexsort([secondary] + key_columns[::-1])
+    change = np.zeros(count, dtype=bool)
+    change[0] = True
+    for column in key_columns:
+        ordered = column[order]
+        change[1:] |= ordered[1:] != ordered[:-1]
+    chunks = np.split(order, np.flatnonzero(change)[1:])
+    return {tuple(column[chunk[0]].item() for column in key_columns): chunk for chunk in chunks}
+
+
+def speedup_columns(table, serial_class, parallel_class, default_threads):
+    """Matched rows with vectorized speedup (serial / parallel mean) and efficiency (speedup / threads)"""
+    serial_rows, parallel_rows = table.match(serial_class, parallel_class)
+    speedup = table.data['avg_time'][serial_rows] / table.data['avg_time'][parallel_rows]
+    threads = table.data['threads'][parallel_rows]
+    # Pool size reported by the run; builds without a JSON record fall back to the core count
+    efficiency = speedup / np.where(threads > 0, threads, default_threads)
+    return serial_rows, parallel_rows, speedup, efficiency
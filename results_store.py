@@ -0,0 +1,328 @@
+import json
+import math
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+from collections import defaultdict
+from datetime import datetime
+from result_cache import build_hash, host_fingerprint
+import result_record
+
+# One database for every sweep of every profiler, on every host it was copied from
+RESULTS_DB = "benchmark_results.sqlite"
+
+# Extra flags recorded as configs.threads / configs.cutoff rather than as a distinct option set
+POINT_FLAGS = ("-Ddungeon.threads=", "-Ddungeon.cutoff=")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hosts (
+    id INTEGER PRIMARY KEY,
+    fingerprint TEXT UNIQUE NOT NULL,
+    name TEXT, machine TEXT, processor TEXT, system TEXT, release TEXT, cpu_count INTEGER, java_version TEXT
+);
+CREATE TABLE IF NOT EXISTS builds (
+    id INTEGER PRIMARY KEY,
+    hash TEXT UNIQUE NOT NULL,
+    label TEXT,
+    first_seen TEXT
+);
+CREATE TABLE IF NOT EXISTS sweeps (
+    id INTEGER PRIMARY KEY,
+    host_id INTEGER NOT NULL REFERENCES hosts(id),
+    build_id INTEGER NOT NULL REFERENCES builds(id),
+    tool TEXT, results_dir TEXT, started TEXT
+);
+CREATE TABLE IF NOT EXISTS configs (
+    id INTEGER PRIMARY KEY,
+    class TEXT NOT NULL,
+    grid_size INTEGER NOT NULL,
+    num_searches_factor REAL NOT NULL,
+    random_seed INTEGER NOT NULL,
+    threads INTEGER NOT NULL DEFAULT 0,
+    cutoff INTEGER NOT NULL DEFAULT 0,
+    options TEXT NOT NULL DEFAULT '',
+    UNIQUE (class, grid_size, num_searches_factor, random_seed, threads, cutoff, options)
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    sweep_id INTEGER NOT NULL REFERENCES sweeps(id),
+    config_id INTEGER NOT NULL REFERENCES configs(id),
+    median_time REAL, avg_time REAL, std_time REAL, ci_low REAL, ci_high REAL, runs INTEGER,
+    mana INTEGER, x REAL, y REAL, grid_points INTEGER, cpu_time_ms REAL, max_rss_kb REAL
+);
+CREATE TABLE IF NOT EXISTS samples (
+    result_id INTEGER NOT NULL REFERENCES results(id),
+    run INTEGER NOT NULL,
+    time_ms REAL NOT NULL,
+    PRIMARY KEY (result_id, run)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS comparisons (
+    id INTEGER PRIMARY KEY,
+    sweep_id INTEGER NOT NULL REFERENCES sweeps(id),
+    config_id INTEGER NOT NULL REFERENCES configs(id),
+    image_type TEXT, hash_match INTEGER, different_pixels INTEGER, percent_different REAL
+);
+CREATE INDEX IF NOT EXISTS configs_point ON configs (grid_size, num_searches_factor, random_seed, class);
+CREATE INDEX IF NOT EXISTS sweeps_host_build ON sweeps (host_id, build_id);
+CREATE INDEX IF NOT EXISTS results_config ON results (config_id, sweep_id);
+CREATE INDEX IF NOT EXISTS results_sweep ON results (sweep_id);
+CREATE INDEX IF NOT EXISTS comparisons_config ON comparisons (config_id, sweep_id);
+"""
+
+
+def git_label():
+    """Short commit id of the working tree (with -dirty), or None outside a git checkout"""
+    try:
+        described = subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                                   timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return described.stdout.strip() or None
+
+
+class ResultsStore:
+    """SQLite store of hosts, builds, sweeps, configurations and raw samples.
+
+    A profiler opens one store; its first result starts a sweep on the
+    current host (machine + JVM fingerprint) and build (hash of the compiled
+    classes, labelled with the git commit). Writes are serialised with a
+    lock, so concurrent profile_config workers can share the store.
+    """
+
+    def __init__(self, path=RESULTS_DB, classpath="bin", java_path="java", tool=None, results_dir=None):
+        self.path = path
+        self.classpath = classpath
+        self.java_path = java_path
+        self.tool = tool
+        self.results_dir = results_dir
+        self._sweep_id = None
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self.connection.close()
+
+    # ---------------- Writing ----------------
+    def _host_id(self, fingerprint, info):
+        self.connection.execute(
+            "INSERT OR IGNORE INTO hosts (fingerprint, name, machine, processor, system, release, cpu_count, "
+            "java_version) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (fingerprint, info.get('host'), info.get('machine'), info.get('processor'), info.get('system'),
+             info.get('release'), info.get('cpu_count'), info.get('java_version')))
+        return self.connection.execute("SELECT id FROM hosts WHERE fingerprint = ?", (fingerprint,)).fetchone()[0]
+
+    def _build_id(self, digest, label):
+        self.connection.execute("INSERT OR IGNORE INTO builds (hash, label, first_seen) VALUES (?, ?, ?)",
+                                (digest, label, datetime.now().isoformat(timespec='seconds')))
+        return self.connection.execute("SELECT id FROM builds WHERE hash = ?", (digest,)).fetchone()[0]
+
+    def _start_sweep(self, host_id, build_id, tool, results_dir):
+        cursor = self.connection.execute(
+            "INSERT INTO sweeps (host_id, build_id, tool, results_dir, started) VALUES (?, ?, ?, ?, ?)",
+            (host_id, build_id, tool, results_dir, datetime.now().isoformat(timespec='seconds')))
+        return cursor.lastrowid
+
+    def _current_sweep(self):
+        if self._sweep_id is None:
+            fingerprint, info = host_fingerprint(self.java_path)
+            host_id = self._host_id(fingerprint, info)
+            build_id = self._build_id(build_hash(self.classpath), git_label())
+            self._sweep_id = self._start_sweep(host_id, build_id, self.tool, self.results_dir)
+        return self._sweep_id
+
+    def _config_id(self, class_name, record, options):
+        key = (class_name, record['grid_size'], record['num_searches_factor'], record['random_seed'],
+               record.get('threads') or 0, record.get('cutoff') or 0, json.dumps(list(options)))
+        self.connection.execute(
+            "INSERT OR IGNORE INTO configs (class, grid_size, num_searches_factor, random_seed, threads, cutoff, "
+            "options) VALUES (?, ?, ?, ?, ?, ?, ?)", key)
+        return self.connection.execute(
+            "SELECT id FROM configs WHERE class = ? AND grid_size = ? AND num_searches_factor = ? "
+            "AND random_seed = ? AND threads = ? AND cutoff = ? AND options = ?", key).fetchone()[0]
+
+    def _insert_result(self, sweep_id, class_name, record, options):
+        config_id = self._config_id(class_name, record, options)
+        solution = record.get('solution_info') or {}
+        usage = record.get('rusage') or {}
+        cursor = self.connection.execute(
+            "INSERT INTO results (sweep_id, config_id, median_time, avg_time, std_time, ci_low, ci_high, runs, "
+            "mana, x, y, grid_points, cpu_time_ms, max_rss_kb) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (sweep_id, config_id, record.get('median_time'), record.get('avg_time'), record.get('std_time'),
+             record.get('ci_low'), record.get('ci_high'), record.get('runs'), solution.get('mana'),
+             solution.get('x'), solution.get('y'), solution.get('grid_points_evaluated'),
+             usage.get('cpu_time_ms'), usage.get('max_rss_kb')))
+        self.connection.executemany("INSERT INTO samples (result_id, run, time_ms) VALUES (?, ?, ?)",
+                                    [(cursor.lastrowid, run, t) for run, t in enumerate(record.get('times') or [])])
+        return cursor.lastrowid
+
+    def add_result(self, class_name, record, options=()):
+        """Store one profile_config-style record (grid_size, ..., median_time, times, solution_info)"""
+        with self._lock:
+            result_id = self._insert_result(self._current_sweep(), class_name, record, options)
+            self.connection.commit()
+        return result_id
+
+    def add_comparison(self, class_name, comparison, options=()):
+        """Store one image comparison row of comparison_script"""
+        stats = comparison.get('pixel_stats') or {}
+        with self._lock:
+            config_id = self._config_id(class_name, comparison, options)
+            self.connection.execute(
+                "INSERT INTO comparisons (sweep_id, config_id, image_type, hash_match, different_pixels, "
+                "percent_different) VALUES (?, ?, ?, ?, ?, ?)",
+                (self._current_sweep(), config_id, comparison['image_type'], int(bool(comparison['hash_match'])),
+                 stats.get('different_pixels'), stats.get('percent_different')))
+            self.connection.commit()
+
+    def import_results(self, directory, host_name, build_label):
+        """Load an existing results directory (serial/parallel_results.json) as one sweep.
+
+        Old directories carry no fingerprints, so the host and build are
+        identified by the given name and label.
+        """
+        files = {"DungeonHunter": "serial_results.json", "DungeonHunterParallel": "parallel_results.json"}
+        with self._lock:
+            host_id = self._host_id(f"name:{host_name}", {'host': host_name})
+            build_id = self._build_id(f"label:{build_label}", build_label)
+            sweep_id = self._start_sweep(host_id, build_id, "import", directory)
+            count = 0
+            for class_name, filename in files.items():
+                path = os.path.join(directory, filename)
+                if not os.path.exists(path):
+                    continue
+                with open(path) as f:
+                    for record in json.load(f):
+                        self._insert_result(sweep_id, class_name, record, ())
+                        count += 1
+            self.connection.commit()
+        return count
+
+    # ---------------- Queries ----------------
+    def _resolve(self, table, text, columns):
+        clause = " OR ".join(f"{column} = ?" for column in columns) + f" OR {columns[0]} LIKE ?"
+        rows = self.connection.execute(f"SELECT id FROM {table} WHERE {clause}",
+                                       [text] * len(columns) + [text + "%"]).fetchall()
+        ids = sorted({row[0] for row in rows})
+        if len(ids) != 1:
+            raise ValueError(f"'{text}' matches {len(ids)} {table}")
+        return ids[0]
+
+    def build_id(self, text):
+        """Build by label (e.g. git commit) or hash prefix"""
+        return self._resolve("builds", text, ["hash", "label"])
+
+    def host_id(self, text):
+        """Host by name or fingerprint prefix"""
+        return self._resolve("hosts", text, ["fingerprint", "name"])
+
+    def hosts(self):
+        return self.connection.execute(
+            "SELECT h.name, substr(h.fingerprint, 1, 12), h.cpu_count, COUNT(s.id) FROM hosts h "
+            "LEFT JOIN sweeps s ON s.host_id = h.id GROUP BY h.id ORDER BY h.name").fetchall()
+
+    def builds(self):
+        return self.connection.execute(
+            "SELECT b.label, substr(b.hash, 1, 12), b.first_seen, COUNT(s.id) FROM builds b "
+            "LEFT JOIN sweeps s ON s.build_id = b.id GROUP BY b.id ORDER BY b.first_seen").fetchall()
+
+    def point_times(self, build, host=None, class_name="DungeonHunterParallel", options=()):
+        """{(grid, factor, seed, threads, cutoff, options): mean of the per-sweep medians} for one build.
+
+        `options` are the stored extra flags besides the thread and cutoff
+        ones (JVM-matrix sets, -Ddungeon.fill/mode, "visualise"); only
+        results run with exactly those are used, so the default () keeps the
+        plain configuration. None keeps every option set as its own point.
+        """
+        query = ("SELECT c.grid_size, c.num_searches_factor, c.random_seed, c.threads, c.cutoff, c.options, "
+                 "COALESCE(r.median_time, r.avg_time) FROM results r "
+                 "JOIN configs c ON c.id = r.config_id JOIN sweeps s ON s.id = r.sweep_id "
+                 "WHERE c.class = ? AND s.build_id = ?")
+        params = [class_name, self.build_id(build)]
+        if host:
+            query += " AND s.host_id = ?"
+            params.append(self.host_id(host))
+        times = defaultdict(list)
+        for grid, factor, seed, threads, cutoff, stored, time in self.connection.execute(query, params):
+            variant = variant_options(json.loads(stored))
+            if time is not None and (options is None or variant == tuple(options)):
+                times[(grid, factor, seed, threads, cutoff, variant)].append(time)
+        return {point: sum(values) / len(values) for point, values in times.items()}
+
+    def speedup_by_grid(self, build_x, build_y, host=None, class_name="DungeonHunterParallel", options=()):
+        """Speedup of build X over build Y (time_Y / time_X) per grid size, as the geometric mean
+        over the (factor, seed, threads, cutoff, options) points both builds measured"""
+        times_x = self.point_times(build_x, host, class_name, options)
+        times_y = self.point_times(build_y, host, class_name, options)
+        ratios = defaultdict(list)
+        for point, time_x in times_x.items():
+            time_y = times_y.get(point)
+            if time_x and time_y:
+                ratios[point[0]].append(time_y / time_x)
+        return [{'grid_size': grid,
+                 'speedup': math.exp(sum(math.log(r) for r in values) / len(values)),
+                 'min_speedup': min(values),
+                 'max_speedup': max(values),
+                 'points': len(values)}
+                for grid, values in sorted(ratios.items())]
+
+
+def variant_options(options):
+    """Stored options without the thread/cutoff flags, which the configs table already keys on.
+
+    serialprofiler used to store its raw launch flags; those rows map to the
+    plain configuration, or to "visualise" when the PNGs were not skipped.
+    """
+    variant = [option for option in options if not option.startswith(POINT_FLAGS)
+               and option not in (result_record.RECORD_FLAG, result_record.NO_VISUALISE_FLAG)]
+    if result_record.RECORD_FLAG in options and result_record.NO_VISUALISE_FLAG not in options:
+        variant.append("visualise")
+    return tuple(variant)
+
+
+# ---------------- Command Line ----------------
+USAGE = """usage:
+  python results_store.py hosts
+  python results_store.py builds
+  python results_store.py speedup <build_x> <build_y> [host] [class] [--option=<flag> ...] [--all-options]
+  python results_store.py import <results_dir> <host_name> <build_label>"""
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ("hosts", "builds", "speedup", "import"):
+        print(USAGE)
+        sys.exit(2)
+    store = ResultsStore(os.environ.get("DUNGEON_RESULTS_DB", RESULTS_DB))
+    command = sys.argv[1]
+    positional = [arg for arg in sys.argv[2:] if not arg.startswith("--")]
+    if command == "hosts":
+        for name, fingerprint, cpus, sweeps in store.hosts():
+            print(f"{name or '?':30s} {fingerprint}  {cpus or '?'} cpus  {sweeps} sweep(s)")
+    elif command == "builds":
+        for label, digest, first_seen, sweeps in store.builds():
+            print(f"{label or '?':20s} {digest}  {first_seen}  {sweeps} sweep(s)")
+    elif command == "speedup" and len(positional) >= 2:
+        # --option=<flag> (repeatable) selects one option set; --all-options compares every set with itself
+        options = [arg.split("=", 1)[1] for arg in sys.argv[2:] if arg.startswith("--option=")]
+        try:
+            rows = store.speedup_by_grid(positional[0], positional[1], positional[2] if len(positional) > 2 else None,
+                                         positional[3] if len(positional) > 3 else "DungeonHunterParallel",
+                                         None if "--all-options" in sys.argv else options)
+        except ValueError as e:
+            print(e)
+            sys.exit(2)
+        print(f"Speedup of {positional[0]} over {positional[1]} (time_{positional[1]} / time_{positional[0]})")
+        print("Options: " + ("all, matched per set" if "--all-options" in sys.argv else " ".join(options) or "default"))
+        print("Grid_Size | Speedup | Min   | Max   | Points")
+        for row in rows:
+            print(f"{row['grid_size']:9d} | {row['speedup']:7.3f} | {row['min_speedup']:5.2f} | "
+                  f"{row['max_speedup']:5.2f} | {row['points']}")
+    elif command == "import" and len(sys.argv) >= 5:
+        print(f"Imported {store.import_results(sys.argv[2], sys.argv[3], sys.argv[4])} result(s)")
+    else:
+        print(USAGE)
+        sys.exit(2)
+    store.close()
@@ -0,0 +1,134 @@
+import statistics
+from collections import defaultdict
+
+
+def default_thread_counts(max_threads):
+    """1, 2, 4, ... up to max_threads, always ending at max_threads"""
+    counts, threads = [], 1
+    while threads < max_threads:
+        counts.append(threads)
+        threads *= 2
+    counts.append(max_threads)
+    return counts
+
+
+def amdahl_speedup(serial_fraction, threads):
+    return 1.0 / (serial_fraction + (1.0 - serial_fraction) / threads)
+
+
+def fit_serial_fraction(threads, speedups):
+    """Least-squares Amdahl serial fraction f from measured (threads, speedup) pairs.
+
+    Amdahl gives 1/S - 1/p = f * (1 - 1/p), a line through the origin, so
+    f = sum(a*b) / sum(a*a) with a = 1 - 1/p and b = 1/S - 1/p.
+    """
+    a = [1 - 1 / p for p in threads]
+    b = [1 / s - 1 / p for p, s in zip(threads, speedups)]
+    denominator = sum(x * x for x in a)
+    if denominator == 0:
+        return None
+    return sum(x * y for x, y in zip(a, b)) / denominator
+
+
+def karp_flatt(speedup, threads):
+    """Experimentally determined serial fraction; growing values with p point at parallel overhead"""
+    if threads <= 1 or not speedup:
+        return None
+    return (1 / speedup - 1 / threads) / (1 - 1 / threads)
+
+
+def scaling_knee(threads, speedups, min_marginal=0.25):
+    """Thread count after which each additional core adds less than `min_marginal` to the speedup"""
+    for i in range(len(threads) - 1):
+        gain = (speedups[i + 1] - speedups[i]) / (threads[i + 1] - threads[i])
+        if gain < min_marginal:
+            return threads[i]
+    return threads[-1] if threads else None
+
+
+def strong_scaling_points(serial_results, parallel_results):
+    """Per-configuration speedups of every parallel run over the matching serial median"""
+    serial = {(r['grid_size'], r['num_searches_factor'], r['random_seed']): r for r in serial_results}
+    points = []
+    for p in parallel_results:
+        s = serial.get((p['grid_size'], p['num_searches_factor'], p['random_seed']))
+        if not s or not p.get('threads'):
+            continue
+        speedup = s['median_time'] / p['median_time']
+        points.append({
+            'grid_size': p['grid_size'],
+            'num_searches_factor': p['num_searches_factor'],
+            'random_seed': p['random_seed'],
+            'threads': p['threads'],
+            'serial_median': s['median_time'],
+            'parallel_median': p['median_time'],
+            'speedup': speedup,
+            'efficiency': speedup / p['threads'],
+            'karp_flatt': karp_flatt(speedup, p['threads'])
+        })
+    return points
+
+
+def fit_strong_scaling(points, min_marginal=0.25):
+    """Amdahl fit, Karp–Flatt series and knee per grid size (median speedup over factors and seeds)"""
+    by_grid = defaultdict(lambda: defaultdict(list))
+    for point in points:
+        by_grid[point['grid_size']][point['threads']].append(point['speedup'])
+
+    fits = []
+    for grid in sorted(by_grid):
+        threads = sorted(by_grid[grid])
+        speedups = [statistics.median(by_grid[grid][t]) for t in threads]
+        serial_fraction = fit_serial_fraction(threads, speedups)
+        fits.append({
+            'grid_size': grid,
+            'threads': threads,
+            'speedups': speedups,
+            'serial_fraction': serial_fraction,
+            'max_speedup': 1 / serial_fraction if serial_fraction and serial_fraction > 0 else None,
+            'karp_flatt': [karp_flatt(s, t) for t, s in zip(threads, speedups)],
+            'knee': scaling_knee(threads, speedups, min_marginal)
+        })
+    return fits
+
+
+def weak_scaling_config(base_grid, base_factor, threads, scale="grid"):
+    """(grid_size, num_searches_factor) with `threads` times the single-thread work.
+
+    scale="grid" grows the dungeon side by sqrt(threads), so the area, the
+    number of searches and the cells to evaluate all grow with the thread
+    count. scale="factor" keeps the dungeon and multiplies the searches.
+    """
+    if scale == "grid":
+        return max(1, round(base_grid * threads ** 0.5)), base_factor
+    if scale == "factor":
+        return base_grid, base_factor * threads
+    raise ValueError(f"Unknown weak-scaling mode {scale}")
+
+
+def weak_scaling_points(runs):
+    """Scaled efficiency and per-core throughput from (base_grid, threads, record) triples.
+
+    Each base grid and seed is compared with its own single-thread run:
+    scaled efficiency = T(1) / T(p) with the work grown p times.
+    """
+    baselines = {(base, r['random_seed']): r for base, threads, r in runs if threads == 1}
+    points = []
+    for base, threads, r in runs:
+        seconds = r['median_time'] / 1000
+        evaluated = r['solution_info'].get('grid_points_evaluated')
+        searches = r['solution_info'].get('num_searches')
+        baseline = baselines.get((base, r['random_seed']))
+        points.append({
+            'base_grid': base,
+            'grid_size': r['grid_size'],
+            'num_searches_factor': r['num_searches_factor'],
+            'random_seed': r['random_seed'],
+            'threads': threads,
+            'median_time': r['median_time'],
+            'grid_points_evaluated': evaluated,
+            'points_per_second_per_core': evaluated / seconds / threads if evaluated and seconds else None,
+            'searches_per_second_per_core': searches / seconds / threads if searches and seconds else None,
+            'scaled_efficiency': baseline['median_time'] / r['median_time'] if baseline else None
+        })
+    return points
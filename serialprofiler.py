@@ -4,67 +4,101 @@ import csv
 import statistics
 import os
 from datetime import datetime
+from jvm_server import DungeonHunterServerClient
+from measurement import MeasurementPolicy, measure
+from result_cache import ResultCache
+import result_record
+from process_accounting import cpu_utilisation, run_with_rusage, summarise_rusage
+from results_store import RESULTS_DB, ResultsStore
 
 class SerialDungeonHunterProfiler:
-    def __init__(self, classpath="bin", java_path=None):
+    def __init__(self, classpath="bin", java_path=None, use_server=False, measurement=None,
+                 cache_path="benchmark_cache.jsonl", visualise=False, store_path=RESULTS_DB):
         self.classpath = classpath
         self.java_path = java_path or "java"
         self.serial_class = "DungeonHunter"
         self.results = []
+        # Repetition policy (warmup, adaptive CI-driven runs); None keeps a fixed number of runs
+        self.measurement = measurement
+        # Resumable on-disk cache of every finished run (None disables it)
+        self.cache = ResultCache(cache_path, self.classpath, self.java_path,
+                                 payload_fields=("rusage",)) if cache_path else None
+        # Skip the PNG power maps unless asked for them, so timings cover the hunt only
+        self.visualise = visualise
+        self.jvm_flags = [result_record.RECORD_FLAG] + ([] if visualise else [result_record.NO_VISUALISE_FLAG])
+        # Every measured configuration also goes to the shared SQLite store (None disables it)
+        self.store = ResultsStore(store_path, self.classpath, self.java_path, "serialprofiler") if store_path else None
+        # Client mode: run every test inside one long-lived DungeonHunterServer JVM
+        self.server = DungeonHunterServerClient(
+            [self.java_path] + self.jvm_flags + ["-cp", self.classpath, "DungeonHunterServer"]) if use_server else None
+
+    def execute(self, args, timeout):
+        """Run the serial program once, in the server JVM when client mode is enabled"""
+        if self.server:
+            return self.server.run(self.serial_class, args, timeout=timeout)
+        # Reaped with wait4: the result carries the JVM's rusage
+        return run_with_rusage(
+            [self.java_path] + self.jvm_flags + ["-cp", self.classpath, self.serial_class] + args,
+            timeout=timeout
+        )
 
     def run_program(self, grid_size, num_searches_factor, random_seed, runs=3):
-        """Run the serial program multiple times and return average timing"""
-        times = []
+        """Run the serial program according to the measurement policy and return timing statistics"""
         args = [str(grid_size), str(num_searches_factor), str(random_seed)]
+        policy = self.measurement or MeasurementPolicy(runs=runs)
+        key = self.cache.key(self.serial_class, args, self.jvm_flags + (["server"] if self.server else [])) if self.cache else None
+        cached = self.cache.samples(key)[:policy.max_runs] if self.cache else []
 
-        for run in range(runs):
+        def run_once():
             start_time = time.time()
+            result = self.execute(args, timeout=300)  # 5 minute timeout
+            end_time = time.time()
+
+            if result.returncode != 0:
+                raise RuntimeError(f"Error running with args {args}: {result.stderr}")
+
+            # Extract execution time from output or use wall clock time
+            program_time = self.extract_execution_time(result.stdout)
+            if program_time is None:
+                program_time = (end_time - start_time) * 1000  # Convert to ms
+            return program_time, {'rusage': getattr(result, 'rusage', None)}
+
+        def keep(program_time, payload):
+            # Warmup runs are not cached: they would come back as real samples next session
+            self.cache.append(key, self.serial_class, args, program_time, payload)
+
+        try:
+            return measure(run_once, policy, samples=cached, on_sample=keep if self.cache else None)
+        except subprocess.TimeoutExpired:
+            print(f"Timeout for grid size {grid_size}")
+            return None
+        except RuntimeError as e:
+            print(e)
+            return None
+        except Exception as e:
+            print(f"Exception: {e}")
+            return None
 
-            try:
-                result = subprocess.run(
-                    [self.java_path, "-cp", self.classpath, self.serial_class] + args,
-                    capture_output=True,
-                    text=True,
-                    timeout=300  # 5 minute timeout
-                )
-
-                end_time = time.time()
-
-                if result.returncode != 0:
-                    print(f"Error running with args {args}: {result.stderr}")
-                    return None
-
-                # Extract execution time from output or use wall clock time
-                program_time = self.extract_execution_time(result.stdout)
-                if program_time is None:
-                    program_time = (end_time - start_time) * 1000  # Convert to ms
-
-                times.append(program_time)
-
-            except subprocess.TimeoutExpired:
-                print(f"Timeout for grid size {grid_size}")
-                return None
-            except Exception as e:
-                print(f"Exception: {e}")
-                return None
-
+    def extract_execution_time(self, output):
+        """Extract execution time from the JSON record, or the text output of older builds"""
+        return result_record.execution_time(output)
+
+    @staticmethod
+    def usage_columns(outputs):
+        """Median rusage over the runs; empty in server mode, where runs share one JVM"""
+        usage = summarise_rusage([(output or {}).get('rusage') for output in outputs])
+        if not usage:
+            return {}
+        utilisation = cpu_utilisation(usage, 1)
         return {
-            'avg_time': statistics.mean(times),
-            'std_time': statistics.stdev(times) if len(times) > 1 else 0,
-            'times': times
+            'cpu_time_ms': round(usage['cpu_time_ms'], 2),
+            'cpu_utilisation': round(utilisation, 3) if utilisation is not None else None,
+            'max_rss_kb': round(usage['max_rss_kb']),
+            'voluntary_switches': usage['voluntary_switches'],
+            'involuntary_switches': usage['involuntary_switches'],
+            'major_faults': usage['major_faults'],
         }
 
-    def extract_execution_time(self, output):
-        """Extract execution time from program output"""
-        for line in output.split('\n'):
-            if 'time:' in line and 'ms' in line:
-                try:
-                    time_str = line.split('time:')[1].split('ms')[0].strip()
-                    return float(time_str)
-                except:
-                    continue
-        return None
-
     def profile_serial(self, grid_sizes, num_searches_factors, random_seeds, runs=3):
         """Profile the serial version across different parameters"""
         print("Profiling Serial DungeonHunter...")
@@ -82,6 +116,10 @@ class SerialDungeonHunterProfiler:
                     result = self.run_program(grid_size, num_searches_factor, random_seed, runs)
 
                     if result:
+                        if self.store:
+                            self.store.add_result(self.serial_class, dict(
+                                result, grid_size=grid_size, num_searches_factor=num_searches_factor,
+                                random_seed=random_seed), ["visualise"] if self.visualise else [])
                         self.results.append({
                             'grid_size': grid_size,
                             'grid_area': grid_size * grid_size,
@@ -92,9 +130,16 @@ class SerialDungeonHunterProfiler:
                             'run1_time_ms': round(result['times'][0], 2) if len(result['times']) > 0 else None,
                             'run2_time_ms': round(result['times'][1], 2) if len(result['times']) > 1 else None,
                             'run3_time_ms': round(result['times'][2], 2) if len(result['times']) > 2 else None,
+                            'median_time_ms': round(result['median_time'], 2),
+                            'ci_low_ms': round(result['ci_low'], 2),
+                            'ci_high_ms': round(result['ci_high'], 2),
+                            'runs': result['runs'],
+                            **self.usage_columns(result['outputs']),
                         })
 
                         print(f"  Average time: {result['avg_time']:.2f} ± {result['std_time']:.2f} ms")
+                        print(f"  Median time: {result['median_time']:.2f} ms "
+                              f"[{result['ci_low']:.2f}, {result['ci_high']:.2f}] over {result['runs']} runs")
                     else:
                         print(f"  Failed to run")
 
@@ -115,7 +160,10 @@ class SerialDungeonHunterProfiler:
         with open(filename, 'w', newline='') as csvfile:
             fieldnames = [
                 'grid_size', 'grid_area', 'num_searches_factor', 'random_seed',
-                'avg_time_ms', 'std_time_ms', 'run1_time_ms', 'run2_time_ms', 'run3_time_ms'
+                'avg_time_ms', 'std_time_ms', 'run1_time_ms', 'run2_time_ms', 'run3_time_ms',
+                'median_time_ms', 'ci_low_ms', 'ci_high_ms', 'runs',
+                'cpu_time_ms', 'cpu_utilisation', 'max_rss_kb', 'voluntary_switches', 'involuntary_switches',
+                'major_faults'
             ]
 
             writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
@@ -139,11 +187,15 @@ class SerialDungeonHunterProfiler:
         print(f"- Grid sizes: {grid_sizes}")
         print(f"- Search factors: {num_searches_factors}")
         print(f"- Random seeds: {random_seeds}")
-        print(f"- Runs per test: 3")
+        print(f"- Runs per test: {(self.measurement or MeasurementPolicy()).describe()}")
         print()
 
         # Profile the serial version
-        self.profile_serial(grid_sizes, num_searches_factors, random_seeds)
+        try:
+            self.profile_serial(grid_sizes, num_searches_factors, random_seeds)
+        finally:
+            if self.server:
+                self.server.close()
 
         # Save results
         if self.results:
@@ -0,0 +1,57 @@
+/**
+ * CutoffTable.java
+ *
+ * Sequential cutoff for DungeonSearch, chosen per run.
+ * An explicit -Ddungeon.cutoff=N wins; otherwise the tuning table written by
+ * benchmark_script.py (-Ddungeon.tuning=path, default dungeon_tuning.csv in the
+ * working directory) is searched for the nearest (gridSize, numSearches, threads)
+ * bucket; otherwise DEFAULT_CUTOFF is used.
+ *
+ * Table format: header line, then "gridSize,numSearches,threads,cutoff" rows.
+ *
+ * Emmanuel Basua 2025
+ */
+
+import java.io.BufferedReader;
+import java.io.FileReader;
+import java.io.IOException;
+
+class CutoffTable {
+    static final int DEFAULT_CUTOFF = 10;
+    static final String DEFAULT_TABLE = "dungeon_tuning.csv";
+
+    static int cutoffFor(int gridSize, int numSearches, int threads) {
+        Integer explicit = Integer.getInteger("dungeon.cutoff");
+        if (explicit != null) return Math.max(1, explicit);
+
+        String path = System.getProperty("dungeon.tuning", DEFAULT_TABLE);
+        int best = DEFAULT_CUTOFF;
+        double bestDistance = Double.MAX_VALUE;
+        try (BufferedReader in = new BufferedReader(new FileReader(path))) {
+            String line = in.readLine(); // header
+            while ((line = in.readLine()) != null) {
+                String[] fields = line.trim().split(",");
+                if (fields.length < 4) continue;
+                try {
+                    // Buckets are compared on a log scale: numSearches spans four orders of magnitude
+                    double distance = logDistance(gridSize, Integer.parseInt(fields[0].trim()))
+                            + logDistance(numSearches, Integer.parseInt(fields[1].trim()))
+                            + logDistance(threads, Integer.parseInt(fields[2].trim()));
+                    if (distance < bestDistance) {
+                        bestDistance = distance;
+                        best = Integer.parseInt(fields[3].trim());
+                    }
+                } catch (NumberFormatException e) {
+                    // skip malformed rows
+                }
+            }
+        } catch (IOException e) {
+            return DEFAULT_CUTOFF; // no table: untuned default
+        }
+        return Math.max(1, best);
+    }
+
+    private static double logDistance(int a, int b) {
+        return Math.abs(Math.log(Math.max(a, 1)) - Math.log(Math.max(b, 1)));
+    }
+}
@@ -74,7 +74,9 @@ class DungeonHunter{
     	xmax = gateSize;
     	ymin = -gateSize;
     	ymax = gateSize;
+    	long mapStart=System.nanoTime(); //phase timings for the JSON record
     	dungeon = new DungeonMap(xmin,xmax,ymin,ymax,randomSeed); // Initialize dungeon
+    	long mapEnd=System.nanoTime();
     	
     	int dungeonRows=dungeon.getRows();
     	int dungeonColumns=dungeon.getColumns();
@@ -86,11 +88,13 @@ class DungeonHunter{
     		searches[i]=new Hunt(i+1, rand.nextInt(dungeonRows),
     				rand.nextInt(dungeonColumns),dungeon);
     	
+    	long setupEnd=System.nanoTime();
     	//do all the searches 	
     	int max =Integer.MIN_VALUE;
     	int localMax=Integer.MIN_VALUE;
        	int finder =-1;
     	tick();  //start timer
+    	long searchStart=System.nanoTime();
      	for  (int i=0;i<numSearches;i++) {
     		localMax=searches[i].findManaPeak();
     		if(localMax>max) {
@@ -100,6 +104,7 @@ class DungeonHunter{
     		if(DEBUG) System.out.println("Shadow "+searches[i].getID()+" finished at  "+localMax + " in " +searches[i].getSteps());
     	}
    		tock(); //end timer
+   		long searchEnd=System.nanoTime();
    		
 		System.out.printf("\t dungeon size: %d,\n", gateSize);
 		System.out.printf("\t rows: %d, columns: %d\n", dungeonRows, dungeonColumns);
@@ -114,7 +119,38 @@ class DungeonHunter{
 		/* Results*/
 		System.out.printf("Dungeon Master (mana %d) found at:  ", max );
 		System.out.printf("x=%.1f y=%.1f\n\n",dungeon.getXcoord(searches[finder].getPosRow()), dungeon.getYcoord(searches[finder].getPosCol()) );
-		dungeon.visualisePowerMap("visualiseSearch.png", false);
-		dungeon.visualisePowerMap("visualiseSearchPath.png", true);
+		long visualiseStart=System.nanoTime();
+		if(PowerMapRenderer.ENABLED) dungeon.visualise("visualiseSearch.png", "visualiseSearchPath.png"); //skip with -Ddungeon.visualise=false
+		long visualiseEnd=System.nanoTime();
+		if(RunRecord.ENABLED) { //machine-readable copy of the results (-Ddungeon.json=true)
+			long stepsTotal=0;
+			int stepsMax=0;
+			for (int i=0;i<numSearches;i++) {
+				stepsTotal+=searches[i].getSteps();
+				if(searches[i].getSteps()>stepsMax) stepsMax=searches[i].getSteps();
+			}
+			System.out.println(new RunRecord()
+					.add("program", "DungeonHunter")
+					.add("gridSize", gateSize)
+					.add("rows", dungeonRows)
+					.add("columns", dungeonColumns)
+					.add("numSearches", numSearches)
+					.add("timeMs", endTime - startTime)
+					.add("mana", max)
+					.add("row", searches[finder].getPosRow())
+					.add("col", searches[finder].getPosCol())
+					.add("x", dungeon.getXcoord(searches[finder].getPosRow()))
+					.add("y", dungeon.getYcoord(searches[finder].getPosCol()))
+					.add("gridPointsEvaluated", tmp)
+					.add("stepsTotal", stepsTotal)
+					.add("stepsMax", stepsMax)
+					.add("stepsMean", stepsTotal*1.0/numSearches)
+					.add("threads", 1)
+					.add("phases", new RunRecord() //the max-reduction is folded into the search loop here
+							.addMillis("mapInitMs", mapEnd - mapStart)
+							.addMillis("huntSetupMs", setupEnd - mapEnd)
+							.addMillis("searchMs", searchEnd - searchStart)
+							.addMillis("visualisationMs", visualiseEnd - visualiseStart)));
+		}
     }
 }
\ No newline at end of file
@@ -6,7 +6,9 @@
  * to locate the global maximum.
  *
  * Usage:
- *   java DungeonHunterParallel <gridSize> <numSearches> <randomSeed>
+ *   java [-Ddungeon.threads=N] [-Ddungeon.cutoff=N | -Ddungeon.tuning=table.csv] [-Ddungeon.mode=deterministic]
+ *        [-Ddungeon.fill=lazy|eager|auto] [-Ddungeon.eagerCoverage=0.5]
+ *        DungeonHunterParallel <gridSize> <numSearches> <randomSeed>
  *
  * Emmanexiuel Basua
  */
@@ -14,33 +16,42 @@
 import java.util.Random;
 import java.util.concurrent.ForkJoinPool;
 import java.util.concurrent.RecursiveAction;
+import java.util.concurrent.RecursiveTask;
 
 class DungeonSearch extends RecursiveAction {
-    private static final int SEQUENTIAL_CUTOFF = 10; // Adjust based on testing
+    static final int RACY = 0;   // findManaPeak on the shared map, last writer wins
+    static final int CLAIM = 1;  // deterministic mode, phase 1
+    static final int REPLAY = 2; // deterministic mode, phase 2
 
     private HuntParallel[] searches;
     private int lo, hi;
     private int[] results;
+    private int cutoff; // Ranges shorter than this run sequentially (see CutoffTable)
+    private int phase;
 
-    public DungeonSearch(HuntParallel[] searches, int lo, int hi, int[] results) {
+    public DungeonSearch(HuntParallel[] searches, int lo, int hi, int[] results, int cutoff, int phase) {
         this.searches = searches;
         this.lo = lo;
         this.hi = hi;
         this.results = results;
+        this.cutoff = cutoff;
+        this.phase = phase;
     }
 
     @Override
     protected void compute() {
-        if (hi - lo < SEQUENTIAL_CUTOFF) {
+        if (hi - lo < cutoff) {
             // Sequential execution for small ranges
             for (int i = lo; i < hi; i++) {
-                results[i] = searches[i].findManaPeak();
+                if (phase == CLAIM) searches[i].claimPath();
+                else if (phase == REPLAY) results[i] = searches[i].replayPath();
+                else results[i] = searches[i].findManaPeak();
             }
         } else {
             // Divide and conquer
             int mid = (lo + hi) / 2;
-            DungeonSearch left = new DungeonSearch(searches, lo, mid, results);
-            DungeonSearch right = new DungeonSearch(searches, mid, hi, results);
+            DungeonSearch left = new DungeonSearch(searches, lo, mid, results, cutoff, phase);
+            DungeonSearch right = new DungeonSearch(searches, mid, hi, results, cutoff, phase);
 
             left.fork();
             right.compute();
@@ -49,9 +60,86 @@ class DungeonSearch extends RecursiveAction {
     }
 }
 
+/**
+ * Settles the tiles of a deterministic run, or trims those of an eager racy run;
+ * each task counts its own tiles, no shared counter
+ */
+class TileScan extends RecursiveTask<Integer> {
+    private static final int TILES_PER_TASK = 16;
+
+    private DungeonMapParallel dungeon;
+    private int lo, hi;
+    private boolean trim;
+
+    public TileScan(DungeonMapParallel dungeon, int lo, int hi, boolean trim) {
+        this.dungeon = dungeon;
+        this.lo = lo;
+        this.hi = hi;
+        this.trim = trim;
+    }
+
+    @Override
+    protected Integer compute() {
+        if (hi - lo <= TILES_PER_TASK) {
+            int evaluated = 0;
+            for (int i = lo; i < hi; i++) {
+                evaluated += trim ? dungeon.trimTile(i) : dungeon.settleTile(i);
+            }
+            return evaluated;
+        }
+        int mid = (lo + hi) / 2;
+        TileScan left = new TileScan(dungeon, lo, mid, trim);
+        TileScan right = new TileScan(dungeon, mid, hi, trim);
+        left.fork();
+        return right.compute() + left.join();
+    }
+}
+
+/** Eager mode: fills the whole mana map before the hunts, one block of tile rows per leaf */
+class ManaFill extends RecursiveAction {
+    // One tile row: every tile is written by exactly one task
+    private static final int ROWS_PER_TASK = TiledDungeonGrid.TILE_SIZE;
+
+    private DungeonMapParallel dungeon;
+    private int lo, hi;
+
+    public ManaFill(DungeonMapParallel dungeon, int lo, int hi) {
+        this.dungeon = dungeon;
+        this.lo = lo;
+        this.hi = hi;
+    }
+
+    @Override
+    protected void compute() {
+        if (hi - lo <= ROWS_PER_TASK) {
+            dungeon.fillRows(lo, hi);
+            return;
+        }
+        // Split on a tile-row boundary
+        int mid = lo + Math.max(1, (hi - lo) / ROWS_PER_TASK / 2) * ROWS_PER_TASK;
+        ManaFill left = new ManaFill(dungeon, lo, mid);
+        ManaFill right = new ManaFill(dungeon, mid, hi);
+        left.fork();
+        right.compute();
+        left.join();
+    }
+}
+
 class DungeonHunterParallel {
     static final boolean DEBUG = false;
-    private static final ForkJoinPool fjPool = new ForkJoinPool();
+    // Pool parallelism, -Ddungeon.threads=N for strong-scaling runs (default: available processors)
+    private static final ForkJoinPool fjPool = new ForkJoinPool(
+            Integer.getInteger("dungeon.threads", Runtime.getRuntime().availableProcessors()));
+    // -Ddungeon.mode=deterministic: CAS-claimed paths, results identical to DungeonHunter.
+    // Walks every path twice plus a tile scan; measure its cost with `benchmark_script.py modes`
+    // before relying on it where throughput matters. The racy mode stays the default.
+    static final boolean DETERMINISTIC = "deterministic".equals(System.getProperty("dungeon.mode"));
+    // -Ddungeon.fill: "lazy" (the default) evaluates mana on demand inside the climbs, "eager" fills the
+    // whole map in parallel first, "auto" fills eagerly when the expected coverage reaches EAGER_COVERAGE.
+    // The 0.5 threshold is uncalibrated; `benchmark_script.py fill` measures one per machine and the
+    // profilers then pass it with -Ddungeon.fill=auto
+    static final String FILL = System.getProperty("dungeon.fill", "lazy");
+    static final double EAGER_COVERAGE = Double.parseDouble(System.getProperty("dungeon.eagerCoverage", "0.5"));
 
     // Timers for how long it all takes
     static long startTime = 0;
@@ -84,6 +172,10 @@ class DungeonHunterParallel {
 
             numSearches = (int) (Double.parseDouble(args[1]) * (gateSize * 2) * (gateSize * 2) * DungeonMapParallel.RESOLUTION);
 
+            if (!FILL.equals("auto") && !FILL.equals("lazy") && !FILL.equals("eager")) {
+                throw new IllegalArgumentException("dungeon.fill must be auto, lazy or eager.");
+            }
+
             randomSeed = Integer.parseInt(args[2]);
             if (randomSeed < 0) {
                 throw new IllegalArgumentException("Random seed must be non-negative.");
@@ -102,7 +194,9 @@ class DungeonHunterParallel {
         xmax = gateSize;
         ymin = -gateSize;
         ymax = gateSize;
-        dungeon = new DungeonMapParallel(xmin, xmax, ymin, ymax, randomSeed); // Initialize dungeon
+        long mapStart = System.nanoTime(); // Phase timings for the JSON record
+        dungeon = new DungeonMapParallel(xmin, xmax, ymin, ymax, randomSeed, DETERMINISTIC); // Initialize dungeon
+        long mapEnd = System.nanoTime();
 
         int dungeonRows = dungeon.getRows();
         int dungeonColumns = dungeon.getColumns();
@@ -116,11 +210,33 @@ class DungeonHunterParallel {
 
         // Do all the searches in parallel
         int[] results = new int[numSearches];
+        int cutoff = CutoffTable.cutoffFor(gateSize, numSearches, fjPool.getParallelism());
+        double coverage = dungeon.expectedCoverage(numSearches);
+        boolean eager = FILL.equals("eager") || (FILL.equals("auto") && coverage >= EAGER_COVERAGE);
+        long setupEnd = System.nanoTime();
 
         tick();  // Start timer
 
+        if (eager) {
+            // Every cell is evaluated once up front; the climbs below only read mana
+            fjPool.invoke(new ManaFill(dungeon, 0, dungeonRows));
+        }
+        long fillEnd = System.nanoTime();
+
         // Execute parallel search using ForkJoin
-        fjPool.invoke(new DungeonSearch(searches, 0, numSearches, results));
+        if (DETERMINISTIC) {
+            // Claim every path (smallest hunt id wins each cell), then replay the serial stopping rule
+            fjPool.invoke(new DungeonSearch(searches, 0, numSearches, results, cutoff, DungeonSearch.CLAIM));
+            fjPool.invoke(new DungeonSearch(searches, 0, numSearches, results, cutoff, DungeonSearch.REPLAY));
+            dungeon.setGridPointsEvaluated(fjPool.invoke(new TileScan(dungeon, 0, dungeon.getTileCount(), false)));
+        } else {
+            fjPool.invoke(new DungeonSearch(searches, 0, numSearches, results, cutoff, DungeonSearch.RACY));
+            if (eager) {
+                // Report and draw only the cells the climbs looked at, as the lazy mode does
+                dungeon.setGridPointsEvaluated(fjPool.invoke(new TileScan(dungeon, 0, dungeon.getTileCount(), true)));
+            }
+        }
+        long searchEnd = System.nanoTime();
 
         // Find the maximum result and which search found it
         int max = Integer.MIN_VALUE;
@@ -137,6 +253,7 @@ class DungeonHunterParallel {
         }
 
         tock(); // End timer
+        long reductionEnd = System.nanoTime();
 
         System.out.printf("\t dungeon size: %d,\n", gateSize);
         System.out.printf("\t rows: %d, columns: %d\n", dungeonRows, dungeonColumns);
@@ -151,7 +268,45 @@ class DungeonHunterParallel {
         /* Results */
         System.out.printf("Dungeon Master (mana %d) found at:  ", max);
         System.out.printf("x=%.1f y=%.1f\n\n", dungeon.getXcoord(searches[finder].getPosRow()), dungeon.getYcoord(searches[finder].getPosCol()));
-        dungeon.visualisePowerMap("visualiseSearch.png", false);
-        dungeon.visualisePowerMap("visualiseSearchPath.png", true);
+        long visualiseStart = System.nanoTime();
+        if (PowerMapRenderer.ENABLED) dungeon.visualise("visualiseSearch.png", "visualiseSearchPath.png"); // Skip with -Ddungeon.visualise=false
+        long visualiseEnd = System.nanoTime();
+        if (RunRecord.ENABLED) { // Machine-readable copy of the results (-Ddungeon.json=true)
+            long stepsTotal = 0;
+            int stepsMax = 0;
+            for (int i = 0; i < numSearches; i++) {
+                stepsTotal += searches[i].getSteps();
+                stepsMax = Math.max(stepsMax, searches[i].getSteps());
+            }
+            System.out.println(new RunRecord()
+                    .add("program", "DungeonHunterParallel")
+                    .add("gridSize", gateSize)
+                    .add("rows", dungeonRows)
+                    .add("columns", dungeonColumns)
+                    .add("numSearches", numSearches)
+                    .add("timeMs", endTime - startTime)
+                    .add("mana", max)
+                    .add("row", searches[finder].getPosRow())
+                    .add("col", searches[finder].getPosCol())
+                    .add("x", dungeon.getXcoord(searches[finder].getPosRow()))
+                    .add("y", dungeon.getYcoord(searches[finder].getPosCol()))
+                    .add("gridPointsEvaluated", tmp)
+                    .add("stepsTotal", stepsTotal)
+                    .add("stepsMax", stepsMax)
+                    .add("stepsMean", stepsTotal * 1.0 / numSearches)
+                    .add("threads", fjPool.getParallelism())
+                    .add("cutoff", cutoff)
+                    .add("mode", DETERMINISTIC ? "deterministic" : "racy")
+                    .add("gridBytes", dungeon.getGridBytes())
+                    .add("fill", eager ? "eager" : "lazy")
+                    .add("expectedCoverage", coverage)
+                    .add("phases", new RunRecord()
+                            .addMillis("mapInitMs", mapEnd - mapStart)
+                            .addMillis("huntSetupMs", setupEnd - mapEnd)
+                            .addMillis("fillMs", fillEnd - setupEnd)
+                            .addMillis("searchMs", searchEnd - fillEnd)
+                            .addMillis("reductionMs", reductionEnd - searchEnd)
+                            .addMillis("visualisationMs", visualiseEnd - visualiseStart)));
+        }
     }
 }
\ No newline at end of file
@@ -0,0 +1,101 @@
+/**
+ * DungeonHunterServer.java
+ *
+ * Long-lived benchmark driver for the Dungeon Hunter assignment.
+ * Keeps one JVM (and its JIT-compiled code) alive across many runs of
+ * DungeonHunter / DungeonHunterParallel so a benchmark sweep pays for JVM
+ * startup once instead of once per run.
+ *
+ * Protocol (one request per line on stdin):
+ *   <className> <gridSize> <numSearchesFactor> <randomSeed>
+ * The normal program output is echoed to stdout, followed by a terminator line:
+ *   @@END <elapsed ms>      the run completed
+ *   @@ERROR <message>       the request was rejected or the run failed
+ * A line containing QUIT (or end of input) stops the server.
+ *
+ * Usage:
+ *   java DungeonHunterServer
+ */
+
+import java.io.BufferedReader;
+import java.io.ByteArrayOutputStream;
+import java.io.IOException;
+import java.io.InputStreamReader;
+import java.io.PrintStream;
+import java.util.Arrays;
+
+class DungeonHunterServer {
+    static final String END = "@@END";
+    static final String ERROR = "@@ERROR";
+
+    public static void main(String[] args) throws IOException {
+        PrintStream protocol = System.out;
+        BufferedReader in = new BufferedReader(new InputStreamReader(System.in));
+        String line;
+
+        while ((line = in.readLine()) != null) {
+            line = line.trim();
+            if (line.isEmpty()) continue;
+            if (line.equals("QUIT")) break;
+
+            String[] request = line.split("\\s+");
+            String error = validate(request);
+            if (error != null) {
+                protocol.println(ERROR + " " + error);
+                protocol.flush();
+                continue;
+            }
+
+            // Capture the program's stdout so it can be framed by the terminator line
+            ByteArrayOutputStream buffer = new ByteArrayOutputStream();
+            long start = System.nanoTime();
+            System.setOut(new PrintStream(buffer, true));
+            try {
+                run(request[0], Arrays.copyOfRange(request, 1, request.length));
+            } catch (Exception e) {
+                error = e.toString().replace('\n', ' ');
+            } finally {
+                System.setOut(protocol);
+            }
+            long elapsed = (System.nanoTime() - start) / 1_000_000;
+
+            String output = buffer.toString();
+            protocol.print(output);
+            if (!output.isEmpty() && !output.endsWith("\n")) protocol.println();
+            protocol.println(error == null ? END + " " + elapsed : ERROR + " " + error);
+            protocol.flush();
+        }
+    }
+
+    private static void run(String className, String[] args) {
+        switch (className) {
+            case "DungeonHunter":
+                DungeonHunter.main(args);
+                break;
+            case "DungeonHunterParallel":
+                DungeonHunterParallel.main(args);
+                break;
+            default:
+                throw new IllegalArgumentException("Unknown class " + className);
+        }
+    }
+
+    /**
+     * Checks a request up front: the programs call System.exit on bad arguments,
+     * which would take the whole server down.
+     */
+    private static String validate(String[] request) {
+        if (request.length != 4) return "Expected: <className> <gridSize> <numSearchesFactor> <randomSeed>";
+        if (!request[0].equals("DungeonHunter") && !request[0].equals("DungeonHunterParallel")) {
+            return "Unknown class " + request[0];
+        }
+        try {
+            if (Integer.parseInt(request[1]) <= 0) return "Grid size must be greater than 0.";
+            Double.parseDouble(request[2]);
+            if (Integer.parseInt(request[3]) < 0) return "Random seed must be non-negative.";
+        } catch (NumberFormatException e) {
+            return "All arguments must be numeric.";
+        }
+        return null;
+    }
+}
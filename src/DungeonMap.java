@@ -14,12 +14,6 @@
 
 import java.util.Random;
 
-import javax.imageio.ImageIO;
-
-import java.awt.Color;
-import java.awt.image.BufferedImage;
-import java.io.File;
-
 public class DungeonMap {
 
 	public static final int PRECISION = 10000;
@@ -30,6 +24,9 @@ public class DungeonMap {
 	private int [][] manaMap;
 	private int [][] visit;
 	private int dungeonGridPointsEvaluated;
+	// Neighbour offsets in the order the climb tries them: LEFT, RIGHT, UP, DOWN, UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT
+	static final int[] DX = {-1, 1, 0, 0, -1, 1, -1, 1};
+	static final int[] DY = { 0, 0, -1, 1, -1, -1, 1, 1};
     private double bossX;
     private double bossY;
     private double decayFactor;  
@@ -121,9 +118,38 @@ public class DungeonMap {
 		return fixedPoint;
 	}
 
+	/**
+	 * Hunt kernel: the neighbouring cell with highest mana, as a packed cell (see pack),
+	 * or the cell itself at a local peak. Same neighbour order and strict comparison as
+	 * getNextStepDirection, so it takes the same step; nothing is allocated per call.
+	 */
+	long nextStep(int x, int y) {
+		int localMax = getManaLevel(x, y);
+		int bestX = x, bestY = y;
+		for (int i = 0; i < DX.length; i++) {
+			int newX = x + DX[i];
+			int newY = y + DY[i];
+			if (newX >= 0 && newX < rows && newY >= 0 && newY < columns) {
+				int power = getManaLevel(newX, newY);
+				if (power > localMax) {
+					localMax = power;
+					bestX = newX;
+					bestY = newY;
+				}
+			}
+		}
+		return pack(bestX, bestY);
+	}
+
+	// Packed cell: row in the high word, column in the low word
+	static long pack(int x, int y) { return ((long) x << 32) | y; }
+	static int rowOf(long cell) { return (int) (cell >>> 32); }
+	static int colOf(long cell) { return (int) cell; }
+
 	//work out where to go next - move in direction of highest mana
 	 /**
      * Function to return the neighbouring cell direction with highest mana 
+     * Reference version of nextStep, kept for HuntKernelCheck.
      * @param x_coord The x-coordinate in the dungeon grid.
      * @param y_coord The y-coordinate in the dungeon grid.
      * @return the direction of highest mana.
@@ -178,81 +204,19 @@ public class DungeonMap {
      * @param filename The name of the output PNG file.
      */
 	public void visualisePowerMap(String filename, boolean path) {
-	    int width = manaMap.length;
-	    int height = manaMap[0].length;
-
-	    //output image
-	    BufferedImage image = new BufferedImage(width, height, BufferedImage.TYPE_INT_RGB);
-
-	    // Find min and max for normalization (ignore unvisited sites)
-	    int min = Integer.MAX_VALUE;
-	    int max = Integer.MIN_VALUE;	    
-	    
-	    for (int x = 0; x < width; x++) {
-	        for (int y = 0; y < height; y++) {
-	            int value = manaMap[x][y];
-	            if (value==Integer.MIN_VALUE)  continue; // ignore unvisited sites
-	            if (value < min) min = value;
-	            if (value > max) max = value;
-	        }
-	    }
-	    // Prevent division by zero if everything has the same value
-	    double range = (max > min) ? (max - min) : 1.0;
-
-	    // Map height values to colors
-	    for (int x = 0; x < width; x++) {
-	        for (int y = 0; y < height; y++) {
-	            Color color;
-
-	            if (path && !visited(x, y)) color = Color.BLACK; //view path only, all not visited black
-	            else if (manaMap[x][y]==Integer.MIN_VALUE) color = Color.BLACK; // not evaluated black
-	            else {
-	                double normalized = (manaMap[x][y] - min) / range; // 0–1
-	                color = mapHeightToColor(normalized);
-	            }
-	            image.setRGB(x, height - 1 - y, color.getRGB());
-	        }
-	    }
-	    try {
-	        File output = new File(filename);
-	        ImageIO.write(image, "png", output);
-	        System.out.println("map saved to " + filename);
-	    } catch (Exception e) {
-	        e.printStackTrace();
-	    }
+	    if (path) visualise(null, filename);
+	    else visualise(filename, null);
 	}
 
 	/**
-	 * Maps normalized height [0..1] to black → purple → red → white.
+	 * Renders the search image and the path image in one pass (see PowerMapRenderer).
+	 * Either file name may be null to skip that image.
 	 */
-	private Color mapHeightToColor(double normalized) {
-	    normalized = Math.max(0, Math.min(1, normalized)); // clamp to [0,1]
-
-	    int r = 0, g = 0, b = 0;
-
-	    if (normalized < 0.33) {
-	        // Black -> Purple
-	        double t = normalized / 0.33;
-	        r = (int) (128 * t); // purple has some red
-	        g = 0;
-	        b = (int) (128 + 127 * t); // increasing blue
-	    } 
-	    else if (normalized < 0.66) {
-	        // Purple -> Red
-	        double t = (normalized - 0.33) / 0.33;
-	        r = (int) (128 + 127 * t); // red dominates
-	        g = 0;
-	        b = (int) (255 - 255 * t); // fade out blue
-	    } 
-	    else {
-	        // Red -> White
-	        double t = (normalized - 0.66) / 0.34;
-	        r = 255;
-	        g = (int) (255 * t);
-	        b = (int) (255 * t);
-	    }
-
-	    return new Color(r, g, b);
+	public void visualise(String searchFile, String pathFile) {
+	    PowerMapRenderer.render(new PowerMapRenderer.Cells() {
+	        public int mana(int x, int y) { return manaMap[x][y]; }
+	        public boolean visited(int x, int y) { return DungeonMap.this.visited(x, y); }
+	    }, manaMap.length, manaMap[0].length, searchFile, pathFile);
 	}
 
 	public int getGridPointsEvaluated() {
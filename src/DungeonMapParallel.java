@@ -6,29 +6,39 @@
 * Emmanuel Basua 2025
  * */
 import java.util.Random;
-import javax.imageio.ImageIO;
-import java.awt.Color;
-import java.awt.image.BufferedImage;
-import java.io.File;
 
 
 public class DungeonMapParallel {
 
     public static final int PRECISION = 10000;
     public static final int RESOLUTION = 5;
+    // expectedCoverage fit to the serial runs' gridPointsEvaluated
+    static final double COVERAGE_SCALE = 10.8;
+    static final double COVERAGE_EXPONENT = 0.765;
+    // Neighbour offsets in the order the climb tries them: LEFT, RIGHT, UP, DOWN, UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT
+    static final int[] DX = {-1, 1, 0, 0, -1, 1, -1, 1};
+    static final int[] DY = { 0, 0, -1, 1, -1, -1, 1, 1};
 
     private int rows, columns;
     private double xmin, xmax, ymin, ymax;
-    private volatile int[][] manaMap;  // volatile for visibility
-    private volatile int[][] visit;   // volatile for visibility
+    private final TiledDungeonGrid grid;  // lazily allocated mana values and visit bits
     private int dungeonGridPointsEvaluated;
     private double bossX;
     private double bossY;
     private double decayFactor;
+    // Column-only terms of the mana function, for the eager fill (see fillRows)
+    private final double[] yCoords, sinY5, cosY4, logY, sinY;
 
     public DungeonMapParallel(double xmin, double xmax,
                               double ymin, double ymax,
                               int seed) {
+        this(xmin, xmax, ymin, ymax, seed, false);
+    }
+
+    /** With trackOwners each cell records the smallest hunt id through it (deterministic mode) */
+    public DungeonMapParallel(double xmin, double xmax,
+                              double ymin, double ymax,
+                              int seed, boolean trackOwners) {
         this.xmin = xmin;
         this.xmax = xmax;
         this.ymin = ymin;
@@ -44,68 +54,173 @@ public class DungeonMapParallel {
         this.bossY = ymin + (ymax - ymin) * rand.nextDouble();
         this.decayFactor = 2.0 / (xRange * 0.1);
 
-        manaMap = new int[rows][columns];
-        visit = new int[rows][columns];
+        // Tiles start out "not evaluated"/"not visited": no sentinel pass over the grid
+        grid = new TiledDungeonGrid(rows, columns, trackOwners);
         dungeonGridPointsEvaluated = 0;
 
-        // Initialize arrays
-        for (int i = 0; i < rows; i++) {
-            for (int j = 0; j < columns; j++) {
-                manaMap[i][j] = Integer.MIN_VALUE;
-                visit[i][j] = -1;
-            }
+        yCoords = new double[columns];
+        sinY5 = new double[columns];
+        cosY4 = new double[columns];
+        logY = new double[columns];
+        sinY = new double[columns];
+        for (int y = 0; y < columns; y++) {
+            double y_coord = getYcoord(y);
+            yCoords[y] = y_coord;
+            sinY5[y] = Math.sin(y_coord / 5.0);
+            cosY4[y] = Math.cos(y_coord / 4.0);
+            logY[y] = Math.log(Math.abs(y_coord - Math.PI * 2) + 0.1);
+            sinY[y] = Math.sin(y_coord);
         }
     }
 
     // Lock-free visited check
     boolean visited(int x, int y) {
-        return visit[x][y] != -1;
+        return grid.visited(x, y);
     }
 
-    // Lock-free visited setting - race conditions acceptable
+    // Lock-free visited setting - only whether a cell was visited is kept, not by whom
     void setVisited(int x, int y, int id) {
-        visit[x][y] = id;  // Simple assignment, last writer wins
+        grid.setVisited(x, y);
+    }
+
+    // Deterministic mode: CAS-min claim, false once a smaller hunt id owns the cell
+    boolean claim(int x, int y, int id) {
+        return grid.claim(x, y, id);
+    }
+
+    int ownerOf(int x, int y) {
+        return grid.ownerOf(x, y);
+    }
+
+    int getTileCount() {
+        return grid.tileCount();
+    }
+
+    // Deterministic mode: mark owned cells visited, drop evaluations the serial order never makes
+    int settleTile(int index) {
+        return grid.settleTile(index);
+    }
+
+    // Eager fill: drop mana the climbs never looked at, count the cells they did
+    int trimTile(int index) {
+        return grid.trimTile(index);
+    }
+
+    // Replaces the racy counter with the exact count from the tile scan
+    void setGridPointsEvaluated(int evaluated) {
+        dungeonGridPointsEvaluated = evaluated;
     }
 
     /**
      * Lock-free mana calculation
      * Allows duplicate calculations to avoid synchronization overhead
+     * After fillRows has covered the map this is a plain read
      */
     int getManaLevel(int x, int y) {
         // Quick read without synchronization
-        int cached = manaMap[x][y];
+        int cached = grid.getMana(x, y);
         if (cached > Integer.MIN_VALUE) return cached;
 
         // Calculate mana without any locks
-        double x_coord = xmin + ((xmax - xmin) / rows) * x;
-        double y_coord = ymin + ((ymax - ymin) / columns) * y;
+        double x_coord = getXcoord(x);
+        double y_coord = getYcoord(y);
+        int fixedPoint = mana(x_coord, y_coord,
+                Math.cos(x_coord / 5.0), Math.sin(x_coord / 6.0), Math.sin(x_coord),
+                Math.sin(y_coord / 5.0), Math.cos(y_coord / 4.0),
+                Math.log(Math.abs(y_coord - Math.PI * 2) + 0.1), Math.sin(y_coord));
+
+        // Write without synchronization - multiple threads might overwrite with same value
+        grid.setMana(x, y, fixedPoint);
+        dungeonGridPointsEvaluated++; ;  // atomic increment
+
+        return fixedPoint;
+    }
+
+    /**
+     * The function to compute the mana value, in fixed point. Terms that depend on one
+     * coordinate only are passed in, so the eager fill computes them once per row or column;
+     * the expression is unchanged, so both paths give bit-identical values.
+     */
+    private int mana(double x_coord, double y_coord, double cosX5, double sinX6, double sinX,
+                     double sinY5, double cosY4, double logY, double sinY) {
         double dx = x_coord - bossX;
         double dy = y_coord - bossY;
         double distanceSquared = dx * dx + dy * dy;
 
-        /* The function to compute the mana value */
-        double mana = (2 * Math.sin(x_coord + 0.1 * Math.sin(y_coord / 5.0) + Math.PI / 2) *
-                Math.cos((y_coord + 0.1 * Math.cos(x_coord / 5.0) + Math.PI / 2) / 2.0) +
-                0.7 * Math.sin((x_coord * 0.5) + (y_coord * 0.3) + 0.2 * Math.sin(x_coord / 6.0) + Math.PI / 2) +
-                0.3 * Math.sin((x_coord * 1.5) - (y_coord * 0.8) + 0.15 * Math.cos(y_coord / 4.0)) +
-                -0.2 * Math.log(Math.abs(y_coord - Math.PI * 2) + 0.1) +
-                0.5 * Math.sin((x_coord * y_coord) / 4.0 + 0.05 * Math.sin(x_coord)) +
-                1.5 * Math.cos((x_coord + y_coord) / 5.0 + 0.1 * Math.sin(y_coord)) +
+        double mana = (2 * Math.sin(x_coord + 0.1 * sinY5 + Math.PI / 2) *
+                Math.cos((y_coord + 0.1 * cosX5 + Math.PI / 2) / 2.0) +
+                0.7 * Math.sin((x_coord * 0.5) + (y_coord * 0.3) + 0.2 * sinX6 + Math.PI / 2) +
+                0.3 * Math.sin((x_coord * 1.5) - (y_coord * 0.8) + 0.15 * cosY4) +
+                -0.2 * logY +
+                0.5 * Math.sin((x_coord * y_coord) / 4.0 + 0.05 * sinX) +
+                1.5 * Math.cos((x_coord + y_coord) / 5.0 + 0.1 * sinY) +
                 3.0 * Math.exp(-0.03 * ((x_coord - bossX - 15) * (x_coord - bossX - 15) +
                         (y_coord - bossY + 10) * (y_coord - bossY + 10))) +
                 8.0 * Math.exp(-0.01 * distanceSquared) +
                 2.0 / (1.0 + 0.05 * distanceSquared));
 
-        int fixedPoint = (int)(PRECISION * mana);
+        return (int)(PRECISION * mana);
+    }
 
-        // Write without synchronization - multiple threads might overwrite with same value
-        manaMap[x][y] = fixedPoint;
-        dungeonGridPointsEvaluated++; ;  // atomic increment
+    /**
+     * Eager mode: evaluate every cell of rows [rowLo, rowHi) and store the values a row at a
+     * time. Rows are swept column by column with the column terms precomputed, so the inner
+     * loop is straight-line arithmetic over arrays. Called from disjoint row blocks in parallel
+     * (ManaFill); it does not touch the evaluation counter.
+     */
+    void fillRows(int rowLo, int rowHi) {
+        int[] values = new int[columns];
+        for (int x = rowLo; x < rowHi; x++) {
+            double x_coord = getXcoord(x);
+            double cosX5 = Math.cos(x_coord / 5.0), sinX6 = Math.sin(x_coord / 6.0), sinX = Math.sin(x_coord);
+            for (int y = 0; y < columns; y++) {
+                values[y] = mana(x_coord, yCoords[y], cosX5, sinX6, sinX, sinY5[y], cosY4[y], logY[y], sinY[y]);
+            }
+            grid.setManaRow(x, values);
+        }
+    }
 
-        return fixedPoint;
+    /**
+     * Share of the map the hunts are expected to evaluate lazily, 1 - exp(-a (n/N)^b) for n
+     * hunts over N cells. a and b are fitted to the serial program's stored runs (about 42%
+     * at factor 0.1, 96% at 1, 99.9% at 3); later hunts stop early on visited paths, so
+     * coverage grows slower than linearly in n. This only ranks runs for the auto mode: the
+     * coverage at which eager filling pays off is measured with `benchmark_script.py fill`
+     * and set with -Ddungeon.eagerCoverage.
+     */
+    double expectedCoverage(int numSearches) {
+        return 1 - Math.exp(-COVERAGE_SCALE * Math.pow(numSearches / ((double) rows * columns), COVERAGE_EXPONENT));
+    }
+
+    /**
+     * Hunt kernel: the neighbouring cell with highest mana, as a packed cell (see pack),
+     * or the cell itself at a local peak. Same neighbour order and strict comparison as
+     * getNextStepDirection, so it takes the same step; nothing is allocated per call.
+     */
+    long nextStep(int x, int y) {
+        int localMax = getManaLevel(x, y);
+        int bestX = x, bestY = y;
+        for (int i = 0; i < DX.length; i++) {
+            int newX = x + DX[i];
+            int newY = y + DY[i];
+            if (newX >= 0 && newX < rows && newY >= 0 && newY < columns) {
+                int power = getManaLevel(newX, newY);
+                if (power > localMax) {
+                    localMax = power;
+                    bestX = newX;
+                    bestY = newY;
+                }
+            }
+        }
+        return pack(bestX, bestY);
     }
 
-    // Rest of the methods remain the same...
+    // Packed cell: row in the high word, column in the low word
+    static long pack(int x, int y) { return ((long) x << 32) | y; }
+    static int rowOf(long cell) { return (int) (cell >>> 32); }
+    static int colOf(long cell) { return (int) cell; }
+
+    // Reference version of nextStep, kept for HuntKernelCheck
     public HuntParallel.Direction getNextStepDirection(int x, int y) {
         HuntParallel.Direction climbDirection = HuntParallel.Direction.STAY;
         int localMax = getManaLevel(x, y);
@@ -152,81 +267,18 @@ public class DungeonMapParallel {
     public int getRows() { return rows; }
     public int getColumns() { return columns; }
 
+    public long getGridBytes() { return grid.allocatedBytes(); }
+
     public void visualisePowerMap(String filename, boolean path) {
-        int width = manaMap.length;
-        int height = manaMap[0].length;
-
-        // Output image
-        BufferedImage image = new BufferedImage(width, height, BufferedImage.TYPE_INT_RGB);
-
-        // Find min and max for normalization (ignore unvisited sites)
-        int min = Integer.MAX_VALUE;
-        int max = Integer.MIN_VALUE;
-
-        for (int x = 0; x < width; x++) {
-            for (int y = 0; y < height; y++) {
-                int value = manaMap[x][y];
-                if (value == Integer.MIN_VALUE) continue; // ignore unvisited sites
-                if (value < min) min = value;
-                if (value > max) max = value;
-            }
-        }
-        // Prevent division by zero if everything has the same value
-        double range = (max > min) ? (max - min) : 1.0;
-
-        // Map height values to colors
-        for (int x = 0; x < width; x++) {
-            for (int y = 0; y < height; y++) {
-                Color color;
-
-                if (path && !visited(x, y)) color = Color.BLACK; // view path only, all not visited black
-                else if (manaMap[x][y] == Integer.MIN_VALUE) color = Color.BLACK; // not evaluated black
-                else {
-                    double normalized = (manaMap[x][y] - min) / range; // 0–1
-                    color = mapHeightToColor(normalized);
-                }
-                image.setRGB(x, height - 1 - y, color.getRGB());
-            }
-        }
-        try {
-            File output = new File(filename);
-            ImageIO.write(image, "png", output);
-            System.out.println("map saved to " + filename);
-        } catch (Exception e) {
-            e.printStackTrace();
-        }
+        if (path) visualise(null, filename);
+        else visualise(filename, null);
     }
 
-    /**
-     * Maps normalized height [0..1] to black → purple → red → white.
-     */
-    private Color mapHeightToColor(double normalized) {
-        normalized = Math.max(0, Math.min(1, normalized)); // clamp to [0,1]
-
-        int r = 0, g = 0, b = 0;
-
-        if (normalized < 0.33) {
-            // Black -> Purple
-            double t = normalized / 0.33;
-            r = (int) (128 * t); // purple has some red
-            g = 0;
-            b = (int) (128 + 127 * t); // increasing blue
-        }
-        else if (normalized < 0.66) {
-            // Purple -> Red
-            double t = (normalized - 0.33) / 0.33;
-            r = (int) (128 + 127 * t); // red dominates
-            g = 0;
-            b = (int) (255 - 255 * t); // fade out blue
-        }
-        else {
-            // Red -> White
-            double t = (normalized - 0.66) / 0.34;
-            r = 255;
-            g = (int) (255 * t);
-            b = (int) (255 * t);
-        }
-
-        return new Color(r, g, b);
+    /** Renders the search and path images in one pass; either file name may be null */
+    public void visualise(String searchFile, String pathFile) {
+        PowerMapRenderer.render(new PowerMapRenderer.Cells() {
+            public int mana(int x, int y) { return grid.getMana(x, y); }
+            public boolean visited(int x, int y) { return grid.visited(x, y); }
+        }, rows, columns, searchFile, pathFile);
     }
 }
\ No newline at end of file
@@ -16,15 +16,22 @@ public class Hunt {
 
 	private DungeonMap dungeon;
 	public enum Direction {
-	    STAY,
-	    LEFT,
-	    RIGHT,
-	    UP,
-	    DOWN,
-	    UP_LEFT,
-	    UP_RIGHT,
-	    DOWN_LEFT,
-	    DOWN_RIGHT
+	    STAY(0, 0),
+	    LEFT(-1, 0),
+	    RIGHT(1, 0),
+	    UP(0, -1),
+	    DOWN(0, 1),
+	    UP_LEFT(-1, -1),
+	    UP_RIGHT(1, -1),
+	    DOWN_LEFT(-1, 1),
+	    DOWN_RIGHT(1, 1);
+
+	    final int dRow, dCol; // change of posRow/posCol for one step
+
+	    Direction(int dRow, int dCol) {
+	        this.dRow = dRow;
+	        this.dCol = dCol;
+	    }
 	}
 
 	public Hunt(int id, int pos_row, int pos_col, DungeonMap dungeon) {
@@ -42,44 +49,18 @@ public class Hunt {
      */
 	public int findManaPeak() {
 		int power=Integer.MIN_VALUE;
-		Direction next = Direction.STAY;
+		long cell = DungeonMap.pack(posRow, posCol);
 		
 		while(!dungeon.visited(posRow, posCol)) { // stop when hit existing path
 			power=dungeon.getManaLevel(posRow, posCol);
 			dungeon.setVisited(posRow, posCol, id);
 			steps++;
-			next = dungeon.getNextStepDirection(posRow, posCol);
-			if(DungeonHunter.DEBUG) System.out.println("Shadow "+getID()+" moving  "+next);
-			switch(next) {
-				case STAY: return power; //found local valley
-				case LEFT:
-					posRow--;
-					break;
-				case RIGHT:
-					posRow=posRow+1;
-					break;
-				case UP:
-					posCol=posCol-1;
-					break;
-				case DOWN:
-					posCol=posCol+1;
-					break;
-				case UP_LEFT:
-					posCol=posCol-1;
-					posRow--;
-					break;
-				case UP_RIGHT:
-					posCol=posCol-1;
-					posRow=posRow+1;
-					break;
-				case DOWN_LEFT:
-					posCol=posCol+1; //fixed BUG!!!
-					posRow--;
-					break;
-				case DOWN_RIGHT:
-					posCol=posCol+1;
-					posRow=posRow+1;
-			}
+			long next = dungeon.nextStep(posRow, posCol);
+			if(next==cell) return power; //found local valley
+			cell=next;
+			posRow=DungeonMap.rowOf(next);
+			posCol=DungeonMap.colOf(next);
+			if(DungeonHunter.DEBUG) System.out.println("Shadow "+getID()+" moving to "+posRow+","+posCol);
 		}
 		stopped=true;
 		return power;
@@ -0,0 +1,165 @@
+/**
+ * HuntKernelCheck.java
+ *
+ * Checks the allocation-free hunt kernel (nextStep) against the reference step
+ * function (getNextStepDirection) of DungeonMap and DungeonMapParallel:
+ *   1. every cell of the map steps to the same neighbour, and
+ *   2. the same hunts, run with Hunt/HuntParallel on one map and with the reference
+ *      climb on a second map of the same seed, end on the same cell with the same
+ *      mana and steps, and evaluate the same number of grid points.
+ * Prints the hunt times of both versions; exits with status 1 on any difference.
+ *
+ * Usage:
+ *   java HuntKernelCheck <gridSize> <numSearches> <randomSeed>
+ *
+ * Emmanuel Basua 2025
+ */
+
+import java.util.Random;
+
+class HuntKernelCheck {
+    private static int mismatches = 0;
+
+    private static void check(boolean same, String what) {
+        if (same) return;
+        mismatches++;
+        if (mismatches <= 10) System.out.println("MISMATCH: " + what);
+    }
+
+    public static void main(String[] args) {
+        if (args.length != 3) {
+            System.out.println("Usage: java HuntKernelCheck <gridSize> <numSearches> <randomSeed>");
+            System.exit(0);
+        }
+        int gateSize = Integer.parseInt(args[0]);
+        int numSearches = (int) (Double.parseDouble(args[1]) * (gateSize * 2) * (gateSize * 2) * DungeonMap.RESOLUTION);
+        int seed = Integer.parseInt(args[2]);
+        if (seed == 0) seed = 1 + new Random().nextInt(Integer.MAX_VALUE - 1); // both maps need the same boss
+        System.out.printf("HuntKernelCheck: grid %d, %d searches, seed %d\n", gateSize, numSearches, seed);
+
+        checkSerial(gateSize, numSearches, seed);
+        checkParallel(gateSize, numSearches, seed);
+
+        if (mismatches > 0) {
+            System.out.println(mismatches + " mismatch(es)");
+            System.exit(1);
+        }
+        System.out.println("OK: kernel matches the reference step function");
+    }
+
+    private static int[][] starts(int numSearches, int rows, int columns, int seed) {
+        Random rand = new Random(seed);
+        int[][] starts = new int[numSearches][];
+        for (int i = 0; i < numSearches; i++) {
+            starts[i] = new int[]{rand.nextInt(rows), rand.nextInt(columns)};
+        }
+        return starts;
+    }
+
+    private static void checkSerial(int gateSize, int numSearches, int seed) {
+        DungeonMap steps = new DungeonMap(-gateSize, gateSize, -gateSize, gateSize, seed);
+        int rows = steps.getRows(), columns = steps.getColumns();
+        for (int x = 0; x < rows; x++) {
+            for (int y = 0; y < columns; y++) {
+                Hunt.Direction d = steps.getNextStepDirection(x, y);
+                check(steps.nextStep(x, y) == DungeonMap.pack(x + d.dRow, y + d.dCol),
+                        "DungeonMap step from " + x + "," + y);
+            }
+        }
+
+        int[][] starts = starts(numSearches, rows, columns, seed);
+        DungeonMap kernelMap = new DungeonMap(-gateSize, gateSize, -gateSize, gateSize, seed);
+        DungeonMap referenceMap = new DungeonMap(-gateSize, gateSize, -gateSize, gateSize, seed);
+        long kernelStart = System.nanoTime();
+        Hunt[] hunts = new Hunt[numSearches];
+        int[] kernelPower = new int[numSearches];
+        for (int i = 0; i < numSearches; i++) {
+            hunts[i] = new Hunt(i + 1, starts[i][0], starts[i][1], kernelMap);
+            kernelPower[i] = hunts[i].findManaPeak();
+        }
+        long kernelEnd = System.nanoTime();
+        int[][] reference = new int[numSearches][];
+        for (int i = 0; i < numSearches; i++) {
+            reference[i] = referenceClimb(referenceMap, starts[i][0], starts[i][1], i + 1);
+        }
+        long referenceEnd = System.nanoTime();
+
+        for (int i = 0; i < numSearches; i++) {
+            check(kernelPower[i] == reference[i][0] && hunts[i].getSteps() == reference[i][1]
+                            && hunts[i].getPosRow() == reference[i][2] && hunts[i].getPosCol() == reference[i][3],
+                    "Hunt " + (i + 1));
+        }
+        check(kernelMap.getGridPointsEvaluated() == referenceMap.getGridPointsEvaluated(), "DungeonMap points evaluated");
+        System.out.printf("\tDungeonMap: %d x %d steps checked, hunts %.1f ms (reference %.1f ms)\n", rows, columns,
+                (kernelEnd - kernelStart) / 1e6, (referenceEnd - kernelEnd) / 1e6);
+    }
+
+    // findManaPeak as it was before the kernel: enum direction per step
+    private static int[] referenceClimb(DungeonMap dungeon, int row, int col, int id) {
+        int power = Integer.MIN_VALUE, steps = 0;
+        while (!dungeon.visited(row, col)) {
+            power = dungeon.getManaLevel(row, col);
+            dungeon.setVisited(row, col, id);
+            steps++;
+            Hunt.Direction next = dungeon.getNextStepDirection(row, col);
+            if (next == Hunt.Direction.STAY) break;
+            row += next.dRow;
+            col += next.dCol;
+        }
+        return new int[]{power, steps, row, col};
+    }
+
+    private static void checkParallel(int gateSize, int numSearches, int seed) {
+        DungeonMapParallel steps = new DungeonMapParallel(-gateSize, gateSize, -gateSize, gateSize, seed);
+        int rows = steps.getRows(), columns = steps.getColumns();
+        for (int x = 0; x < rows; x++) {
+            for (int y = 0; y < columns; y++) {
+                HuntParallel.Direction d = steps.getNextStepDirection(x, y);
+                check(steps.nextStep(x, y) == DungeonMapParallel.pack(x + d.dRow, y + d.dCol),
+                        "DungeonMapParallel step from " + x + "," + y);
+            }
+        }
+
+        // Hunts run one after another here, so the racy map behaves like the serial one
+        int[][] starts = starts(numSearches, rows, columns, seed);
+        DungeonMapParallel kernelMap = new DungeonMapParallel(-gateSize, gateSize, -gateSize, gateSize, seed);
+        DungeonMapParallel referenceMap = new DungeonMapParallel(-gateSize, gateSize, -gateSize, gateSize, seed);
+        long kernelStart = System.nanoTime();
+        HuntParallel[] hunts = new HuntParallel[numSearches];
+        int[] kernelPower = new int[numSearches];
+        for (int i = 0; i < numSearches; i++) {
+            hunts[i] = new HuntParallel(i + 1, starts[i][0], starts[i][1], kernelMap);
+            kernelPower[i] = hunts[i].findManaPeak();
+        }
+        long kernelEnd = System.nanoTime();
+        int[][] reference = new int[numSearches][];
+        for (int i = 0; i < numSearches; i++) {
+            reference[i] = referenceClimb(referenceMap, starts[i][0], starts[i][1], i + 1);
+        }
+        long referenceEnd = System.nanoTime();
+
+        for (int i = 0; i < numSearches; i++) {
+            check(kernelPower[i] == reference[i][0] && hunts[i].getSteps() == reference[i][1]
+                            && hunts[i].getPosRow() == reference[i][2] && hunts[i].getPosCol() == reference[i][3],
+                    "HuntParallel " + (i + 1));
+        }
+        check(kernelMap.getGridPointsEvaluated() == referenceMap.getGridPointsEvaluated(),
+                "DungeonMapParallel points evaluated");
+        System.out.printf("\tDungeonMapParallel: %d x %d steps checked, hunts %.1f ms (reference %.1f ms)\n", rows,
+                columns, (kernelEnd - kernelStart) / 1e6, (referenceEnd - kernelEnd) / 1e6);
+    }
+
+    private static int[] referenceClimb(DungeonMapParallel dungeon, int row, int col, int id) {
+        int power = Integer.MIN_VALUE, steps = 0;
+        while (!dungeon.visited(row, col)) {
+            power = dungeon.getManaLevel(row, col);
+            dungeon.setVisited(row, col, id);
+            steps++;
+            HuntParallel.Direction next = dungeon.getNextStepDirection(row, col);
+            if (next == HuntParallel.Direction.STAY) break;
+            row += next.dRow;
+            col += next.dCol;
+        }
+        return new int[]{power, steps, row, col};
+    }
+}
@@ -16,15 +16,22 @@ public class HuntParallel {
     private DungeonMapParallel dungeon;
 
     public enum Direction {
-        STAY,
-        LEFT,
-        RIGHT,
-        UP,
-        DOWN,
-        UP_LEFT,
-        UP_RIGHT,
-        DOWN_LEFT,
-        DOWN_RIGHT
+        STAY(0, 0),
+        LEFT(-1, 0),
+        RIGHT(1, 0),
+        UP(0, -1),
+        DOWN(0, 1),
+        UP_LEFT(-1, -1),
+        UP_RIGHT(1, -1),
+        DOWN_LEFT(-1, 1),
+        DOWN_RIGHT(1, 1);
+
+        final int dRow, dCol; // change of posRow/posCol for one step
+
+        Direction(int dRow, int dCol) {
+            this.dRow = dRow;
+            this.dCol = dCol;
+        }
     }
 
     public HuntParallel(int id, int pos_row, int pos_col, DungeonMapParallel dungeon) {
@@ -43,49 +50,56 @@ public class HuntParallel {
      */
     public int findManaPeak() {
         int power = Integer.MIN_VALUE;
-        Direction next = Direction.STAY;
+        long cell = DungeonMapParallel.pack(posRow, posCol);
 
         while (!dungeon.visited(posRow, posCol)) { // stop when hit existing path
             power = dungeon.getManaLevel(posRow, posCol);
             dungeon.setVisited(posRow, posCol, id);
             steps++;
-            next = dungeon.getNextStepDirection(posRow, posCol);
+            long next = dungeon.nextStep(posRow, posCol);
+            if (next == cell) return power; // found local valley
+            cell = next;
+            posRow = DungeonMapParallel.rowOf(next);
+            posCol = DungeonMapParallel.colOf(next);
 
             if (DungeonHunterParallel.DEBUG) {
-                System.out.println("Shadow " + getID() + " moving " + next);
+                System.out.println("Shadow " + getID() + " moving to " + posRow + "," + posCol);
             }
+        }
+        stopped = true;
+        return power;
+    }
 
-            switch (next) {
-                case STAY:
-                    return power; // found local valley
-                case LEFT:
-                    posRow--;
-                    break;
-                case RIGHT:
-                    posRow = posRow + 1;
-                    break;
-                case UP:
-                    posCol = posCol - 1;
-                    break;
-                case DOWN:
-                    posCol = posCol + 1;
-                    break;
-                case UP_LEFT:
-                    posCol = posCol - 1;
-                    posRow--;
-                    break;
-                case UP_RIGHT:
-                    posCol = posCol - 1;
-                    posRow = posRow + 1;
-                    break;
-                case DOWN_LEFT:
-                    posCol = posCol + 1; // fixed BUG!!!
-                    posRow--;
-                    break;
-                case DOWN_RIGHT:
-                    posCol = posCol + 1;
-                    posRow = posRow + 1;
-            }
+    /**
+     * Deterministic mode, phase 1: climb from the start without stopping on other paths,
+     * claiming every cell with the hunt id until a smaller id already owns one. Climbs never
+     * split once they meet, so that hunt covers the rest of the path.
+     */
+    public void claimPath() {
+        int row = posRow, col = posCol;
+        while (dungeon.claim(row, col, id)) {
+            long next = dungeon.nextStep(row, col);
+            if (next == DungeonMapParallel.pack(row, col)) return;
+            row = DungeonMapParallel.rowOf(next);
+            col = DungeonMapParallel.colOf(next);
+        }
+    }
+
+    /**
+     * Deterministic mode, phase 2: replay findManaPeak where "visited" means owned by a
+     * smaller id. Hunt i then sees exactly the cells hunts 1..i-1 visited in the serial program.
+     *
+     * @return the highest power/mana located
+     */
+    public int replayPath() {
+        int power = Integer.MIN_VALUE;
+        while (dungeon.ownerOf(posRow, posCol) == id) {
+            power = dungeon.getManaLevel(posRow, posCol);
+            steps++;
+            long next = dungeon.nextStep(posRow, posCol);
+            if (next == DungeonMapParallel.pack(posRow, posCol)) return power;
+            posRow = DungeonMapParallel.rowOf(next);
+            posCol = DungeonMapParallel.colOf(next);
         }
         stopped = true;
         return power;
@@ -0,0 +1,129 @@
+/**
+ * PowerMapRenderer.java
+ *
+ * PNG rendering of the dungeon mana map for DungeonMap and DungeonMapParallel.
+ * Pixels are written straight into the image's int buffer through a colour lookup
+ * table with one entry per mana value, columns are filled in parallel and the search
+ * and path images are encoded at the same time.
+ * Run with -Ddungeon.visualise=false to skip rendering altogether (benchmark runs).
+ *
+ * Emmanuel Basua 2025
+ */
+
+import java.awt.image.BufferedImage;
+import java.awt.image.DataBufferInt;
+import java.io.File;
+import java.util.concurrent.CompletableFuture;
+import java.util.stream.IntStream;
+import javax.imageio.ImageIO;
+
+class PowerMapRenderer {
+    static final boolean ENABLED = Boolean.parseBoolean(System.getProperty("dungeon.visualise", "true"));
+    private static final int MAX_TABLE_SIZE = 1 << 24; // wider mana ranges are coloured per pixel
+
+    /** Read access to a dungeon grid; mana is Integer.MIN_VALUE where it was never evaluated */
+    interface Cells {
+        int mana(int x, int y);
+        boolean visited(int x, int y);
+    }
+
+    /**
+     * Write the search image (all evaluated cells) and the path image (visited cells only).
+     * Either file name may be null to skip that image.
+     */
+    static void render(Cells cells, int width, int height, String searchFile, String pathFile) {
+        // Min and max for normalisation (ignore unvisited sites)
+        int[] columnMin = new int[width];
+        int[] columnMax = new int[width];
+        IntStream.range(0, width).parallel().forEach(x -> {
+            int min = Integer.MAX_VALUE, max = Integer.MIN_VALUE;
+            for (int y = 0; y < height; y++) {
+                int value = cells.mana(x, y);
+                if (value == Integer.MIN_VALUE) continue;
+                if (value < min) min = value;
+                if (value > max) max = value;
+            }
+            columnMin[x] = min;
+            columnMax[x] = max;
+        });
+        int min = Integer.MAX_VALUE, max = Integer.MIN_VALUE;
+        for (int x = 0; x < width; x++) {
+            min = Math.min(min, columnMin[x]);
+            max = Math.max(max, columnMax[x]);
+        }
+        // Prevent division by zero if everything has the same value
+        double range = (max > min) ? (max - min) : 1.0;
+        final int low = min;
+        int[] table = (max >= min && (long) max - min < MAX_TABLE_SIZE) ? new int[max - min + 1] : null;
+        if (table != null) {
+            for (int i = 0; i < table.length; i++) table[i] = heightToRGB(i / range);
+        }
+
+        BufferedImage search = searchFile == null ? null : new BufferedImage(width, height, BufferedImage.TYPE_INT_RGB);
+        BufferedImage path = pathFile == null ? null : new BufferedImage(width, height, BufferedImage.TYPE_INT_RGB);
+        int[] searchPixels = search == null ? null : ((DataBufferInt) search.getRaster().getDataBuffer()).getData();
+        int[] pathPixels = path == null ? null : ((DataBufferInt) path.getRaster().getDataBuffer()).getData();
+
+        // New buffers are black, so only evaluated cells are written; y is flipped as before
+        IntStream.range(0, width).parallel().forEach(x -> {
+            for (int y = 0; y < height; y++) {
+                int value = cells.mana(x, y);
+                if (value == Integer.MIN_VALUE) continue; // not evaluated black
+                int rgb = table != null ? table[value - low] : heightToRGB((value - low) / range);
+                int pixel = (height - 1 - y) * width + x;
+                if (searchPixels != null) searchPixels[pixel] = rgb;
+                if (pathPixels != null && cells.visited(x, y)) pathPixels[pixel] = rgb; // view path only
+            }
+        });
+
+        // Encode both PNGs at once; report in the original order
+        CompletableFuture<Boolean> searchWritten = CompletableFuture.supplyAsync(() -> write(search, searchFile));
+        boolean pathWritten = write(path, pathFile);
+        if (searchWritten.join()) System.out.println("map saved to " + searchFile);
+        if (pathWritten) System.out.println("map saved to " + pathFile);
+    }
+
+    private static boolean write(BufferedImage image, String filename) {
+        if (image == null) return false;
+        try {
+            ImageIO.write(image, "png", new File(filename));
+            return true;
+        } catch (Exception e) {
+            e.printStackTrace();
+            return false;
+        }
+    }
+
+    /**
+     * Maps normalized height [0..1] to black → purple → red → white, as a packed RGB int.
+     */
+    static int heightToRGB(double normalized) {
+        normalized = Math.max(0, Math.min(1, normalized)); // clamp to [0,1]
+
+        int r, g, b;
+
+        if (normalized < 0.33) {
+            // Black -> Purple
+            double t = normalized / 0.33;
+            r = (int) (128 * t); // purple has some red
+            g = 0;
+            b = (int) (128 + 127 * t); // increasing blue
+        }
+        else if (normalized < 0.66) {
+            // Purple -> Red
+            double t = (normalized - 0.33) / 0.33;
+            r = (int) (128 + 127 * t); // red dominates
+            g = 0;
+            b = (int) (255 - 255 * t); // fade out blue
+        }
+        else {
+            // Red -> White
+            double t = (normalized - 0.66) / 0.34;
+            r = 255;
+            g = (int) (255 * t);
+            b = (int) (255 * t);
+        }
+
+        return (r << 16) | (g << 8) | b;
+    }
+}
@@ -0,0 +1,51 @@
+/**
+ * RunRecord.java
+ *
+ * One-line JSON result record for the Dungeon Hunter programs.
+ * Printed by DungeonHunter and DungeonHunterParallel when run with
+ * -Ddungeon.json=true so benchmark tools do not have to scrape the text output.
+ *
+ * Emmanuel Basua 2025
+ */
+
+import java.util.Locale;
+
+class RunRecord {
+    static final boolean ENABLED = Boolean.getBoolean("dungeon.json");
+
+    private final StringBuilder json = new StringBuilder("{");
+
+    RunRecord add(String key, long value) {
+        key(key).append(value);
+        return this;
+    }
+
+    RunRecord add(String key, double value) {
+        key(key).append(String.format(Locale.ROOT, "%.6f", value));
+        return this;
+    }
+
+    RunRecord addMillis(String key, long nanos) {
+        return add(key, nanos / 1e6);
+    }
+
+    RunRecord add(String key, String value) {
+        key(key).append('"').append(value.replace("\\", "\\\\").replace("\"", "\\\"")).append('"');
+        return this;
+    }
+
+    RunRecord add(String key, RunRecord nested) {
+        key(key).append(nested.toString());
+        return this;
+    }
+
+    private StringBuilder key(String key) {
+        if (json.length() > 1) json.append(", ");
+        return json.append('"').append(key).append("\": ");
+    }
+
+    @Override
+    public String toString() {
+        return json + "}";
+    }
+}
@@ -0,0 +1,216 @@
+/**
+ * TiledDungeonGrid.java
+ *
+ * Mana and visit storage for DungeonMapParallel.
+ * The grid is split into 64x64 tiles that are allocated the first time a hunt touches them.
+ * Random starts reach every tile at any real search factor (about 80 hunts per tile at
+ * factor 0.1), so in practice all tiles get allocated; the saving over int[][] mana and
+ * visit arrays is per cell (4 bytes of mana plus one visit bit instead of 8 bytes), not
+ * in untouched parts of the map. Only tiny factors leave tiles unallocated.
+ * Mana values are stored XOR Integer.MIN_VALUE: a freshly zeroed tile already reads as
+ * "not evaluated" and no sentinel fill is needed. Visits are one bit per cell.
+ * With owner tracking (deterministic mode) each cell also keeps the smallest hunt id
+ * whose climb passed through it, claimed with compare-and-set; 0 means unowned.
+ *
+ * Emmanuel Basua 2025
+ */
+
+import java.util.concurrent.atomic.AtomicIntegerArray;
+import java.util.concurrent.atomic.AtomicLongArray;
+import java.util.concurrent.atomic.AtomicReferenceArray;
+
+class TiledDungeonGrid {
+    static final int TILE_SHIFT = 6;
+    static final int TILE_SIZE = 1 << TILE_SHIFT;
+    static final int TILE_MASK = TILE_SIZE - 1;
+    static final int TILE_CELLS = TILE_SIZE * TILE_SIZE;
+    static final long TILE_BYTES = TILE_CELLS * 4L + TILE_CELLS / 8;
+
+    private static final class Tile {
+        final int[] mana = new int[TILE_CELLS];                           // value ^ MIN_VALUE, 0 = not evaluated
+        final AtomicLongArray visits = new AtomicLongArray(TILE_CELLS / 64); // one bit per cell
+        final AtomicIntegerArray owners;                                  // smallest hunt id, 0 = unowned
+
+        Tile(boolean trackOwners) {
+            owners = trackOwners ? new AtomicIntegerArray(TILE_CELLS) : null;
+        }
+    }
+
+    private final int rows, columns;
+    private final int tileColumns;
+    private final AtomicReferenceArray<Tile> tiles;
+    private final boolean trackOwners;
+
+    TiledDungeonGrid(int rows, int columns) {
+        this(rows, columns, false);
+    }
+
+    TiledDungeonGrid(int rows, int columns, boolean trackOwners) {
+        this.rows = rows;
+        this.columns = columns;
+        this.trackOwners = trackOwners;
+        this.tileColumns = (columns + TILE_MASK) >> TILE_SHIFT;
+        int tileRows = (rows + TILE_MASK) >> TILE_SHIFT;
+        this.tiles = new AtomicReferenceArray<>(tileRows * tileColumns);
+    }
+
+    private Tile tile(int row, int col, boolean create) {
+        int index = (row >> TILE_SHIFT) * tileColumns + (col >> TILE_SHIFT);
+        Tile tile = tiles.get(index);
+        if (tile == null && create) {
+            // Racing threads may both allocate; only one tile is published
+            tiles.compareAndSet(index, null, new Tile(trackOwners));
+            tile = tiles.get(index);
+        }
+        return tile;
+    }
+
+    private static int offset(int row, int col) {
+        return ((row & TILE_MASK) << TILE_SHIFT) | (col & TILE_MASK);
+    }
+
+    /** Stored mana, or Integer.MIN_VALUE if the cell has not been evaluated */
+    int getMana(int row, int col) {
+        Tile tile = tile(row, col, false);
+        return tile == null ? Integer.MIN_VALUE : tile.mana[offset(row, col)] ^ Integer.MIN_VALUE;
+    }
+
+    void setMana(int row, int col, int value) {
+        tile(row, col, true).mana[offset(row, col)] = value ^ Integer.MIN_VALUE;
+    }
+
+    /** Store values[col] for every column of the row (eager fill), one tile segment at a time */
+    void setManaRow(int row, int[] values) {
+        int base = (row & TILE_MASK) << TILE_SHIFT;
+        for (int colStart = 0; colStart < columns; colStart += TILE_SIZE) {
+            int[] mana = tile(row, colStart, true).mana;
+            int end = Math.min(colStart + TILE_SIZE, columns);
+            for (int col = colStart; col < end; col++) {
+                mana[base | (col & TILE_MASK)] = values[col] ^ Integer.MIN_VALUE;
+            }
+        }
+    }
+
+    boolean visited(int row, int col) {
+        Tile tile = tile(row, col, false);
+        if (tile == null) return false;
+        int bit = offset(row, col);
+        return (tile.visits.get(bit >> 6) & (1L << bit)) != 0;
+    }
+
+    void setVisited(int row, int col) {
+        setBit(tile(row, col, true).visits, offset(row, col));
+    }
+
+    // CAS loop rather than getAndUpdate: no lambda on the hunt's hottest path
+    private static void setBit(AtomicLongArray words, int bit) {
+        int index = bit >> 6;
+        long mask = 1L << bit;
+        long word;
+        do {
+            word = words.get(index);
+            if ((word & mask) != 0) return;
+        } while (!words.compareAndSet(index, word, word | mask));
+    }
+
+    /**
+     * Lower the cell's owner to `id` if it is unowned or owned by a larger id.
+     * Returns false when a smaller (or the same) id already owns the cell.
+     */
+    boolean claim(int row, int col, int id) {
+        AtomicIntegerArray owners = tile(row, col, true).owners;
+        int cell = offset(row, col);
+        while (true) {
+            int current = owners.get(cell);
+            if (current != 0 && current <= id) return false;
+            if (owners.compareAndSet(cell, current, id)) return true;
+        }
+    }
+
+    int ownerOf(int row, int col) {
+        Tile tile = tile(row, col, false);
+        return tile == null ? 0 : tile.owners.get(offset(row, col));
+    }
+
+    int tileCount() { return tiles.length(); }
+
+    /**
+     * Settle one tile after all hunts have claimed their cells: owned cells become visited,
+     * mana is kept only for cells within one step of an owned cell (what the serial program
+     * evaluates) and the number of such cells is returned. Tiles can be settled in parallel;
+     * each task writes only its own tile.
+     */
+    int settleTile(int index) {
+        Tile tile = tiles.get(index);
+        if (tile == null) return 0;
+        int rowStart = (index / tileColumns) << TILE_SHIFT;
+        int colStart = (index % tileColumns) << TILE_SHIFT;
+        int evaluated = 0;
+        for (int row = rowStart; row < Math.min(rowStart + TILE_SIZE, rows); row++) {
+            for (int col = colStart; col < Math.min(colStart + TILE_SIZE, columns); col++) {
+                int cell = offset(row, col);
+                if (tile.owners.get(cell) != 0) setBit(tile.visits, cell);
+                if (tile.mana[cell] == 0) continue;
+                if (ownedNeighbourhood(row, col)) evaluated++;
+                else tile.mana[cell] = 0; // only evaluated by a climb the serial order never makes
+            }
+        }
+        return evaluated;
+    }
+
+    /**
+     * Trim one tile after an eager fill: mana is kept only for cells within one step of a
+     * visited cell, which are exactly the cells lazy climbs evaluate, and their number is
+     * returned. Tiles can be trimmed in parallel; each task writes only its own tile.
+     */
+    int trimTile(int index) {
+        Tile tile = tiles.get(index);
+        if (tile == null) return 0;
+        int rowStart = (index / tileColumns) << TILE_SHIFT;
+        int colStart = (index % tileColumns) << TILE_SHIFT;
+        int evaluated = 0;
+        for (int row = rowStart; row < Math.min(rowStart + TILE_SIZE, rows); row++) {
+            for (int col = colStart; col < Math.min(colStart + TILE_SIZE, columns); col++) {
+                int cell = offset(row, col);
+                if (tile.mana[cell] == 0) continue;
+                if (visitedNeighbourhood(row, col)) evaluated++;
+                else tile.mana[cell] = 0;
+            }
+        }
+        return evaluated;
+    }
+
+    private boolean visitedNeighbourhood(int row, int col) {
+        for (int r = Math.max(row - 1, 0); r <= Math.min(row + 1, rows - 1); r++) {
+            for (int c = Math.max(col - 1, 0); c <= Math.min(col + 1, columns - 1); c++) {
+                if (visited(r, c)) return true;
+            }
+        }
+        return false;
+    }
+
+    private boolean ownedNeighbourhood(int row, int col) {
+        for (int r = Math.max(row - 1, 0); r <= Math.min(row + 1, rows - 1); r++) {
+            for (int c = Math.max(col - 1, 0); c <= Math.min(col + 1, columns - 1); c++) {
+                if (ownerOf(r, c) != 0) return true;
+            }
+        }
+        return false;
+    }
+
+    int getRows() { return rows; }
+    int getColumns() { return columns; }
+
+    int allocatedTiles() {
+        int count = 0;
+        for (int i = 0; i < tiles.length(); i++) {
+            if (tiles.get(i) != null) count++;
+        }
+        return count;
+    }
+
+    /** Bytes held by allocated tiles (payload only), for comparison with 8 bytes per cell of int[][] storage */
+    long allocatedBytes() {
+        return allocatedTiles() * (TILE_BYTES + (trackOwners ? TILE_CELLS * 4L : 0));
+    }
+}